@@ -0,0 +1,63 @@
+"""Benchmark parsing, rendering and converting a large DiagTable.
+
+Usage:
+    python benchmarks/benchmark_diag_table.py [--files N] [--fields N] [--repeat N]
+"""
+import argparse
+import datetime
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import fv3config  # noqa: E402
+
+
+def large_diag_table(n_files: int, n_fields: int):
+    return fv3config.DiagTable(
+        "experiment",
+        datetime.datetime(2016, 8, 1),
+        [
+            fv3config.DiagFileConfig(
+                f"file_{i}",
+                1,
+                "hours",
+                [
+                    fv3config.DiagFieldConfig("dynamics", f"field_{j}", f"output_{j}")
+                    for j in range(n_fields)
+                ],
+            )
+            for i in range(n_files)
+        ],
+    )
+
+
+def best_time(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--fields", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    diag_table = large_diag_table(args.files, args.fields)
+    text = str(diag_table)
+    data = diag_table.asdict()
+    print(f"diag_table with {args.files * args.fields} field lines, {len(text)} bytes")
+
+    timings = {
+        "from_str": lambda: fv3config.DiagTable.from_str(text),
+        "str (first)": lambda: str(fv3config.DiagTable.from_str(text)),
+        "str": lambda: str(diag_table),
+        "asdict": diag_table.asdict,
+        "from_dict": lambda: fv3config.DiagTable.from_dict(data),
+    }
+    for name, func in timings.items():
+        print(f"{name:<20}{best_time(func, args.repeat) * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
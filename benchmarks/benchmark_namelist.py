@@ -0,0 +1,90 @@
+"""Benchmark writing and reading input.nml files against f90nml.
+
+Compares fv3config.config_to_namelist, fv3config.configs_to_namelists and
+fv3config.config_from_namelist against f90nml for an ensemble of configurations
+which differ in a few namelist options.
+
+Usage:
+    python benchmarks/benchmark_namelist.py [--members N] [--repeat N]
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import timeit
+
+import f90nml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import fv3config  # noqa: E402
+from fv3config.config.namelist import _to_nested_dict  # noqa: E402
+from tests.mocks import c12_config  # noqa: E402
+
+
+def ensemble(n_members: int):
+    base = fv3config.freeze(c12_config("gs://"))
+    configs = []
+    for i in range(n_members):
+        config = base.set_in(("namelist", "fv_core_nml", "n_sponge"), i % 40)
+        config = config.set_in(("namelist", "gfs_physics_nml", "fhzero"), 0.25 * i)
+        configs.append(config)
+    return configs
+
+
+def f90nml_write(config):
+    f = io.StringIO()
+    f90nml.write(config["namelist"], f)
+    return f.getvalue()
+
+
+def f90nml_read(filename):
+    return _to_nested_dict(f90nml.read(filename).items())
+
+
+def best_time(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    configs = ensemble(args.members)
+    texts = fv3config.configs_to_namelists(configs)
+    assert texts == [f90nml_write(config) for config in configs]
+    print(f"{args.members} namelists of {len(texts[0])} bytes")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filenames = []
+        for i, text in enumerate(texts):
+            filename = os.path.join(tmpdir, f"input_{i}.nml")
+            with open(filename, "w") as f:
+                f.write(text)
+            filenames.append(filename)
+        assert fv3config.configs_from_namelists(filenames) == [
+            f90nml_read(filename) for filename in filenames
+        ]
+
+        timings = {
+            "write (f90nml)": lambda: [f90nml_write(config) for config in configs],
+            "write": lambda: [fv3config.config_to_namelist(c) for c in configs],
+            "batch write": lambda: fv3config.configs_to_namelists(configs),
+            "read (f90nml)": lambda: [f90nml_read(name) for name in filenames],
+            "read": lambda: fv3config.configs_from_namelists(filenames),
+        }
+        results = {name: best_time(func, args.repeat) for name, func in timings.items()}
+    for name, seconds in results.items():
+        print(f"{name:<20}{seconds * 1000:10.1f} ms")
+    for name, baseline in [
+        ("write", "write (f90nml)"),
+        ("batch write", "write (f90nml)"),
+        ("read", "read (f90nml)"),
+    ]:
+        print(f"{name} speedup: {results[baseline] / results[name]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark fv3config.load and fv3config.dump with and without libyaml.
+
+Compares the current implementation against the previous one, which deep-copied
+the configuration and used the pure-Python yaml parser and emitter.
+
+Usage:
+    python benchmarks/benchmark_serialization.py [--patch-files N] [--repeat N]
+"""
+import argparse
+import copy
+import datetime
+import io
+import os
+import sys
+import timeit
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import fv3config  # noqa: E402
+from fv3config.config import _serialization  # noqa: E402
+from tests.mocks import c12_config  # noqa: E402
+
+
+def large_config(n_patch_files: int):
+    config = c12_config("gs://")
+    config["patch_files"] = [
+        fv3config.get_asset_dict(
+            "gs://bucket/patch_files", f"file_{i}.nc", target_location="INPUT"
+        )
+        for i in range(n_patch_files)
+    ]
+    fields = [
+        fv3config.DiagFieldConfig("dynamics", f"field_{i}", f"output_{i}")
+        for i in range(200)
+    ]
+    config["diag_table"] = fv3config.DiagTable(
+        "experiment",
+        datetime.datetime(2016, 8, 1),
+        [fv3config.DiagFileConfig(f"file_{i}", 1, "hours", fields) for i in range(10)],
+    )
+    return config
+
+
+def previous_dump(config, f):
+    config_copy = copy.deepcopy(config)
+    if isinstance(config["diag_table"], fv3config.DiagTable):
+        config_copy["diag_table"] = config["diag_table"].asdict()
+    yaml.safe_dump(config_copy, f)
+
+
+def previous_load(f):
+    config = yaml.safe_load(f)
+    if isinstance(config["diag_table"], dict):
+        config["diag_table"] = fv3config.DiagTable.from_dict(config["diag_table"])
+    return config
+
+
+def best_time(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patch-files", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    config = large_config(args.patch_files)
+    f = io.StringIO()
+    fv3config.dump(config, f)
+    text = f.getvalue()
+    print(f"config with {args.patch_files} patch files, {len(text)} bytes of yaml")
+    print(f"libyaml available: {yaml.__with_libyaml__}")
+
+    timings = {
+        "dump (previous)": lambda: previous_dump(config, io.StringIO()),
+        "dump": lambda: fv3config.dump(config, io.StringIO()),
+        "load (previous)": lambda: previous_load(io.StringIO(text)),
+        "load": lambda: fv3config.load(io.StringIO(text)),
+    }
+    results = {name: best_time(func, args.repeat) for name, func in timings.items()}
+    for name, seconds in results.items():
+        print(f"{name:<20}{seconds * 1000:10.1f} ms")
+    for operation in ("dump", "load"):
+        speedup = results[f"{operation} (previous)"] / results[operation]
+        print(f"{operation} speedup: {speedup:.1f}x")
+    loader = _serialization.SafeLoader.__name__
+    dumper = _serialization.SafeDumper.__name__
+    print(f"using {loader} and {dumper}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,23 +5,45 @@
 from .config import (
     config_to_namelist,
     config_from_namelist,
+    configs_to_namelists,
+    configs_from_namelists,
     get_default_config,
     write_run_directory,
+    validate_config,
+    check_config,
     enable_restart,
     get_run_duration,
     set_run_duration,
     get_timestep,
     get_nudging_assets,
     enable_nudging,
+    get_missing_nudging_files,
     DiagTable,
+    DiagTableIndex,
     DiagFieldConfig,
     DiagFileConfig,
     Packing,
     FileFormat,
     dump,
     load,
+    BlobReference,
+    FrozenConfig,
+    freeze,
+    thaw,
+    fingerprint,
+    generate_ensemble,
+    write_ensemble,
+    Grid,
+    Uniform,
+    LogUniform,
+    Normal,
+    Choice,
+    estimate_diagnostic_output,
+    DiagOutputEstimate,
+    DiagFileEstimate,
 )
-from ._exceptions import InvalidFileError, ConfigError
+
+from ._exceptions import InvalidFileError, ConfigError, OfflineError
 from ._datastore import ensure_data_is_downloaded
 from .fv3run import run_docker, run_native, run_kubernetes
 from ._asset_list import (
@@ -31,7 +53,16 @@ from ._asset_list import (
     write_asset,
 )
 from ._asset_list_config import config_to_asset_list
-from .caching import CACHE_REMOTE_FILES, do_remote_caching, set_cache_dir, get_cache_dir
+from ._asset_plan import AssetPlan, compile_config, write_run_directory_from_plan
+from .caching import (
+    CACHE_REMOTE_FILES,
+    do_remote_caching,
+    set_cache_dir,
+    get_cache_dir,
+    set_offline,
+    set_cache_peers,
+    set_render_cache,
+)
 
 
 __author__ = """Allen Institute of Artificial Intelligence"""
@@ -3,15 +3,24 @@
 Assets represent either remote, local, or in memory data that can be written to
 a local disk
 """
+import collections.abc
+import functools
 import logging
 import os
+from typing import BinaryIO, Callable, Iterable, Iterator, Union
 
 from ._exceptions import ConfigError
 from . import filesystem
+from ._transfer import TransferJournal, largest_first, run_transfers
 
 
 logger = logging.getLogger("fv3config")
 
+JOURNAL_FILENAME = ".fv3config-journal"
+
+BytesData = Union[bytes, BinaryIO, Iterable[bytes]]
+BytesSource = Union[BytesData, Callable[[], BytesData]]
+
 
 def is_dict_or_list(option):
     return isinstance(option, dict) or isinstance(option, list)
@@ -66,13 +75,21 @@ def get_asset_dict(
 
 
 def get_bytes_asset_dict(
-    data: bytes, target_location: str, target_name: str,
+    data: BytesSource, target_location: str, target_name: str,
 ):
     """Helper function to define the necessary fields for a binary asset to
     be saved at a given location.
 
+    Data other than bytes is streamed to disk in chunks when the asset is
+    written. File-like objects and iterators can only be written once, while a
+    callable is called each time the asset is written. To write a run directory
+    from a configuration containing the asset, which also serializes it into
+    fv3config.yml, the data must be bytes, a callable or a seekable file-like
+    object.
+
     Args:
-        data: the bytes to save
+        data: the bytes to save, a binary file-like object or iterable of bytes
+            chunks to stream, or a callable returning any of these
         target_location: sub-directory to which file will
             be written, relative to run directory root. Defaults to empty
             string (i.e. root of run directory).
@@ -171,20 +188,183 @@ def write_asset(asset, target_directory):
     elif "bytes" in asset:
         logger.debug(f"Writing asset bytes to {target_path}.")
         with open(target_path, "wb") as f:
-            f.write(asset["bytes"])
+            for chunk in iter_bytes(asset["bytes"]):
+                f.write(chunk)
     else:
         raise ConfigError(
             "Cannot write asset. Asset must have either a `copy_method` or `bytes` key."
         )
 
 
+def iter_bytes(data: BytesSource) -> Iterator[bytes]:
+    """Iterate over the data of a bytes asset in chunks"""
+    if callable(data):
+        data = data()
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        yield bytes(data)
+    elif hasattr(data, "read"):
+        while True:
+            chunk = data.read(filesystem.CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        yield from data
+
+
+def iter_bytes_repeatable(data: BytesSource) -> Iterator[bytes]:
+    """Iterate over the data of a bytes asset in chunks without consuming it, so
+    the asset can still be written afterwards.
+
+    A seekable file-like object is returned to its position once read.
+
+    Raises:
+        ConfigError: if the data is an iterator or a file-like object which is
+            not seekable, which can be read only once. This is raised when
+            called, before iterating.
+    """
+    return iter_bytes(repeatable(data))
+
+
+def repeatable(data: BytesSource) -> BytesSource:
+    """Return data of a bytes asset which can be read any number of times.
+
+    A seekable file-like object is replaced by a callable reading it from its
+    current position, which returns it to its position once read.
+
+    Raises:
+        ConfigError: if the data is an iterator or a file-like object which is
+            not seekable, which can be read only once
+    """
+    if callable(data) or isinstance(data, (bytes, bytearray, memoryview)):
+        return data
+    elif hasattr(data, "read") and getattr(data, "seekable", lambda: False)():
+        return functools.partial(_iter_bytes_from, data, data.tell())
+    else:
+        raise ConfigError(
+            f"data of type {type(data).__name__} can be read only once, use a "
+            "callable returning it or a seekable file-like object instead"
+        )
+
+
+def _iter_bytes_from(f, start: int) -> Iterator[bytes]:
+    position = f.tell()
+    try:
+        f.seek(start)
+        yield from iter_bytes(f)
+    finally:
+        f.seek(position)
+
+
+def is_streamed(data) -> bool:
+    """Whether a value is the data of a bytes asset other than bytes"""
+    return (
+        callable(data)
+        or hasattr(data, "read")
+        or isinstance(data, collections.abc.Iterator)
+    )
+
+
+def read_bytes(data: BytesSource) -> bytes:
+    """Return the data of a bytes asset in memory"""
+    if isinstance(data, bytes):
+        return data
+    return b"".join(iter_bytes(data))
+
+
+def _target_path(asset):
+    return os.path.normpath(
+        os.path.join(asset["target_location"], asset["target_name"])
+    )
+
+
+def _without_overridden_assets(asset_list):
+    """Drop assets whose target is written again by a later asset"""
+    last_index = {_target_path(asset): i for i, asset in enumerate(asset_list)}
+    return [
+        asset
+        for i, asset in enumerate(asset_list)
+        if last_index[_target_path(asset)] == i
+    ]
+
+
+def write_asset_list(asset_list, target_directory):
+    """Write all files represented by an asset list to target_directory.
+
+    Copied files are recorded in a journal in the target directory as they
+    complete. If writing is interrupted, calling this again with the same asset
+    list only copies the files which were not completed, and removes the
+    temporary files of the interrupted copies. The journal is removed once every
+    asset has been written.
+
+    Copies run concurrently under an adaptive concurrency limit, see
+    :py:func:`fv3config.filesystem.set_transfer_concurrency`, and start largest
+    first where sizes are known without further requests, see
+    :py:func:`fv3config.filesystem.known_size`.
+
+    Args:
+        asset_list (list): a list of asset dicts, later assets take precedence
+            over earlier assets with the same target
+        target_directory (str): path to a directory in which all files will be
+            written
+    """
+    os.makedirs(target_directory, exist_ok=True)
+    journal = TransferJournal(os.path.join(target_directory, JOURNAL_FILENAME))
+    copies = []
+    for asset in _without_overridden_assets(asset_list):
+        if asset.get("copy_method") == "copy":
+            copies.append(asset)
+        else:
+            # links, directories and in-memory data are cheap to write again
+            write_asset(asset, target_directory)
+    # left by an interrupted write, and not overwritten by this one
+    filesystem._remove_temporary_files(
+        os.path.join(target_directory, _target_path(asset)) for asset in copies
+    )
+    copies = largest_first(copies, [_known_source_size(asset) for asset in copies])
+    run_transfers(
+        functools.partial(_write_asset_journaled, asset, target_directory, journal)
+        for asset in copies
+    )
+    journal.remove()
+
+
+def _known_source_size(asset):
+    if "source_size" in asset:
+        return asset["source_size"]
+    return filesystem.known_size(
+        os.path.join(asset["source_location"], asset["source_name"])
+    )
+
+
+def _write_asset_journaled(asset, target_directory, journal):
+    """Copy an asset unless the journal records it as written, returning the
+    number of bytes copied"""
+    key = _target_path(asset)
+    source = os.path.join(asset["source_location"], asset["source_name"])
+    target_path = os.path.join(target_directory, key)
+    recorded = journal.get(key)
+    if (
+        recorded is not None
+        and recorded["source"] == source
+        and os.path.isfile(target_path)
+        and os.path.getsize(target_path) == recorded["size"]
+    ):
+        logger.debug(f"Skipping {target_path}, already written.")
+        return 0
+    write_asset(asset, target_directory)
+    size = os.path.getsize(target_path)
+    journal.record(key, source=source, size=size)
+    return size
+
+
 def copy_file_asset(asset, target_path):
     check_asset_has_required_keys(asset)
     source_path = os.path.join(asset["source_location"], asset["source_name"])
     copy_method = asset["copy_method"]
     if copy_method == "copy":
         logger.debug(f"Copying asset from {source_path} to {target_path}.")
-        filesystem.get_file(source_path, target_path)
+        filesystem.get_file(source_path, target_path, size=asset.get("source_size"))
     elif copy_method == "link":
         logger.debug(f"Linking asset from {source_path} to {target_path}.")
         link_file(source_path, target_path)
@@ -1,8 +1,9 @@
 """Routines for converting an fv3config dict into a list of assets
 
 """
-import io
+import collections
 import os
+from typing import Mapping
 
 from ._datastore import (
     get_orographic_forcing_directory,
@@ -16,10 +17,12 @@ from fv3config._datastore import (
 from .config.diag_table import DiagTable
 from .config.namelist import config_to_namelist
 from .config.derive import get_time_configuration
-from .config._serialization import dump
+from .config._serialization import YamlDocument
 from .config.nudging import enable_nudging
+from .config.fingerprint import generation
 from fv3config.config.initial_conditions import get_initial_conditions_asset_list
 from . import filesystem
+from . import _render_cache
 from ._asset_list import (
     is_dict_or_list,
     ensure_is_list,
@@ -29,7 +32,7 @@ from ._asset_list import (
     get_directory_asset_dict,
     asset_list_from_path,
 )
-from ._tables import update_diag_table_for_config
+from ._tables import stream_diag_table_for_config
 
 FV3CONFIG_YML_NAME = "fv3config.yml"
 
@@ -73,6 +76,38 @@ def get_diag_table_asset(config):
     return get_bytes_asset_dict(data, ".", "diag_table")
 
 
+def _diag_table_bytes(config, base_date) -> bytes:
+    """Return the diag_table of a run directory, from the render cache unless it
+    is a file whose version is unknown"""
+    key_data = _diag_table_key_data(config, base_date)
+    if key_data is None:
+        return _render_diag_table(config, base_date)
+    return _render_cache.rendered(
+        "diag_table", key_data, lambda: _render_diag_table(config, base_date)
+    )
+
+
+def _render_diag_table(config, base_date) -> bytes:
+    data = get_diag_table_asset(config)["bytes"]
+    return b"".join(stream_diag_table_for_config(config, base_date, [data]))
+
+
+def _diag_table_key_data(config, base_date):
+    diag_table = config["diag_table"]
+    if not isinstance(diag_table, DiagTable):
+        filename = get_diag_table_filename(config)
+        info = filesystem.info(filename)
+        version = None if info is None else generation(info)
+        if version is None:
+            return None
+        diag_table = [filename, version]
+    return {
+        "experiment_name": config.get("experiment_name"),
+        "base_date": list(base_date),
+        "diag_table": diag_table,
+    }
+
+
 def get_field_table_asset(config):
     """Return asset for field_table"""
     field_table_filename = get_field_table_filename(config)
@@ -81,13 +116,21 @@ def get_field_table_asset(config):
 
 
 def get_fv3config_yaml_asset(config):
-    """An asset containing this configuration"""
-    f = io.StringIO()
-    dump(config, f)
+    """An asset containing this configuration.
+
+    If the configuration contains streamed or large binary data, the asset
+    streams the yaml when written rather than holding it in memory, and it is
+    not kept in the render cache.
+    """
+    document = YamlDocument(config)
+    if document.has_payloads:
+        data = document.iter_bytes
+    else:
+        data = _render_cache.rendered(
+            FV3CONFIG_YML_NAME, config, lambda: b"".join(document.iter_bytes())
+        )
     return get_bytes_asset_dict(
-        bytes(f.getvalue(), "UTF-8"),
-        target_location=".",
-        target_name=FV3CONFIG_YML_NAME,
+        data, target_location=".", target_name=FV3CONFIG_YML_NAME,
     )
 
 
@@ -102,11 +145,11 @@ def _config_to_asset_generator(config):
     yield from get_patch_file_assets(config)
     yield get_field_table_asset(config)
 
-    contents_b = get_diag_table_asset(config)["bytes"]
     base_date, _ = get_time_configuration(config)
-    new_contents = update_diag_table_for_config(config, base_date, contents_b.decode())
     yield get_bytes_asset_dict(
-        new_contents.encode(), target_location=".", target_name="diag_table"
+        _diag_table_bytes(config, base_date),
+        target_location=".",
+        target_name="diag_table",
     )
     yield get_data_table_asset(config)
     yield get_fv3config_yaml_asset(config)
@@ -118,11 +161,31 @@ def _config_to_asset_generator(config):
 
 def config_to_asset_list(config):
     """Convert a configuration dictionary to an asset list. The asset list
-    will contain all files for the run directory except the namelist."""
-    return list(_config_to_asset_generator(config))
+    will contain all files for the run directory except the namelist.
+
+    Stat results of remote paths are memoized while the list is built.
+    """
+    with filesystem.metadata_cache():
+        return list(_config_to_asset_generator(config))
 
 
 def get_namelist_asset(config):
-    text = config_to_namelist(config)
-    data = text.encode()
+    namelist = config["namelist"]
+    # the fingerprint does not depend on key order, while input.nml follows the
+    # order of ordered dictionaries
+    key_data = {"namelist": namelist, "order": _key_order(namelist)}
+    data = _render_cache.rendered(
+        "input.nml", key_data, lambda: config_to_namelist(config).encode()
+    )
     return get_bytes_asset_dict(data, target_location="", target_name="input.nml")
+
+
+def _key_order(value):
+    if isinstance(value, collections.OrderedDict):
+        return [[key, _key_order(item)] for key, item in value.items()]
+    elif isinstance(value, Mapping):
+        return {key: _key_order(item) for key, item in value.items()}
+    elif isinstance(value, list):
+        return [_key_order(item) for item in value]
+    else:
+        return None
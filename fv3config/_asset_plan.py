@@ -0,0 +1,149 @@
+"""Asset plans
+
+An asset plan is the fully resolved asset list of a configuration, including the
+rendered input.nml, diag_table and fv3config.yml. It can be serialized to a
+compact file, so that a configuration can be resolved once and used to write
+many run directories without any further metadata requests.
+"""
+import base64
+import dataclasses
+import gzip
+import io
+import json
+import os
+import types
+from typing import Mapping, Tuple, Union
+
+from ._asset_list import write_asset_list, read_bytes
+from ._asset_list_config import config_to_asset_list
+from .config.preflight import check_config
+from ._exceptions import ConfigError
+from . import filesystem
+
+PLAN_FORMAT_VERSION = 1
+_BYTES_KEY = "bytes_base64"
+
+
+@dataclasses.dataclass(frozen=True)
+class AssetPlan:
+    """A frozen, fully resolved asset list.
+
+    Streamed or lazily evaluated data of bytes assets is read into memory when
+    the plan is created. Copied remote files of known size have a
+    ``"source_size"`` key, so the plan is written without metadata requests.
+
+    Args:
+        assets: the asset dicts to write, in order
+    """
+
+    assets: Tuple[Mapping, ...]
+
+    def __post_init__(self):
+        frozen = tuple(
+            types.MappingProxyType(_materialized(asset)) for asset in self.assets
+        )
+        object.__setattr__(self, "assets", frozen)
+
+    def dumps(self) -> bytes:
+        """Serialize the plan to gzip-compressed bytes"""
+        serialized = {
+            "version": PLAN_FORMAT_VERSION,
+            "assets": [_encode_asset(asset) for asset in self.assets],
+        }
+        text = json.dumps(serialized, separators=(",", ":"))
+        buffer = io.BytesIO()
+        # gzip.compress only takes mtime from Python 3.8
+        with gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) as f:
+            f.write(text.encode())
+        return buffer.getvalue()
+
+    @classmethod
+    def loads(cls, data: bytes) -> "AssetPlan":
+        """Load a plan serialized by :py:meth:`AssetPlan.dumps`"""
+        serialized = json.loads(gzip.decompress(data).decode())
+        if serialized.get("version") != PLAN_FORMAT_VERSION:
+            raise ConfigError(
+                f"asset plan has format version {serialized.get('version')}, "
+                f"expected {PLAN_FORMAT_VERSION}"
+            )
+        return cls(tuple(_decode_asset(asset) for asset in serialized["assets"]))
+
+    def dump(self, location: str):
+        """Write the plan to a local or remote location"""
+        with filesystem.open(location, "wb") as f:
+            f.write(self.dumps())
+
+    @classmethod
+    def load(cls, location: str) -> "AssetPlan":
+        """Read a plan from a local or remote location"""
+        with filesystem.open(location, "rb") as f:
+            return cls.loads(f.read())
+
+
+def _materialized(asset):
+    asset = dict(asset)
+    if "bytes" in asset:
+        asset["bytes"] = read_bytes(asset["bytes"])
+    return asset
+
+
+def _encode_asset(asset):
+    encoded = dict(asset)
+    if "bytes" in encoded:
+        encoded[_BYTES_KEY] = base64.b64encode(encoded.pop("bytes")).decode()
+    return encoded
+
+
+def _decode_asset(asset):
+    decoded = dict(asset)
+    if _BYTES_KEY in decoded:
+        decoded["bytes"] = base64.b64decode(decoded.pop(_BYTES_KEY))
+    return decoded
+
+
+def compile_config(config) -> AssetPlan:
+    """Resolve a configuration dictionary into a frozen asset plan.
+
+    All remote metadata needed by the configuration (directory listings,
+    coupler.res dates, diag_table contents, sizes of copied files) is read
+    once here.
+
+    Args:
+        config (dict): a configuration dictionary
+
+    Returns:
+        AssetPlan: the resolved assets of the run directory
+
+    Raises:
+        ConfigError: listing every problem found by
+            :py:func:`fv3config.validate_config`
+    """
+    with filesystem.metadata_cache():
+        check_config(config)
+        return AssetPlan(
+            tuple(_with_source_size(asset) for asset in config_to_asset_list(config))
+        )
+
+
+def _with_source_size(asset):
+    if asset.get("copy_method") != "copy":
+        return asset
+    source = os.path.join(asset["source_location"], asset["source_name"])
+    if filesystem.is_local_path(source):
+        return asset
+    source_info = filesystem.info(source)
+    if source_info is None or source_info["type"] != "file":
+        return asset
+    return {**asset, "source_size": source_info["size"]}
+
+
+def write_run_directory_from_plan(plan: Union[AssetPlan, str], target_directory: str):
+    """Write a run directory from an asset plan.
+
+    Args:
+        plan: an asset plan, or the local or remote location of a serialized plan
+        target_directory: target directory, will be created if it does not exist
+    """
+    if not isinstance(plan, AssetPlan):
+        plan = AssetPlan.load(plan)
+    write_asset_list(plan.assets, target_directory)
@@ -0,0 +1,135 @@
+"""Cache bundles
+
+A cache bundle is an uncompressed tar stream holding the cached remote files
+needed by one or more configurations, together with the directory listings
+recorded for them in the cache index. Importing a bundle into a fresh cache
+makes those configurations usable without downloading any file, including in
+offline mode.
+"""
+import logging
+import os
+import pathlib
+import tarfile
+from typing import BinaryIO, Iterable, Set
+
+from . import caching, filesystem
+from ._asset_list_config import config_to_asset_list
+from ._datastore import get_diag_table_filename
+from ._exceptions import ConfigError
+from .config.diag_table import DiagTable
+
+logger = logging.getLogger("fv3config")
+
+
+def _remote_sources(config) -> Set[str]:
+    """Return the remote files which a configuration copies or reads"""
+    sources = set()
+    for asset in config_to_asset_list(config):
+        if asset.get("copy_method") in ("copy", "link"):
+            source = os.path.join(asset["source_location"], asset["source_name"])
+            if not filesystem.is_local_path(source):
+                sources.add(source)
+    if not isinstance(config["diag_table"], DiagTable):
+        diag_table_filename = get_diag_table_filename(config)
+        if not filesystem.is_local_path(diag_table_filename):
+            sources.add(diag_table_filename)
+    return sources
+
+
+def _listing_arcnames(source: str):
+    """Yield the cache index entries for the directories containing a source"""
+    index_dir = caching.get_internal_index_dir()
+    subpath = filesystem._get_cache_subpath(source)
+    # skip the abs/rel label and the protocol
+    for parent in list(subpath.parents)[:-3]:
+        listing = os.path.join(index_dir, parent, filesystem.LISTING_FILENAME)
+        if os.path.isfile(listing):
+            yield listing, (
+                pathlib.PurePosixPath(caching.INDEX_PREFIX)
+                / parent
+                / filesystem.LISTING_FILENAME
+            ).as_posix()
+
+
+def export_cache_bundle(configs: Iterable, fileobj: BinaryIO) -> int:
+    """Write the cached files needed by configurations to a tar stream.
+
+    Files which are not yet cached are downloaded into the cache first.
+
+    Args:
+        configs: configuration dictionaries
+        fileobj: binary file-like object to write the bundle to, written
+            sequentially
+
+    Returns:
+        the number of cached files in the bundle
+    """
+    sources = set()
+    for config in configs:
+        sources |= _remote_sources(config)
+    listings = {}
+    for source in sources:
+        listings.update(dict(_listing_arcnames(source)))
+    with tarfile.open(fileobj=fileobj, mode="w|") as tar:
+        for source in sorted(sources):
+            cache_location = filesystem._ensure_cached(source)
+            arcname = pathlib.PurePosixPath(
+                caching.CACHE_PREFIX
+            ) / filesystem._get_cache_subpath(source)
+            logger.debug(f"Adding {source} to cache bundle")
+            tar.add(cache_location, arcname=arcname.as_posix())
+        for listing, arcname in sorted(listings.items()):
+            tar.add(listing, arcname=arcname)
+    return len(sources)
+
+
+def _is_safe_member(member: tarfile.TarInfo) -> bool:
+    path = pathlib.PurePosixPath(member.name)
+    return (
+        member.isfile()
+        and not path.is_absolute()
+        and ".." not in path.parts
+        and path.parts[0] in (caching.CACHE_PREFIX, caching.INDEX_PREFIX)
+    )
+
+
+def import_cache_bundle(fileobj: BinaryIO) -> int:
+    """Read a bundle written by :py:func:`export_cache_bundle` into the cache.
+
+    Cached files are added to the first cache tier like downloaded files, so
+    they count towards its budget and are copied to the slower tiers, see
+    :py:func:`fv3config.caching.set_cache_tiers`.
+
+    Args:
+        fileobj: binary file-like object containing the bundle, read
+            sequentially
+
+    Returns:
+        the number of cached files imported
+
+    Raises:
+        ConfigError: if the bundle contains a member outside of the cache
+    """
+    n_files = 0
+    cache_root = caching.get_cache_dir()
+    with tarfile.open(fileobj=fileobj, mode="r|") as tar:
+        for member in tar:
+            if not _is_safe_member(member):
+                raise ConfigError(f"invalid cache bundle member {member.name}")
+            prefix, *parts = pathlib.PurePosixPath(member.name).parts
+            target = os.path.join(cache_root, prefix, *parts)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            temporary_target = filesystem._temporary_filename(target)
+            with open(temporary_target, "wb") as f:
+                source = tar.extractfile(member)
+                while True:
+                    chunk = source.read(filesystem.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+            if prefix == caching.CACHE_PREFIX:
+                caching.commit_to_cache(temporary_target, "/".join(parts))
+                n_files += 1
+            else:
+                os.replace(temporary_target, target)
+    return n_files
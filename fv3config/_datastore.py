@@ -54,9 +54,8 @@ def get_orographic_forcing_directory(config):
     parent_dirname = config["orographic_forcing"]
     ensure_exists(parent_dirname, "orographic_forcing")
     dirname = os.path.join(parent_dirname, resolution)
-    fs = filesystem.get_fs(dirname)
-    if not fs.isdir(dirname):
-        valid_options = fs.listdir(parent_dirname)
+    if not filesystem.isdir(dirname):
+        valid_options = filesystem.get_fs(dirname).listdir(parent_dirname)
         raise ConfigError(
             f"resolution {resolution} orographic forcing is not present at {dirname},"
             f" valid options are {valid_options}"
@@ -106,7 +105,7 @@ def resolve_option(option, built_in_options_dict):
                      option is not in default_options_dict
     """
     if filesystem.isabs(option):
-        if filesystem.get_fs(option).exists(option):
+        if filesystem.exists(option):
             return option
         else:
             raise ConfigError(f"The provided path {option} does not exist.")
@@ -149,9 +148,9 @@ def get_microphysics_name(config):
 
 def _return_or_infer_field_table_filename(config, field_table):
     """Return or infer the field_table filename based on the config"""
-    if filesystem.get_fs(field_table).isfile(field_table):
+    if filesystem.isfile(field_table):
         return field_table
-    elif filesystem.get_fs(field_table).isdir(field_table):
+    elif filesystem.isdir(field_table):
         return _infer_field_table_filename(config, field_table)
     else:
         return field_table
@@ -4,6 +4,12 @@ class InvalidFileError(FileNotFoundError):
     pass
 
 
+class OfflineError(FileNotFoundError):
+    """Raised in offline mode when a remote path is not available from the cache."""
+
+    pass
+
+
 class ConfigError(ValueError):
     pass
 
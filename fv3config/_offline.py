@@ -0,0 +1,127 @@
+"""Read-only filesystem serving remote paths from the local cache
+
+Used in offline mode, where listings come from the snapshots recorded in the
+cache index while online, and reads come from the cached files.
+"""
+import os
+import shutil
+
+import fsspec
+
+from . import caching, filesystem
+from ._exceptions import OfflineError
+
+
+class OfflineFileSystem(fsspec.AbstractFileSystem):
+    """Read-only filesystem answering requests for remote paths of one protocol
+    from the fv3config cache.
+
+    Args:
+        remote_protocol: the protocol of the remote paths, e.g. "gs"
+    """
+
+    cachable = False
+
+    def __init__(self, remote_protocol: str, **kwargs):
+        super().__init__(**kwargs)
+        self.remote_protocol = remote_protocol
+        self._remote_class = fsspec.get_filesystem_class(remote_protocol)
+
+    def _strip_protocol(self, path):
+        return self._remote_class._strip_protocol(path)
+
+    def _url(self, path: str) -> str:
+        return filesystem._normalize_url(
+            self.remote_protocol, self._strip_protocol(path)
+        )
+
+    def _cache_subpaths(self, path: str):
+        # files are cached under the url they were requested with, which for
+        # some filesystems differs from the normalized url
+        candidates = [self._url(path)]
+        if filesystem._get_protocol_prefix(path):
+            candidates.append(path)
+        return [filesystem._get_cache_subpath(url).as_posix() for url in candidates]
+
+    def _cached_file(self, path: str):
+        for subpath in self._cache_subpaths(path):
+            cache_filename = caching.lookup_cached(subpath)
+            if cache_filename is not None:
+                return cache_filename
+        return None
+
+    def _cached_dir(self, path: str):
+        for subpath in self._cache_subpaths(path):
+            for tier in caching.get_cache_tiers():
+                dirname = os.path.join(tier.internal_dir, subpath)
+                if os.path.isdir(dirname):
+                    return dirname
+        return None
+
+    def _missing(self, path: str) -> OfflineError:
+        return OfflineError(f"{path} is not available in the fv3config cache (offline)")
+
+    def info(self, path, **kwargs):
+        name = self._strip_protocol(path)
+        url = self._url(path)
+        cached_file = self._cached_file(path)
+        if cached_file is not None:
+            return {"name": name, "type": "file", "size": os.path.getsize(cached_file)}
+        if filesystem._read_listing_snapshot(url) is not None:
+            return {"name": name, "type": "directory", "size": 0}
+        parent, basename = url.rsplit("/", 1)
+        parent_listing = filesystem._read_listing_snapshot(parent)
+        if parent_listing is not None and basename in parent_listing:
+            return dict(parent_listing[basename])
+        if self._cached_dir(path) is not None:
+            return {"name": name, "type": "directory", "size": 0}
+        raise self._missing(path)
+
+    def ls(self, path, detail=True, **kwargs):
+        name = self._strip_protocol(path).rstrip("/")
+        listing = filesystem._read_listing_snapshot(self._url(path))
+        if listing is not None:
+            entries = list(listing.values())
+        else:
+            cached_dir = self._cached_dir(path)
+            if cached_dir is None:
+                raise self._missing(path)
+            entries = []
+            for child in sorted(os.listdir(cached_dir)):
+                child_path = os.path.join(cached_dir, child)
+                entries.append(
+                    {
+                        "name": f"{name}/{child}",
+                        "type": "directory" if os.path.isdir(child_path) else "file",
+                        "size": os.path.getsize(child_path),
+                    }
+                )
+        if detail:
+            return entries
+        else:
+            return [entry["name"] for entry in entries]
+
+    def _open(self, path, mode="rb", **kwargs):
+        if "r" not in mode:
+            raise OfflineError(f"cannot open {path} for writing in offline mode")
+        cached_file = self._cached_file(path)
+        if cached_file is None:
+            raise self._missing(path)
+        return open(cached_file, mode)
+
+    def cat_file(self, path, start=None, end=None, **kwargs):
+        with self.open(path, "rb") as f:
+            if start is not None:
+                f.seek(start)
+            return f.read() if end is None else f.read(end - (start or 0))
+
+    def get(self, rpath, lpath, **kwargs):
+        cached_file = self._cached_file(rpath)
+        if cached_file is None:
+            raise self._missing(rpath)
+        shutil.copyfile(cached_file, lpath)
+
+    def _read_only(self, *args, **kwargs):
+        raise OfflineError("cannot modify remote paths in offline mode")
+
+    put = put_file = pipe_file = rm = rm_file = mkdir = makedirs = _read_only
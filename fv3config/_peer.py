@@ -0,0 +1,155 @@
+"""Peer cache over HTTP
+
+``fv3config cache serve`` exposes the local cache of a node over HTTP, with
+support for range requests. Clients consult the configured peers, in order,
+before downloading a file from its origin, and fall back to the origin if no
+peer has the file.
+"""
+import http.server
+import logging
+import os
+import re
+import shutil
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from . import caching
+
+logger = logging.getLogger("fv3config")
+
+PEER_TIMEOUT = 10.0
+_CHUNK_SIZE = 2 ** 20
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _parse_range(header: str, size: int):
+    """Return the inclusive (start, end) byte range requested by a Range header,
+    or None if the range cannot be satisfied."""
+    match = _RANGE_PATTERN.match(header.strip())
+    if match is None:
+        return None
+    start, end = match.groups()
+    if start == "" and end == "":
+        return None
+    elif start == "":
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = size - 1 if end == "" else min(int(end), size - 1)
+    if start > end or start >= size:
+        return None
+    return start, end
+
+
+class CacheRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serves files from the fv3config cache at their path relative to the
+    cache root, e.g. ``/rel/gs/bucket/path/file.nc``."""
+
+    def _cache_filename(self):
+        path = urllib.parse.unquote(urllib.parse.urlparse(self.path).path)
+        cache_dir = os.path.realpath(self.server.cache_dir)
+        filename = os.path.realpath(os.path.join(cache_dir, path.lstrip("/")))
+        if os.path.commonpath([cache_dir, filename]) != cache_dir:
+            return None
+        elif not os.path.isfile(filename):
+            return None
+        return filename
+
+    def _send_headers(self):
+        filename = self._cache_filename()
+        if filename is None:
+            self.send_error(404)
+            return None, None
+        size = os.path.getsize(filename)
+        byte_range = None
+        if "Range" in self.headers:
+            byte_range = _parse_range(self.headers["Range"], size)
+            if byte_range is None:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return None, None
+            start, end = byte_range
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            start, end = 0, size - 1
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        return filename, (start, end)
+
+    def do_HEAD(self):
+        self._send_headers()
+
+    def do_GET(self):
+        filename, byte_range = self._send_headers()
+        if filename is None:
+            return
+        start, end = byte_range
+        remaining = end - start + 1
+        with open(filename, "rb") as f:
+            f.seek(start)
+            while remaining > 0:
+                chunk = f.read(min(_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_cache_server(host: str = "", port: int = 8000, cache_dir: str = None):
+    """Return an HTTP server exposing a cache. Call ``serve_forever`` on the
+    result to start serving.
+
+    Args:
+        host: address to bind to, by default all interfaces
+        port: port to listen on, or 0 to pick a free port
+        cache_dir: internal cache directory to serve, by default the current one
+    """
+    server = http.server.ThreadingHTTPServer((host, port), CacheRequestHandler)
+    server.cache_dir = cache_dir or caching.get_internal_cache_dir()
+    return server
+
+
+def fetch_from_peers(cache_subpath: str, target_filename: str) -> bool:
+    """Try to download a file from the configured peers.
+
+    Args:
+        cache_subpath: location of the file relative to the cache root
+        target_filename: local filename to write
+
+    Returns:
+        True if a peer provided the file, False otherwise
+    """
+    for peer in caching.CACHE_PEERS:
+        url = peer.rstrip("/") + "/" + urllib.parse.quote(cache_subpath)
+        try:
+            _download(url, target_filename)
+        except (urllib.error.URLError, OSError, ValueError) as err:
+            logger.debug(f"peer {peer} could not provide {cache_subpath}: {err}")
+            if os.path.exists(target_filename):
+                os.remove(target_filename)
+        else:
+            logger.debug(f"fetched {cache_subpath} from peer {peer}")
+            return True
+    return False
+
+
+def _download(url: str, target_filename: str):
+    with urllib.request.urlopen(url, timeout=PEER_TIMEOUT) as response:
+        # the length is unknown for chunked responses
+        content_length = response.headers.get("Content-Length")
+        expected_size = None if content_length is None else int(content_length)
+        with open(target_filename, "wb") as f:
+            shutil.copyfileobj(response, f, _CHUNK_SIZE)
+    size = os.path.getsize(target_filename)
+    if expected_size is not None and size != expected_size:
+        raise ValueError(f"received {size} of {expected_size} bytes from {url}")
@@ -0,0 +1,95 @@
+"""Cache of files rendered from configurations, such as input.nml"""
+import collections
+import logging
+import os
+import threading
+from typing import Any, Callable, Tuple
+
+from . import caching
+from . import filesystem
+from .config.fingerprint import serialized_fingerprint
+
+logger = logging.getLogger("fv3config")
+
+_RENDERED = collections.OrderedDict()
+_RENDERED_BYTES = 0
+_RENDERED_LOCK = threading.Lock()
+
+
+def rendered(kind: str, key_data: Any, render: Callable[[], bytes]) -> bytes:
+    """Return a rendered file, from the cache if it was rendered before.
+
+    Rendered files are kept in memory, least recently used first out, up to a
+    number of files and a total size, and in the cache directory, see
+    :py:func:`fv3config.caching.set_render_cache`.
+
+    Args:
+        kind: name of the rendered file, such as "input.nml"
+        key_data: all of the configuration the rendered file depends on
+        render: function rendering the file
+    """
+    digest = serialized_fingerprint(key_data)
+    key = (kind, digest)
+    with _RENDERED_LOCK:
+        if key in _RENDERED:
+            _RENDERED.move_to_end(key)
+            return _RENDERED[key]
+    filename = os.path.join(
+        caching.get_internal_rendered_dir(), _version(), kind, digest[:2], digest
+    )
+    data = None
+    if caching.RENDER_CACHE_ON_DISK:
+        try:
+            with open(filename, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            pass
+    if data is None:
+        data = render()
+        if caching.RENDER_CACHE_ON_DISK:
+            _write(filename, data)
+    _remember(key, data)
+    return data
+
+
+def _version() -> str:
+    # files rendered by another version of fv3config may differ
+    from . import __version__
+
+    return __version__
+
+
+def _write(filename: str, data: bytes):
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        temporary_filename = filesystem._temporary_filename(filename)
+        with open(temporary_filename, "wb") as f:
+            f.write(data)
+        os.replace(temporary_filename, filename)
+    except OSError as err:
+        logger.warning(f"could not cache rendered file {filename}: {err}")
+
+
+def _remember(key: Tuple[str, str], data: bytes):
+    global _RENDERED_BYTES
+    if len(data) > caching.RENDER_CACHE_MAX_BYTES:
+        return
+    with _RENDERED_LOCK:
+        if key in _RENDERED:
+            _RENDERED_BYTES -= len(_RENDERED.pop(key))
+        _RENDERED[key] = data
+        _RENDERED_BYTES += len(data)
+        while (
+            len(_RENDERED) > caching.RENDER_CACHE_MAX_ENTRIES
+            or _RENDERED_BYTES > caching.RENDER_CACHE_MAX_BYTES
+        ):
+            _, evicted = _RENDERED.popitem(last=False)
+            _RENDERED_BYTES -= len(evicted)
+
+
+def clear_render_cache():
+    """Forget the rendered files kept in memory"""
+    global _RENDERED_BYTES
+    with _RENDERED_LOCK:
+        _RENDERED.clear()
+        _RENDERED_BYTES = 0
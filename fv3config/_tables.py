@@ -1,4 +1,5 @@
 import os
+from typing import Iterable, Iterator
 from ._exceptions import ConfigError
 
 package_directory = os.path.dirname(os.path.realpath(__file__))
@@ -16,7 +17,40 @@ def update_diag_table_for_config(config, base_date, diag_table_contents: str):
     if "experiment_name" not in config:
         raise ConfigError("config dictionary must have a 'experiment_name' key")
 
-    lines = diag_table_contents.splitlines()
+    lines = diag_table_contents.splitlines(keepends=True)
     lines[0] = config["experiment_name"] + "\n"
     lines[1] = " ".join([str(x) for x in base_date]) + "\n"
     return "".join(lines)
+
+
+def stream_diag_table_for_config(
+    config, base_date, chunks: Iterable[bytes]
+) -> Iterator[bytes]:
+    """Re-write the first two lines of streamed diag_table contents with
+    experiment_name and base_date from config dictionary.
+
+    Args:
+        config (dict): a configuration dictionary
+        base_date (list): a list of 6 integers representing base_date
+        chunks: the contents of the diag table file, in chunks
+    """
+    if "experiment_name" not in config:
+        raise ConfigError("config dictionary must have a 'experiment_name' key")
+    header = (
+        config["experiment_name"] + "\n" + " ".join([str(x) for x in base_date]) + "\n"
+    )
+    yield header.encode()
+    chunks = iter(chunks)
+    buffer = b""
+    n_skipped = 0
+    for chunk in chunks:
+        buffer += chunk
+        while n_skipped < 2 and b"\n" in buffer:
+            buffer = buffer[buffer.index(b"\n") + 1 :]
+            n_skipped += 1
+        if n_skipped == 2:
+            break
+    if n_skipped == 2:
+        if buffer:
+            yield buffer
+        yield from chunks
@@ -0,0 +1,482 @@
+"""Transfer layer
+
+Routines moving file contents between fsspec filesystems and local disk, used
+by :py:mod:`fv3config.filesystem`.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from typing import Callable, Iterable, List, Mapping, Optional, Tuple
+
+import fsspec
+
+logger = logging.getLogger("fv3config")
+
+RETRY_ATTEMPTS = 5
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+ADAPTIVE_INITIAL_CONCURRENCY = 8
+ADAPTIVE_MAX_CONCURRENCY = 64
+# function told of the errors retried by the running transfer, and of the time
+# each failed attempt started
+_ERROR_LISTENER: contextvars.ContextVar = contextvars.ContextVar(
+    "fv3config_error_listener", default=None
+)
+_PERMANENT_ERRORS = (
+    FileNotFoundError,
+    FileExistsError,
+    PermissionError,
+    IsADirectoryError,
+    NotADirectoryError,
+)
+
+
+def is_transient(err: Exception) -> bool:
+    """Whether an error from a transfer may succeed if retried"""
+    status = getattr(err, "code", None) or getattr(err, "status", None)
+    if isinstance(status, int) and status >= 400:
+        return status in (408, 429) or status >= 500
+    elif isinstance(err, _PERMANENT_ERRORS):
+        return False
+    else:
+        return isinstance(err, (OSError, TimeoutError))
+
+
+def retry(func, *args, **kwargs):
+    """Call a function, retrying transient errors with exponential backoff and
+    full jitter.
+
+    The number of attempts and the delays are set by the module-level
+    ``RETRY_ATTEMPTS``, ``RETRY_BASE_DELAY`` and ``RETRY_MAX_DELAY``.
+    """
+    for attempt in range(RETRY_ATTEMPTS):
+        started = time.monotonic()
+        try:
+            return func(*args, **kwargs)
+        except Exception as err:
+            listener = _ERROR_LISTENER.get()
+            if listener is not None:
+                listener(err, started)
+            if attempt == RETRY_ATTEMPTS - 1 or not is_transient(err):
+                raise
+            delay = random.uniform(
+                0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+            )
+            logger.warning(
+                f"{getattr(func, '__name__', func)} failed with {err!r}, "
+                f"retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+
+class TransferJournal:
+    """Append-only record of completed transfer work, persisted to a local file
+    so that an interrupted transfer can resume where it stopped.
+
+    Args:
+        filename: local file holding the journal, created on the first record
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._entries = {}
+        if os.path.isfile(filename):
+            with open(filename, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # line truncated by an interruption
+                    self._entries[entry.pop("key")] = entry
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Optional[Mapping]:
+        return self._entries.get(key)
+
+    def record(self, key: str, **info):
+        """Durably record that the work identified by key is complete"""
+        with self._lock:
+            self._entries[key] = info
+            with open(self.filename, "a") as f:
+                f.write(json.dumps({"key": key, **info}) + "\n")
+
+    def remove(self):
+        """Delete the journal, e.g. once all work is complete"""
+        with self._lock:
+            self._entries.clear()
+            if os.path.exists(self.filename):
+                os.remove(self.filename)
+
+
+def get_byte_ranges(size: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """Split an object of a given size into [start, end) byte ranges"""
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, was given {chunk_size}")
+    return [
+        (start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)
+    ]
+
+
+def _preallocate(filename: str, size: int):
+    with open(filename, "wb") as f:
+        f.truncate(size)
+    if hasattr(os, "posix_fallocate") and size > 0:
+        fd = os.open(filename, os.O_WRONLY)
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except OSError:
+            pass  # not supported by every local filesystem, truncate suffices
+        finally:
+            os.close(fd)
+
+
+def download_ranges(
+    fs: fsspec.AbstractFileSystem,
+    source: str,
+    target: str,
+    size: int,
+    chunk_size: int,
+    max_workers: int,
+    journal: TransferJournal = None,
+):
+    """Download an object with concurrent byte-range requests.
+
+    The ranges are written directly at their offset in a preallocated local file.
+    Each range request is retried on transient errors.
+
+    Args:
+        fs: filesystem of the source
+        source: location of the object
+        target: local filename to write
+        size: size of the object in bytes
+        chunk_size: size of each range request in bytes
+        max_workers: maximum number of concurrent range requests
+        journal (optional): journal recording completed ranges. If given and it
+            matches the source and target, only ranges not yet recorded are
+            downloaded.
+    """
+    ranges = get_byte_ranges(size, chunk_size)
+    header = {"source": source, "size": size}
+    if journal is None:
+        journal = _NullJournal()
+    resumable = (
+        journal.get("object") == header
+        and os.path.isfile(target)
+        and os.path.getsize(target) == size
+    )
+    if not resumable:
+        journal.remove()
+        _preallocate(target, size)
+        journal.record("object", **header)
+    pending = [r for r in ranges if _range_key(r) not in journal]
+    logger.debug(f"Downloading {source} in {len(pending)} of {len(ranges)} byte ranges")
+    fd = os.open(target, os.O_WRONLY)
+    try:
+
+        def fetch(byte_range):
+            start, end = byte_range
+            data = retry(fs.cat_file, source, start=start, end=end)
+            if len(data) != end - start:
+                raise IOError(
+                    f"expected {end - start} bytes from {source} at offset {start}, "
+                    f"received {len(data)}"
+                )
+            throttle(len(data))
+            os.pwrite(fd, data, start)
+            journal.record(_range_key(byte_range))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # in the caller's context, so retried errors reach its listener
+            futures = [
+                executor.submit(contextvars.copy_context().run, fetch, byte_range)
+                for byte_range in pending
+            ]
+            # consume the results to propagate any exception
+            for future in futures:
+                future.result()
+    finally:
+        os.close(fd)
+
+
+def _range_key(byte_range: Tuple[int, int]) -> str:
+    return "range:{}-{}".format(*byte_range)
+
+
+class _NullJournal(TransferJournal):
+    def __init__(self):
+        super().__init__(os.devnull)
+
+    def record(self, key: str, **info):
+        self._entries[key] = info
+
+    def remove(self):
+        self._entries.clear()
+
+
+MAX_COMPOSE_PARTS = 32  # limit of a single Google Cloud Storage compose request
+# bytes of a part read from the source at a time, each part being streamed
+UPLOAD_READ_SIZE = 8 * 2 ** 20
+
+
+def supports_composite_upload(fs: fsspec.AbstractFileSystem) -> bool:
+    """Whether a filesystem can concatenate uploaded parts server-side, e.g. by
+    compose on Google Cloud Storage or multipart copy on S3."""
+    return callable(getattr(fs, "merge", None))
+
+
+def upload_composite(
+    fs: fsspec.AbstractFileSystem,
+    source: str,
+    dest: str,
+    chunk_size: int,
+    max_workers: int,
+):
+    """Upload a local file as concurrently uploaded parts which are then merged
+    into the destination object by the filesystem.
+
+    The number of parts is limited to ``MAX_COMPOSE_PARTS``, increasing the
+    part size if necessary. Each part is streamed from the source in reads of
+    ``UPLOAD_READ_SIZE`` bytes, so memory use does not grow with the part size.
+    Parts are removed once merged, or on failure.
+
+    Args:
+        fs: filesystem of the destination, must support ``merge``
+        source: local filename to upload
+        dest: location of the destination object
+        chunk_size: size of each part in bytes
+        max_workers: maximum number of concurrent part uploads
+    """
+    size = os.path.getsize(source)
+    chunk_size = max(chunk_size, math.ceil(size / MAX_COMPOSE_PARTS))
+    ranges = get_byte_ranges(size, chunk_size)
+    parts = [f"{dest}.fv3config-part-{i:03d}" for i in range(len(ranges))]
+    logger.debug(f"Uploading {source} to {dest} in {len(parts)} parts")
+    fd = os.open(source, os.O_RDONLY)
+    try:
+
+        def upload(part_and_range):
+            part, (start, end) = part_and_range
+            with fs.open(part, "wb") as f:
+                for offset in range(start, end, UPLOAD_READ_SIZE):
+                    data = os.pread(fd, min(UPLOAD_READ_SIZE, end - offset), offset)
+                    throttle(len(data))
+                    f.write(data)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, upload, item)
+                for item in zip(parts, ranges)
+            ]
+            for future in futures:
+                future.result()
+        fs.merge(dest, parts)
+    finally:
+        os.close(fd)
+        for part in parts:
+            try:
+                fs.rm_file(part)
+            except FileNotFoundError:
+                pass
+
+
+class BandwidthLimiter:
+    """Limits the average rate of transfers shared by all threads.
+
+    Args:
+        bytes_per_second: the maximum average rate
+    """
+
+    def __init__(self, bytes_per_second: float):
+        if bytes_per_second <= 0:
+            raise ValueError(
+                f"bytes_per_second must be positive, was given {bytes_per_second}"
+            )
+        self.bytes_per_second = bytes_per_second
+        self._lock = threading.Lock()
+        self._next_free = time.monotonic()
+
+    def consume(self, n_bytes: int):
+        """Account for transferred bytes, blocking until the average rate is
+        back within the limit."""
+        with self._lock:
+            now = time.monotonic()
+            self._next_free = (
+                max(now, self._next_free) + n_bytes / self.bytes_per_second
+            )
+            delay = self._next_free - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+BANDWIDTH_LIMITER: Optional[BandwidthLimiter] = None
+
+
+def throttle(n_bytes: int):
+    """Account for bytes moved over the network against the bandwidth limit"""
+    limiter = BANDWIDTH_LIMITER
+    if limiter is not None:
+        limiter.consume(n_bytes)
+
+
+class AdaptiveConcurrency:
+    """Additive-increase, multiplicative-decrease limit on concurrent transfers.
+
+    After each window of ``limit`` completed transfers the throughput of the
+    window is compared to the previous one, and the limit grows by one if it
+    improved. Throttling and other transient errors halve the limit, once for
+    all attempts which started before the previous decrease, so that a burst of
+    errors from concurrent transfers halves it once.
+
+    Args:
+        initial: initial limit
+        minimum: lowest limit
+        maximum: highest limit
+        tolerance: relative throughput increase required to grow the limit
+    """
+
+    def __init__(
+        self,
+        initial: int = 8,
+        minimum: int = 1,
+        maximum: int = 64,
+        tolerance: float = 0.05,
+    ):
+        if not minimum <= initial <= maximum:
+            raise ValueError(
+                f"need minimum <= initial <= maximum, got {minimum}, {initial}, "
+                f"{maximum}"
+            )
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.tolerance = tolerance
+        self._active = 0
+        self._condition = threading.Condition()
+        self._last_throughput = None
+        self._last_decrease = -math.inf
+        self._reset_window()
+
+    def _reset_window(self):
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._window_count = 0
+
+    def acquire(self):
+        """Block until a transfer may start"""
+        with self._condition:
+            while self._active >= self.limit:
+                self._condition.wait()
+            self._active += 1
+
+    def release(self, n_bytes: int = 0):
+        """Record a completed transfer of n_bytes"""
+        with self._condition:
+            self._active -= 1
+            self._window_bytes += n_bytes
+            self._window_count += 1
+            if self._window_count >= self.limit:
+                self._end_window()
+            self._condition.notify_all()
+
+    def _end_window(self):
+        elapsed = max(time.monotonic() - self._window_start, 1e-9)
+        throughput = self._window_bytes / elapsed
+        if self._last_throughput is None or throughput > self._last_throughput * (
+            1 + self.tolerance
+        ):
+            self.limit = min(self.maximum, self.limit + 1)
+        self._last_throughput = throughput
+        self._reset_window()
+
+    def report_error(self, err: Exception, started: float = None):
+        """Back off after a failed attempt.
+
+        Args:
+            err: the error of the attempt
+            started (optional): ``time.monotonic()`` when the attempt started.
+                If the limit was decreased since then, it is not decreased
+                again. By default it is always decreased.
+        """
+        if is_transient(err):
+            with self._condition:
+                if started is not None and started < self._last_decrease:
+                    return
+                self.limit = max(self.minimum, self.limit // 2)
+                self._last_decrease = time.monotonic()
+                logger.debug(f"backing off to {self.limit} concurrent transfers")
+                self._reset_window()
+                self._condition.notify_all()
+
+
+def largest_first(items: Iterable, sizes: Iterable[Optional[int]]) -> List:
+    """Order items for transfer by decreasing size.
+
+    Starting the largest transfers first minimizes the time until the last one
+    completes. Once they occupy their slots, the remaining small transfers fill
+    slots as they become free. Items of unknown size keep their relative order
+    after those of known size.
+
+    Args:
+        items: items to order
+        sizes: size of each item in bytes, or None if unknown
+    """
+    indexed = list(zip(items, sizes))
+    known = [item for item in indexed if item[1] is not None]
+    unknown = [item for item, size in indexed if size is None]
+    known.sort(key=lambda item: item[1], reverse=True)
+    return [item for item, _ in known] + unknown
+
+
+def run_transfers(
+    transfers: Iterable[Callable[[], int]], controller: AdaptiveConcurrency = None
+):
+    """Run transfers concurrently, starting them in the given order.
+
+    Args:
+        transfers: callables performing a transfer and returning the number of
+            bytes transferred
+        controller (optional): concurrency controller. By default a new one is
+            created from ``ADAPTIVE_INITIAL_CONCURRENCY`` and
+            ``ADAPTIVE_MAX_CONCURRENCY``.
+
+    Raises:
+        the first exception raised by a transfer, after running transfers finish.
+        Transfers not yet started when it is raised are skipped.
+    """
+    if controller is None:
+        controller = AdaptiveConcurrency(
+            initial=min(ADAPTIVE_INITIAL_CONCURRENCY, ADAPTIVE_MAX_CONCURRENCY),
+            maximum=ADAPTIVE_MAX_CONCURRENCY,
+        )
+    errors = []
+
+    def run(transfer):
+        n_bytes = 0
+        # errors retried by the transfer are reported to this run's controller only
+        _ERROR_LISTENER.set(controller.report_error)
+        try:
+            n_bytes = transfer()
+        except Exception as err:
+            errors.append(err)
+        finally:
+            controller.release(n_bytes or 0)
+
+    with ThreadPoolExecutor(max_workers=controller.maximum) as executor:
+        for transfer in transfers:
+            controller.acquire()
+            if errors:
+                controller.release()
+                break
+            # in the caller's context, e.g. to use its metadata cache
+            executor.submit(contextvars.copy_context().run, run, transfer)
+    if errors:
+        raise errors[0]
@@ -1,14 +1,66 @@
+import collections
+from concurrent.futures import ThreadPoolExecutor
+import dataclasses
+import logging
 import os
+import shutil
+import threading
+from typing import List, Optional, Sequence
 import appdirs
 
+logger = logging.getLogger("fv3config")
+
 if "FV3CONFIG_CACHE_DIR" in os.environ:
     USER_CACHE_DIR = os.environ["FV3CONFIG_CACHE_DIR"]
 else:
     USER_CACHE_DIR = appdirs.user_cache_dir("fv3gfs", "vulcan")
     os.makedirs(USER_CACHE_DIR, exist_ok=True)
 CACHE_PREFIX = "fv3config-cache"
+INDEX_PREFIX = "fv3config-index"
+RENDERED_PREFIX = "fv3config-rendered"
 
 CACHE_REMOTE_FILES = True
+CACHE_PEERS = [
+    peer for peer in os.environ.get("FV3CONFIG_CACHE_PEERS", "").split(",") if peer
+]
+OFFLINE = os.environ.get("FV3CONFIG_OFFLINE", "0").lower() not in ("0", "", "false")
+RENDER_CACHE_MAX_ENTRIES = 256
+RENDER_CACHE_MAX_BYTES = 64 * 2 ** 20
+RENDER_CACHE_ON_DISK = False
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheTier:
+    """A level of a tiered cache.
+
+    Args:
+        path: parent directory of the cache, as given to ``set_cache_dir``
+        max_bytes (optional): size budget of the tier. Least recently used files
+            are evicted once it is exceeded. By default the tier is unbounded.
+    """
+
+    path: str
+    max_bytes: Optional[int] = None
+
+    @property
+    def internal_dir(self) -> str:
+        return os.path.join(self.path, CACHE_PREFIX)
+
+
+PRIMARY_CACHE_MAX_BYTES: Optional[int] = None
+# a tier over budget evicts files until it is within this fraction of it, so that
+# it is not walked again by every following addition
+CACHE_EVICTION_TARGET = 0.9
+SECONDARY_CACHE_TIERS: List[CacheTier] = []
+_TIER_USAGE = {}
+_TIER_LOCKS = {}
+_TIER_LOCKS_LOCK = threading.Lock()
+_REPLICATION_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+# replications in progress, each removed when it completes
+_REPLICATION_FUTURES = set()
+# first tier files not yet copied to every slower tier, which are not evicted
+_PENDING_REPLICATION = collections.Counter()
+_PENDING_REPLICATION_LOCK = threading.Lock()
 
 
 def do_remote_caching(flag: bool):
@@ -20,18 +72,292 @@ def do_remote_caching(flag: bool):
     CACHE_REMOTE_FILES = flag
 
 
+def set_offline(flag: bool):
+    """Set whether remote paths are served only from the local cache.
+
+    In offline mode listings, stats and reads of remote paths are answered from
+    the cached files and the directory listings recorded while online, and no
+    network requests are made. Default is False, or True if the
+    FV3CONFIG_OFFLINE environment variable is set to a true value.
+    """
+    if not isinstance(flag, bool):
+        raise TypeError(f"flag must be a boolean, was given {flag}")
+    global OFFLINE
+    OFFLINE = flag
+
+
+def set_cache_peers(peers):
+    """Set the URLs of peer caches served by ``fv3config cache serve``.
+
+    Peers are consulted in order before downloading a remote file which is not
+    in the local cache. Default is the comma-separated list in the
+    FV3CONFIG_CACHE_PEERS environment variable, if set.
+    """
+    if isinstance(peers, str):
+        raise TypeError(f"peers must be a list of urls, was given {peers}")
+    global CACHE_PEERS
+    CACHE_PEERS = list(peers)
+
+
+def set_render_cache(
+    max_entries: int = None, on_disk: bool = None, max_bytes: int = None
+):
+    """Configure the cache of rendered input.nml, diag_table and fv3config.yml
+    files, keyed by a hash of the part of the configuration each depends on.
+
+    Args:
+        max_entries (optional): number of rendered files kept in memory, least
+            recently used first out. 0 disables the in-memory cache. Default 256.
+        on_disk (optional): whether to also keep rendered files in the cache
+            directory, so they are shared between processes. They are kept in a
+            directory for each fv3config version, and are never evicted.
+            Default False.
+        max_bytes (optional): total size of the rendered files kept in memory,
+            least recently used first out. Files larger than this are not kept.
+            Default 64 MiB.
+    """
+    global RENDER_CACHE_MAX_ENTRIES, RENDER_CACHE_ON_DISK, RENDER_CACHE_MAX_BYTES
+    if max_entries is not None:
+        if max_entries < 0:
+            raise ValueError(
+                f"max_entries must be non-negative, was given {max_entries}"
+            )
+        RENDER_CACHE_MAX_ENTRIES = max_entries
+    if on_disk is not None:
+        if not isinstance(on_disk, bool):
+            raise TypeError(f"on_disk must be a boolean, was given {on_disk}")
+        RENDER_CACHE_ON_DISK = on_disk
+    if max_bytes is not None:
+        if max_bytes < 0:
+            raise ValueError(f"max_bytes must be non-negative, was given {max_bytes}")
+        RENDER_CACHE_MAX_BYTES = max_bytes
+
+
 def set_cache_dir(parent_dirname):
+    """Use parent_dirname as the only cache tier, without a size budget. Use
+    ``set_cache_tiers`` to configure more tiers or a budget."""
     if not os.path.isdir(parent_dirname):
         raise ValueError(f"{parent_dirname} does not exist")
     elif not os.path.isdir(os.path.join(parent_dirname, CACHE_PREFIX)):
         os.mkdir(os.path.join(parent_dirname, CACHE_PREFIX))
-    global USER_CACHE_DIR
+    global USER_CACHE_DIR, PRIMARY_CACHE_MAX_BYTES, SECONDARY_CACHE_TIERS
     USER_CACHE_DIR = parent_dirname
+    PRIMARY_CACHE_MAX_BYTES = None
+    SECONDARY_CACHE_TIERS = []
 
 
 def get_cache_dir():
     return USER_CACHE_DIR
 
 
+def set_cache_tiers(tiers: Sequence[CacheTier]):
+    """Use an ordered list of cache tiers, from fastest to slowest.
+
+    Files are read from the fastest tier containing them, and promoted to the
+    first tier when found in a slower one. New files are written to the first
+    tier, and asynchronously copied to the others. Each tier evicts its least
+    recently used files once it exceeds its own ``max_bytes`` budget, down to
+    ``CACHE_EVICTION_TARGET`` (90%) of it.
+
+    The first tier becomes the cache directory returned by ``get_cache_dir``.
+    """
+    if len(tiers) == 0:
+        raise ValueError("at least one cache tier is required")
+    for tier in tiers:
+        if not isinstance(tier, CacheTier):
+            raise TypeError(f"tiers must be CacheTier objects, was given {tier}")
+        if not os.path.isdir(tier.path):
+            raise ValueError(f"{tier.path} does not exist")
+        os.makedirs(tier.internal_dir, exist_ok=True)
+    set_cache_dir(tiers[0].path)
+    global PRIMARY_CACHE_MAX_BYTES, SECONDARY_CACHE_TIERS
+    PRIMARY_CACHE_MAX_BYTES = tiers[0].max_bytes
+    SECONDARY_CACHE_TIERS = list(tiers[1:])
+
+
+def get_cache_tiers() -> List[CacheTier]:
+    """Return the cache tiers, from fastest to slowest"""
+    return [CacheTier(USER_CACHE_DIR, PRIMARY_CACHE_MAX_BYTES)] + SECONDARY_CACHE_TIERS
+
+
+def _parse_cache_tiers(value: str) -> List[CacheTier]:
+    """Parse a comma-separated list of "path" or "path=max_bytes" entries"""
+    tiers = []
+    for entry in value.split(","):
+        if "=" in entry:
+            path, max_bytes = entry.rsplit("=", 1)
+            tiers.append(CacheTier(path, int(max_bytes)))
+        elif entry:
+            tiers.append(CacheTier(entry))
+    return tiers
+
+
+def _tier_lock(tier: CacheTier) -> threading.Lock:
+    with _TIER_LOCKS_LOCK:
+        return _TIER_LOCKS.setdefault(tier.internal_dir, threading.Lock())
+
+
+def _is_temporary(filename: str) -> bool:
+    return filename.endswith(".tmp")
+
+
+def _list_tier_files(tier: CacheTier):
+    for dirpath, _, filenames in os.walk(tier.internal_dir):
+        for filename in filenames:
+            if not _is_temporary(filename):
+                yield os.path.join(dirpath, filename)
+
+
+def _add_usage(tier: CacheTier, n_bytes: int):
+    """Account for a file added to a tier and evict files if over budget"""
+    if tier.max_bytes is None:
+        return
+    with _tier_lock(tier):
+        if tier.internal_dir not in _TIER_USAGE:
+            _TIER_USAGE[tier.internal_dir] = sum(
+                os.path.getsize(filename) for filename in _list_tier_files(tier)
+            )
+        else:
+            _TIER_USAGE[tier.internal_dir] += n_bytes
+        if _TIER_USAGE[tier.internal_dir] > tier.max_bytes:
+            _TIER_USAGE[tier.internal_dir] = _evict(tier)
+
+
+def _evict(tier: CacheTier) -> int:
+    """Remove least recently used files from a tier until it is within
+    ``CACHE_EVICTION_TARGET`` of its budget.
+
+    Returns:
+        the remaining size of the tier in bytes
+    """
+    entries = []
+    for filename in _list_tier_files(tier):
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, filename))
+    entries.sort()
+    usage = sum(size for _, size, _ in entries)
+    target = int(tier.max_bytes * CACHE_EVICTION_TARGET)
+    with _PENDING_REPLICATION_LOCK:
+        # files not yet copied to the slower tiers would be lost
+        pending = set(_PENDING_REPLICATION)
+    # never evict the most recently used file, which was just added
+    for _, size, filename in entries[:-1]:
+        if usage <= target:
+            break
+        if filename in pending:
+            continue
+        logger.debug(f"evicting {filename} from cache tier {tier.path}")
+        try:
+            os.remove(filename)
+        except FileNotFoundError:
+            pass
+        usage -= size
+    return usage
+
+
+def _copy_into_tier(filename: str, tier: CacheTier, subpath: str) -> str:
+    target = os.path.join(tier.internal_dir, subpath)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    temporary_target = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.copyfile(filename, temporary_target)
+    os.replace(temporary_target, target)
+    _add_usage(tier, os.path.getsize(target))
+    return target
+
+
+def lookup_cached(subpath: str) -> Optional[str]:
+    """Return the location of a cached file in the first tier, promoting it from
+    a slower tier if necessary, or None if no tier contains it.
+
+    Args:
+        subpath: location of the file relative to a cache root
+    """
+    tiers = get_cache_tiers()
+    for i, tier in enumerate(tiers):
+        filename = os.path.join(tier.internal_dir, subpath)
+        if os.path.isfile(filename):
+            try:
+                # modification time records the last use, for eviction
+                os.utime(filename)
+            except FileNotFoundError:
+                continue  # evicted concurrently
+            if i == 0:
+                return filename
+            logger.debug(f"promoting {subpath} from cache tier {tier.path}")
+            return _copy_into_tier(filename, tiers[0], subpath)
+    return None
+
+
+def commit_to_cache(temporary_filename: str, subpath: str) -> str:
+    """Move a newly downloaded file into the first tier and schedule its copy
+    to the slower tiers.
+
+    Args:
+        temporary_filename: downloaded file, on the same filesystem as the first
+            cache tier
+        subpath: location of the file relative to a cache root
+
+    Returns:
+        the location of the file in the first tier
+    """
+    primary, *secondary = get_cache_tiers()
+    target = os.path.join(primary.internal_dir, subpath)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(temporary_filename, target)
+    if len(secondary) > 0:
+        with _PENDING_REPLICATION_LOCK:
+            _PENDING_REPLICATION[target] += len(secondary)
+    _add_usage(primary, os.path.getsize(target))
+    for tier in secondary:
+        future = _REPLICATION_EXECUTOR.submit(_replicate, target, tier, subpath)
+        with _PENDING_REPLICATION_LOCK:
+            _REPLICATION_FUTURES.add(future)
+        future.add_done_callback(_discard_replication_future)
+    return target
+
+
+def _replicate(filename: str, tier: CacheTier, subpath: str):
+    try:
+        if not os.path.isfile(os.path.join(tier.internal_dir, subpath)):
+            _copy_into_tier(filename, tier, subpath)
+    except OSError as err:
+        logger.warning(f"could not copy {subpath} to cache tier {tier.path}: {err}")
+    finally:
+        with _PENDING_REPLICATION_LOCK:
+            _PENDING_REPLICATION[filename] -= 1
+            if _PENDING_REPLICATION[filename] <= 0:
+                del _PENDING_REPLICATION[filename]
+
+
+def _discard_replication_future(future):
+    with _PENDING_REPLICATION_LOCK:
+        _REPLICATION_FUTURES.discard(future)
+
+
+def wait_for_replication():
+    """Block until files written to the first cache tier have been copied to the
+    slower tiers."""
+    with _PENDING_REPLICATION_LOCK:
+        futures = list(_REPLICATION_FUTURES)
+    for future in futures:
+        future.result()
+        _discard_replication_future(future)
+
+
 def get_internal_cache_dir():
     return os.path.join(USER_CACHE_DIR, CACHE_PREFIX)
+
+
+def get_internal_index_dir():
+    return os.path.join(USER_CACHE_DIR, INDEX_PREFIX)
+
+
+def get_internal_rendered_dir():
+    return os.path.join(USER_CACHE_DIR, RENDERED_PREFIX)
+
+
+if "FV3CONFIG_CACHE_TIERS" in os.environ:
+    set_cache_tiers(_parse_cache_tiers(os.environ["FV3CONFIG_CACHE_TIERS"]))
@@ -1,7 +1,10 @@
 import argparse
+import sys
 import fsspec
 
 import fv3config
+from fv3config import _bundle as bundle
+from fv3config import _peer as peer
 import logging
 
 
@@ -16,6 +19,11 @@ def _parse_write_run_directory_args():
     parser.add_argument(
         "-v", "--verbose", action="store_true", help="Enable verbose output."
     )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Serve remote paths only from the local cache, without network access.",
+    )
     return parser.parse_args()
 
 
@@ -42,10 +50,121 @@ def _parse_enable_nudging_args():
     return parser.parse_args()
 
 
+def _parse_fv3config_args(argv=None):
+    parser = argparse.ArgumentParser("fv3config")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    cache_parser = subparsers.add_parser("cache", help="Manage the fv3config cache.")
+    cache_subparsers = cache_parser.add_subparsers(dest="cache_command", required=True)
+
+    export_parser = cache_subparsers.add_parser(
+        "export",
+        help="Write the cached files needed by configs to a tar bundle on stdout.",
+    )
+    export_parser.add_argument(
+        "--configs",
+        nargs="+",
+        required=True,
+        help="URIs to fv3config yaml files. Supports any path used by fsspec.",
+    )
+
+    import_parser = cache_subparsers.add_parser(
+        "import", help="Read a tar bundle into the cache."
+    )
+    import_parser.add_argument(
+        "bundle", help="Path to a bundle written by export, or - for stdin."
+    )
+
+    serve_parser = cache_subparsers.add_parser(
+        "serve", help="Serve the cache over HTTP to peer nodes."
+    )
+    serve_parser.add_argument(
+        "--host", default="", help="Address to bind to, by default all interfaces."
+    )
+    serve_parser.add_argument(
+        "--port", type=int, default=8000, help="Port to listen on, default 8000."
+    )
+
+    estimate_parser = subparsers.add_parser(
+        "estimate-output",
+        help="Estimate the volume and frequency of the diagnostic output of a run.",
+    )
+    estimate_parser.add_argument(
+        "config", help="URI to fv3config yaml file. Supports any path used by fsspec."
+    )
+    estimate_parser.add_argument(
+        "--upload-bandwidth",
+        type=float,
+        default=None,
+        help="Bandwidth in bytes per second used to estimate the upload time.",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Enable verbose output."
+    )
+    return parser.parse_args(argv)
+
+
+def _load_config(location):
+    with fsspec.open(location) as f:
+        return fv3config.load(f)
+
+
+def _cache_export(args):
+    configs = (_load_config(location) for location in args.configs)
+    n_files = bundle.export_cache_bundle(configs, sys.stdout.buffer)
+    logging.info(f"exported {n_files} cached files")
+
+
+def _cache_import(args):
+    if args.bundle == "-":
+        n_files = bundle.import_cache_bundle(sys.stdin.buffer)
+    else:
+        with open(args.bundle, "rb") as f:
+            n_files = bundle.import_cache_bundle(f)
+    logging.info(f"imported {n_files} cached files")
+
+
+def _cache_serve(args):
+    server = peer.make_cache_server(args.host, args.port)
+    cache_dir = fv3config.caching.get_internal_cache_dir()
+    logging.info(f"serving {cache_dir} on port {args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def _estimate_output(args):
+    config = _load_config(args.config)
+    estimate = fv3config.estimate_diagnostic_output(
+        config, upload_bytes_per_second=args.upload_bandwidth
+    )
+    print(estimate.summary())
+
+
+_CACHE_COMMANDS = {
+    "export": _cache_export,
+    "import": _cache_import,
+    "serve": _cache_serve,
+}
+
+
+def main(argv=None):
+    args = _parse_fv3config_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    if args.command == "cache":
+        _CACHE_COMMANDS[args.cache_command](args)
+    elif args.command == "estimate-output":
+        _estimate_output(args)
+
+
 def write_run_directory():
     args = _parse_write_run_directory_args()
     if args.verbose:
         logging.basicConfig(level=logging.DEBUG)
+    if args.offline:
+        fv3config.set_offline(True)
 
     with fsspec.open(args.config) as f:
         config = fv3config.load(f)
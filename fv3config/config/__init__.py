@@ -1,20 +1,41 @@
 from .namelist import (
     config_to_namelist,
     config_from_namelist,
+    configs_to_namelists,
+    configs_from_namelists,
 )
 from .rundir import write_run_directory
+from .preflight import validate_config, check_config
 from .alter import enable_restart, set_run_duration
 from .derive import get_n_processes, get_run_duration, get_timestep
-from .nudging import get_nudging_assets, enable_nudging
+from .nudging import get_nudging_assets, enable_nudging, get_missing_nudging_files
 from .diag_table import (
     DiagFileConfig,
     DiagFieldConfig,
     DiagTable,
+    DiagTableIndex,
     Packing,
     FileFormat,
 )
 
 from ._serialization import load, dump
+from ._blob_store import BlobReference
+from .frozen import FrozenConfig, freeze, thaw
+from .fingerprint import fingerprint
+from .output_estimate import (
+    estimate_diagnostic_output,
+    DiagOutputEstimate,
+    DiagFileEstimate,
+)
+from .ensemble import (
+    generate_ensemble,
+    write_ensemble,
+    Grid,
+    Uniform,
+    LogUniform,
+    Normal,
+    Choice,
+)
 
 
 def get_default_config():
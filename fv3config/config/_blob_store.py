@@ -0,0 +1,190 @@
+"""Content-addressed storage of binary payloads of serialized configurations
+
+Binary values are stored as ``<store>/<first two hex digits>/<sha256 hex digest>``
+and referenced from the configuration by ``{"blob_sha256": ..., "blob_store": ...}``.
+"""
+import dataclasses
+import hashlib
+import itertools
+import os
+import tempfile
+from typing import Any, Iterable, Iterator, Optional
+
+from .. import filesystem
+from .._asset_list import is_streamed, iter_bytes_repeatable
+from .._exceptions import ConfigError
+
+BLOB_THRESHOLD = 64 * 2 ** 10
+_SHA256_KEY = "blob_sha256"
+_STORE_KEY = "blob_store"
+
+
+@dataclasses.dataclass(frozen=True)
+class BlobReference:
+    """Lazily loaded binary payload of a configuration.
+
+    Calling it returns an iterator over the payload in chunks, so it can be used
+    as the data of a bytes asset, see :py:func:`fv3config.get_bytes_asset_dict`.
+    The payload is checked against its hash once read.
+
+    Args:
+        sha256: hex digest of the payload
+        store: location of the blob store containing the payload
+    """
+
+    sha256: str
+    store: str
+
+    @property
+    def location(self) -> str:
+        return _blob_location(self.store, self.sha256)
+
+    def __call__(self) -> Iterator[bytes]:
+        digest = hashlib.sha256()
+        for chunk in filesystem.iter_chunks(self.location):
+            digest.update(chunk)
+            yield chunk
+        if digest.hexdigest() != self.sha256:
+            raise ConfigError(
+                f"blob {self.location} does not match its sha256 {self.sha256}"
+            )
+
+    def read(self) -> bytes:
+        """Return the payload in memory"""
+        return b"".join(self())
+
+
+def _blob_location(store: str, sha256: str) -> str:
+    return os.path.join(store, sha256[:2], sha256)
+
+
+def _store_blob(store: str, data: bytes) -> BlobReference:
+    sha256 = hashlib.sha256(data).hexdigest()
+    location = _blob_location(store, sha256)
+    if not filesystem.exists(location):
+        fs = filesystem.get_fs(location)
+        if filesystem.is_local_path(location):
+            os.makedirs(os.path.dirname(location), exist_ok=True)
+            temporary_location = filesystem._temporary_filename(location)
+            with open(temporary_location, "wb") as f:
+                f.write(data)
+            os.replace(temporary_location, location)
+        else:
+            fs.pipe_file(location, data)
+    return BlobReference(sha256, store)
+
+
+def _store_stream(store: str, chunks: Iterable[bytes]) -> BlobReference:
+    """Store a payload read in chunks, through a temporary local file so that it
+    is not held in memory"""
+    local = filesystem.is_local_path(store)
+    if local:
+        # in the store, so the blob can be moved into place
+        os.makedirs(store, exist_ok=True)
+    fd, temporary_location = tempfile.mkstemp(dir=store if local else None)
+    try:
+        digest = hashlib.sha256()
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                digest.update(chunk)
+                f.write(chunk)
+        sha256 = digest.hexdigest()
+        location = _blob_location(store, sha256)
+        if not filesystem.exists(location):
+            if local:
+                os.makedirs(os.path.dirname(location), exist_ok=True)
+                os.replace(temporary_location, location)
+            else:
+                filesystem.put_file(temporary_location, location)
+    finally:
+        if os.path.exists(temporary_location):
+            os.remove(temporary_location)
+    return BlobReference(sha256, store)
+
+
+def externalize_blobs(
+    value: Any, store: Optional[str], threshold: int = BLOB_THRESHOLD
+) -> Any:
+    """Return value with binary payloads of at least threshold bytes moved to a
+    blob store and replaced by references.
+
+    Containers are copied only along paths to replaced payloads. Loaded
+    references are written back as references without reading them. Streamed
+    data of bytes assets, such as callables or seekable file-like objects, is
+    read without being consumed, and moved to the store or replaced by bytes.
+    Without a store it is kept as it is.
+
+    Args:
+        value: a configuration or part of one
+        store: location of the blob store, or None to keep payloads in the
+            configuration
+        threshold: minimum size of payloads to move
+
+    Raises:
+        ConfigError: if store is not an absolute path or url, or if value
+            contains streamed data which can be read only once
+    """
+    if store is not None and not filesystem.isabs(store):
+        raise ConfigError(f"blob store must be an absolute path or url, got {store}")
+    return _externalize(value, store, threshold)
+
+
+def _externalize(value, store, threshold):
+    if isinstance(value, BlobReference):
+        return {_SHA256_KEY: value.sha256, _STORE_KEY: value.store}
+    elif isinstance(value, bytes) and store is not None and len(value) >= threshold:
+        reference = _store_blob(store, value)
+        return {_SHA256_KEY: reference.sha256, _STORE_KEY: reference.store}
+    elif is_streamed(value):
+        return _externalize_stream(value, store, threshold)
+    elif isinstance(value, dict):
+        result = None
+        for key, item in value.items():
+            new = _externalize(item, store, threshold)
+            if new is not item:
+                if result is None:
+                    result = dict(value)
+                result[key] = new
+        if result is not None:
+            return result
+    elif isinstance(value, list):
+        result = None
+        for i, item in enumerate(value):
+            new = _externalize(item, store, threshold)
+            if new is not item:
+                if result is None:
+                    result = list(value)
+                result[i] = new
+        if result is not None:
+            return result
+    return value
+
+
+def _externalize_stream(value, store, threshold):
+    chunks = iter_bytes_repeatable(value)
+    if store is None:
+        # written in chunks by dump
+        return value
+    # payloads smaller than threshold are kept in the configuration
+    head, size = [], 0
+    for chunk in chunks:
+        head.append(chunk)
+        size += len(chunk)
+        if size >= threshold:
+            reference = _store_stream(store, itertools.chain(head, chunks))
+            return {_SHA256_KEY: reference.sha256, _STORE_KEY: reference.store}
+    return b"".join(head)
+
+
+def resolve_blob_references(value: Any) -> Any:
+    """Replace blob references in a loaded configuration by lazily loaded
+    :py:class:`BlobReference` objects, in place where possible."""
+    if isinstance(value, dict):
+        if set(value) == {_SHA256_KEY, _STORE_KEY}:
+            return BlobReference(value[_SHA256_KEY], value[_STORE_KEY])
+        for key, item in value.items():
+            value[key] = resolve_blob_references(item)
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            value[i] = resolve_blob_references(item)
+    return value
@@ -0,0 +1,185 @@
+"""Namelist writer and reader for the value types used in fv3config
+
+Produces and reads the same text as f90nml for namelists whose variables are
+scalars or one-dimensional lists of booleans, integers, floats and strings.
+Anything else raises UnsupportedNamelist, so that callers can fall back to
+f90nml.
+"""
+from collections import OrderedDict
+import re
+from typing import Any, Dict, List, Mapping
+
+_COLUMN_WIDTH = 72
+_INDENT = "    "
+_SCALAR_TYPES = (bool, int, float, str, type(None))
+
+_TOKEN = re.compile(
+    r"""
+    \s*(?:
+        (?P<group>&[A-Za-z_]\w*)
+      | (?P<name>[A-Za-z_]\w*)\s*=
+      | (?P<string>'(?:[^']|'')*'|"(?:[^"]|"")*")
+      | (?P<comma>,)
+      | (?P<end>/)
+      | (?P<comment>![^\n]*)
+      | (?P<value>[^\s,/!'"=&()*%]+)
+      | (?P<other>\S)
+    )
+    """,
+    re.VERBOSE,
+)
+_INT = re.compile(r"[+-]?\d+")
+_FLOAT = re.compile(r"[+-]?(?:\d+\.\d*|\.\d+|\d+(?=[eEdD]))(?:[eEdD][+-]?\d+)?")
+_BOOLS = {
+    ".true.": True,
+    ".t.": True,
+    "true": True,
+    "t": True,
+    ".false.": False,
+    ".f.": False,
+    "false": False,
+    "f": False,
+}
+
+
+class UnsupportedNamelist(ValueError):
+    """The namelist uses a construct which only f90nml handles"""
+
+
+def dumps(namelist: Mapping[str, Mapping[str, Any]]) -> str:
+    """Return the text f90nml writes for a namelist dictionary
+
+    Raises:
+        UnsupportedNamelist: if the namelist contains values other than scalars
+            and one-dimensional lists of scalars
+    """
+    return "\n".join(dump_group(name, group) for name, group in ordered_items(namelist))
+
+
+def dump_group(name: str, group: Mapping[str, Any]) -> str:
+    """Return the text f90nml writes for a namelist group"""
+    if not isinstance(group, dict):
+        raise UnsupportedNamelist(f"namelist group {name} is not a dictionary")
+    lines = [f"&{name.lower()}"]
+    for key, value in ordered_items(group):
+        lines.extend(_variable_lines(key.lower(), value))
+    lines.append("/\n")
+    return "\n".join(lines)
+
+
+def ordered_items(mapping: Mapping) -> List:
+    """Return the items of a namelist or group in the order f90nml writes them"""
+    if not all(isinstance(key, str) for key in mapping):
+        raise UnsupportedNamelist("namelist names must be strings")
+    if len({key.lower() for key in mapping}) != len(mapping):
+        raise UnsupportedNamelist("namelist names must differ other than in case")
+    # f90nml sorts the keys of plain dictionaries, but not of ordered ones
+    if isinstance(mapping, OrderedDict):
+        return list(mapping.items())
+    return sorted(mapping.items(), key=lambda item: item[0])
+
+
+def _variable_lines(name: str, value: Any) -> List[str]:
+    values = value if isinstance(value, list) else [value]
+    if not all(type(item) in _SCALAR_TYPES for item in values):
+        raise UnsupportedNamelist(f"unsupported value for {name}: {value!r}")
+    header = f"{_INDENT}{name} = "
+    column_width = max(_COLUMN_WIDTH, len(header) + 1)
+    lines = []
+    line = header
+    last = len(values) - 1
+    for i, item in enumerate(values):
+        line += _format(item) + (", " if i < last else "")
+        if len(line) >= column_width:
+            lines.append(line.rstrip())
+            line = " " * len(header)
+    if not line.isspace():
+        lines.append(line.rstrip())
+    if len(values) == 0 or values[-1] is None:
+        lines[-1] += " ,"
+    return lines
+
+
+def _format(value: Any) -> str:
+    if value is True:
+        return ".true."
+    elif value is False:
+        return ".false."
+    elif value is None:
+        return ""
+    elif type(value) is str:
+        return (
+            repr(value).replace("\\'", "''").replace('\\"', '""').replace("\\\\", "\\")
+        )
+    return str(value)
+
+
+def loads(text: str) -> Dict[str, Dict[str, Any]]:
+    """Return the namelist dictionary f90nml reads from text
+
+    Raises:
+        UnsupportedNamelist: if the text contains constructs other than groups
+            of scalar and list assignments, such as indexed assignments, repeat
+            counts, null values, derived types or repeated groups
+    """
+    namelist: Dict[str, Dict[str, Any]] = {}
+    group = None
+    name = None
+    values: List[Any] = []
+    expect_value = False
+    for match in _TOKEN.finditer(text):
+        kind = match.lastgroup
+        token = match.group(kind)
+        if kind == "comment":
+            continue
+        if group is None:
+            if kind != "group":
+                raise UnsupportedNamelist(f"unexpected {token!r} outside of a group")
+            group_name = token[1:].lower()
+            if group_name in namelist:
+                raise UnsupportedNamelist(f"repeated namelist group {group_name}")
+            group = namelist[group_name] = {}
+        elif kind in ("name", "end"):
+            if name is not None:
+                _assign(group, name, values)
+            if kind == "end":
+                group, name = None, None
+            else:
+                name = token.lower()
+                if name in group:
+                    raise UnsupportedNamelist(f"repeated variable {name}")
+                # reserve the position of the name, as f90nml keeps file order
+                group[name] = None
+            values = []
+            expect_value = True
+        elif kind == "comma":
+            if expect_value:
+                raise UnsupportedNamelist("null values are not supported")
+            expect_value = True
+        elif kind in ("string", "value") and name is not None:
+            values.append(_parse(kind, token))
+            expect_value = False
+        else:
+            raise UnsupportedNamelist(f"unexpected {token!r}")
+    if group is not None:
+        raise UnsupportedNamelist("namelist group is not terminated")
+    return namelist
+
+
+def _assign(group, name, values):
+    if len(values) == 0:
+        raise UnsupportedNamelist(f"no value for {name}")
+    group[name] = values[0] if len(values) == 1 else values
+
+
+def _parse(kind: str, token: str) -> Any:
+    if kind == "string":
+        quote = token[0]
+        return token[1:-1].replace(2 * quote, quote)
+    elif _INT.fullmatch(token):
+        return int(token)
+    elif _FLOAT.fullmatch(token):
+        return float(token.lower().replace("d", "e"))
+    elif token.lower() in _BOOLS:
+        return _BOOLS[token.lower()]
+    raise UnsupportedNamelist(f"unsupported value {token!r}")
@@ -1,28 +1,206 @@
-from copy import deepcopy
+import base64
+import io
+import uuid
 import yaml
-from typing import TextIO
+from typing import Any, Dict, Iterator, Optional, TextIO
 
 from .types import Config
 from .diag_table import DiagTable
+from ._blob_store import BLOB_THRESHOLD, externalize_blobs, resolve_blob_references
+from .._asset_list import is_streamed, iter_bytes, repeatable
+from .frozen import FrozenConfig, FrozenList
+
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    # pyyaml built without libyaml
+    from yaml import SafeLoader, SafeDumper
+
+
+class _Dumper(SafeDumper):
+    pass
+
+
+_Dumper.add_representer(FrozenConfig, _Dumper.represent_dict)
+_Dumper.add_representer(FrozenList, _Dumper.represent_list)
+
+# base64.encodebytes writes lines of 76 characters, encoding 57 bytes each
+_BASE64_LINE_BYTES = 57
+# payloads are encoded and written this many bytes at a time
+_BASE64_BLOCK_BYTES = _BASE64_LINE_BYTES * 1024
+
+
+class _Placeholder(str):
+    """Stands in for a binary payload written to the yaml in chunks"""
+
+
+def _represent_placeholder(dumper, placeholder):
+    # the same node as a binary value, with one line of content
+    return dumper.represent_scalar(
+        "tag:yaml.org,2002:binary", placeholder + "\n", style="|"
+    )
+
+
+_Dumper.add_representer(_Placeholder, _represent_placeholder)
 
 
 def load(f: TextIO) -> Config:
-    """Load a configuration from a file-like object f"""
-    config = yaml.safe_load(f)
+    """Load a configuration from a file-like object f
+
+    The libyaml parser is used if pyyaml was built with it.
+
+    Binary payloads stored in a blob store by :py:func:`dump` are loaded lazily:
+    they are represented by callables returning their contents in chunks, which
+    can be used directly as the data of bytes assets.
+    """
+    config = resolve_blob_references(yaml.load(f, Loader=SafeLoader))
     if isinstance(config["diag_table"], dict):
         config["diag_table"] = DiagTable.from_dict(config["diag_table"])
     return config
 
 
-def dump(config: Config, f: TextIO):
+def dump(
+    config: Config,
+    f: TextIO,
+    blob_store: Optional[str] = None,
+    blob_threshold: int = BLOB_THRESHOLD,
+):
     """Serialize config to a file-like object using yaml encoding
 
+    The libyaml emitter is used if pyyaml was built with it. The configuration
+    is not deep-copied: only the top level is copied to replace a DiagTable,
+    and only containers leading to values moved to the blob store are copied.
+    Streamed data of bytes assets is written like bytes, see
+    :py:func:`fv3config.get_bytes_asset_dict`. Binary values of at least
+    blob_threshold bytes kept in the yaml are encoded and written in chunks.
+
     Args:
         config: an fv3config object
         f: the file like object to write to
+        blob_store (optional): absolute local path or url of a directory in which
+            to store binary values of at least blob_threshold bytes, such as the
+            data of bytes assets, by their sha256 hash. They are replaced by
+            references in the yaml, and identical values are stored once.
+        blob_threshold (optional): minimum size in bytes of values moved to the
+            blob store. Defaults to 64 KiB.
 
     """
-    config_copy = deepcopy(config)
-    if isinstance(config["diag_table"], DiagTable):
-        config_copy["diag_table"] = config["diag_table"].asdict()
-    yaml.safe_dump(config_copy, f)
+    for text in YamlDocument(config, blob_store, blob_threshold):
+        f.write(text)
+
+
+class YamlDocument:
+    """The yaml encoding of a configuration, written in chunks.
+
+    Binary payloads, streamed data of bytes assets and bytes values of at least
+    blob_threshold bytes, are base64 encoded a chunk at a time as the document
+    is iterated, so they are not held in memory. The document can be iterated
+    more than once, and reads seekable file-like objects from their position
+    when it was created.
+
+    Args:
+        config: an fv3config object
+        blob_store (optional): see :py:func:`dump`
+        blob_threshold (optional): see :py:func:`dump`
+
+    Raises:
+        ConfigError: if config contains streamed data which can be read only once
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        blob_store: Optional[str] = None,
+        blob_threshold: int = BLOB_THRESHOLD,
+    ):
+        config = externalize_blobs(config, blob_store, blob_threshold)
+        if isinstance(config["diag_table"], DiagTable):
+            # shallow copy, so that large embedded data is not duplicated
+            config = {**config, "diag_table": config["diag_table"].asdict()}
+        self._payloads: Dict[str, Any] = {}
+        self._prefix = uuid.uuid4().hex
+        self._threshold = blob_threshold
+        self._config = self._with_placeholders(config)
+
+    @property
+    def has_payloads(self) -> bool:
+        """Whether binary payloads are written in chunks"""
+        return len(self._payloads) > 0
+
+    def _with_placeholders(self, value):
+        if is_streamed(value) or (
+            isinstance(value, bytes) and len(value) >= self._threshold
+        ):
+            placeholder = _Placeholder(f"{self._prefix}{len(self._payloads)}")
+            self._payloads[placeholder] = repeatable(value)
+            return placeholder
+        elif isinstance(value, dict):
+            result = None
+            for key, item in value.items():
+                new = self._with_placeholders(item)
+                if new is not item:
+                    if result is None:
+                        result = dict(value)
+                    result[key] = new
+            if result is not None:
+                return result
+        elif isinstance(value, list):
+            result = None
+            for i, item in enumerate(value):
+                new = self._with_placeholders(item)
+                if new is not item:
+                    if result is None:
+                        result = list(value)
+                    result[i] = new
+            if result is not None:
+                return result
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        f = io.StringIO()
+        yaml.dump(self._config, f, Dumper=_Dumper)
+        text = f.getvalue()
+        if not self._payloads:
+            yield text
+            return
+        for line in text.splitlines(keepends=True):
+            payload = self._payloads.get(line.strip())
+            if payload is None:
+                yield line
+            else:
+                indent = line[: len(line) - len(line.lstrip(" "))]
+                yield from _iter_base64_lines(iter_bytes(payload), indent)
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        """Iterate over the utf-8 encoded document in chunks"""
+        for text in self:
+            yield text.encode()
+
+
+def _iter_base64_lines(chunks: Iterator[bytes], indent: str) -> Iterator[str]:
+    """Iterate over the lines of a base64 encoded payload, as written by
+    base64.encodebytes, a block of lines at a time"""
+    line = b""
+    for chunk in chunks:
+        view = memoryview(chunk)
+        if len(line) > 0:
+            # complete the line started by the previous chunk
+            head = _BASE64_LINE_BYTES - len(line)
+            line += view[:head].tobytes()
+            view = view[head:]
+            if len(line) < _BASE64_LINE_BYTES:
+                continue
+            yield _indented(base64.encodebytes(line), indent)
+        end = len(view) - len(view) % _BASE64_LINE_BYTES
+        for start in range(0, end, _BASE64_BLOCK_BYTES):
+            block = view[start : min(start + _BASE64_BLOCK_BYTES, end)]
+            yield _indented(base64.encodebytes(block), indent)
+        line = view[end:].tobytes()
+    if len(line) > 0:
+        yield _indented(base64.encodebytes(line), indent)
+
+
+def _indented(lines: bytes, indent: str) -> str:
+    return "".join(
+        indent + line for line in lines.decode("ascii").splitlines(keepends=True)
+    )
@@ -1,6 +1,6 @@
 from datetime import timedelta
-import copy
 from .time_constants import SECONDS_IN_DAY
+from .frozen import with_updates
 from .._exceptions import ConfigError
 
 
@@ -12,28 +12,34 @@ def enable_restart(config, initial_conditions):
         initial_conditions (str): path to desired new initial conditions.
 
     Returns:
-        dict: a configuration dictionary
+        dict: a configuration dictionary, a FrozenConfig if config is one
     """
     if "namelist" not in config:
         raise ConfigError("config dictionary must have a 'namelist' key")
-    restart_config = copy.deepcopy(config)
-    restart_config["namelist"].setdefault("fv_core_nml", {})["external_ic"] = False
-    restart_config["namelist"]["fv_core_nml"]["nggps_ic"] = False
-    restart_config["namelist"]["fv_core_nml"]["make_nh"] = False
-    restart_config["namelist"]["fv_core_nml"]["mountain"] = True
-    restart_config["namelist"]["fv_core_nml"]["warm_start"] = True
-    restart_config["namelist"]["fv_core_nml"]["na_init"] = 0
-    restart_config["namelist"].setdefault("coupler_nml", {})[
-        "force_date_from_namelist"
-    ] = False
-    restart_config["initial_conditions"] = initial_conditions
-    return restart_config
+    return with_updates(
+        config,
+        [
+            (
+                ("namelist", "fv_core_nml"),
+                {
+                    "external_ic": False,
+                    "nggps_ic": False,
+                    "make_nh": False,
+                    "mountain": True,
+                    "warm_start": True,
+                    "na_init": 0,
+                },
+            ),
+            (("namelist", "coupler_nml"), {"force_date_from_namelist": False}),
+            ((), {"initial_conditions": initial_conditions}),
+        ],
+    )
 
 
 def set_run_duration(config: dict, duration: timedelta) -> dict:
     """Set the run duration in the configuration dictionary.
 
-    Returns a new configuration dictionary.
+    Returns a new configuration dictionary, a FrozenConfig if config is one.
 
     Args:
         config (dict): a configuration dictionary
@@ -47,15 +53,15 @@ def set_run_duration(config: dict, duration: timedelta) -> dict:
     """
     if "namelist" not in config:
         raise ConfigError("config dictionary must have a 'namelist' key")
-    return_config = copy.deepcopy(config)
-    coupler_nml = return_config["namelist"]["coupler_nml"]
     total_seconds = duration.total_seconds()
     if total_seconds % 1 != 0:
         raise ValueError("duration must be an integer number of seconds")
-    coupler_nml["months"] = 0
-    coupler_nml["hours"] = 0
-    coupler_nml["minutes"] = 0
     days = int(total_seconds / SECONDS_IN_DAY)
-    coupler_nml["days"] = days
-    coupler_nml["seconds"] = int(total_seconds - (days * SECONDS_IN_DAY))
-    return return_config
+    coupler_nml = {
+        "months": 0,
+        "hours": 0,
+        "minutes": 0,
+        "days": days,
+        "seconds": int(total_seconds - (days * SECONDS_IN_DAY)),
+    }
+    return with_updates(config, [(("namelist", "coupler_nml"), coupler_nml)])
@@ -1,30 +1,64 @@
 import logging
-from typing import Sequence, Union, Tuple, Mapping
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple, Union
 import dataclasses
 import datetime
 from enum import Enum
+import functools
 import re
 
-import dacite
-
 from .._exceptions import ConfigError
 
 logger = logging.getLogger("fv3config")
 NUMBER_OF_TOKENS_ON_FILE_LINES = 6
 NUMBER_OF_TOKENS_ON_FIELD_LINES = 8
 
+_VALUE = r"""(?:"[^"]*"|'[^']*'|[^\s,#"']+)"""
+# values are separated by commas or, as in Fortran list-directed input, blanks
+_LINE = re.compile(
+    rf"\s*(?P<body>{_VALUE}(?:(?:\s*,\s*|\s+){_VALUE})*)\s*,?\s*(?:#.*)?"
+)
+_TOKEN = re.compile(r""""([^"]*)"|'([^']*)'|([^\s,#"']+)""")
+_BLANK_OR_COMMENT = re.compile(r"\s*(?:#.*)?")
+# field lines as usually written, parsed with a single match
+_STRING = r'\s*"([^"]*)"\s*'
+_FIELD_LINE = re.compile(
+    rf"{_STRING},{_STRING},{_STRING},{_STRING},{_STRING},"
+    rf"(?:{_STRING}|\s*(\.true\.|\.false\.)\s*),{_STRING},"
+    r"\s*([+-]?\d+)\s*,?\s*(?:#.*)?",
+    re.IGNORECASE,
+)
+_LOGICAL_REDUCTIONS = {".true.": "average", ".false.": "none"}
+
 
 class Packing(Enum):
     DOUBLE_PRECISION = 1
     SINGLE_PRECISION = 2
 
 
+_PACKINGS = {packing.value: packing for packing in Packing}
+
+
 class FileFormat(Enum):
     NETCDF = 1
 
 
+class _CachedRendering:
+    """Keeps the rendered text of a diag_table entry until an attribute is set"""
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        self.__dict__.pop("_rendered", None)
+
+    @classmethod
+    def _unchecked(cls, **attributes):
+        """Create an instance from a value for every field, without __init__"""
+        self = object.__new__(cls)
+        self.__dict__.update(attributes)
+        return self
+
+
 @dataclasses.dataclass
-class DiagFieldConfig:
+class DiagFieldConfig(_CachedRendering):
     """Object representing configuration for a field of a diagnostics file.
     
     Args:
@@ -45,9 +79,44 @@ class DiagFieldConfig:
     regional_section: str = "none"
     packing: Packing = Packing.SINGLE_PRECISION
 
+    def _line(self, quoted_file_name: str) -> str:
+        try:
+            head, tail = self.__dict__["_rendered"]
+        except KeyError:
+            head = _join_tokens((self.module_name, self.field_name, self.output_name))
+            tail = _join_tokens(
+                (
+                    self.time_sampling,
+                    self.reduction_method,
+                    self.regional_section,
+                    self.packing.value,
+                )
+            )
+            self.__dict__["_rendered"] = head, tail
+        return f"{head}, {quoted_file_name}, {tail}"
+
+    def _asdict(self) -> dict:
+        return {
+            "module_name": self.module_name,
+            "field_name": self.field_name,
+            "output_name": self.output_name,
+            "time_sampling": self.time_sampling,
+            "reduction_method": self.reduction_method,
+            "regional_section": self.regional_section,
+            "packing": self.packing.value,
+        }
+
+    @classmethod
+    def _from_dict(cls, data: Mapping[str, Any]) -> "DiagFieldConfig":
+        if isinstance(data, cls):
+            return data
+        kwargs = _dataclass_kwargs(cls, data)
+        kwargs["packing"] = _enum_value(cls, "packing", Packing, kwargs["packing"])
+        return cls._unchecked(**kwargs)
+
 
 @dataclasses.dataclass
-class DiagFileConfig:
+class DiagFileConfig(_CachedRendering):
     """Object representing a diagnostics file configuration.
     
     Args:
@@ -69,6 +138,97 @@ class DiagFileConfig:
     time_axis_units: str = "hours"
     time_axis_name: str = "time"
 
+    def _line(self) -> str:
+        try:
+            return self.__dict__["_rendered"]
+        except KeyError:
+            line = _join_tokens(
+                (
+                    self.name,
+                    self.frequency,
+                    self.frequency_units,
+                    self.file_format.value,
+                    self.time_axis_units,
+                    self.time_axis_name,
+                )
+            )
+            self.__dict__["_rendered"] = line
+            return line
+
+    def _asdict(self) -> dict:
+        return {
+            "name": self.name,
+            "frequency": self.frequency,
+            "frequency_units": self.frequency_units,
+            "field_configs": [field._asdict() for field in self.field_configs],
+            "file_format": self.file_format.value,
+            "time_axis_units": self.time_axis_units,
+            "time_axis_name": self.time_axis_name,
+        }
+
+    @classmethod
+    def _from_dict(cls, data: Mapping[str, Any]) -> "DiagFileConfig":
+        if isinstance(data, cls):
+            return data
+        kwargs = _dataclass_kwargs(cls, data)
+        if not isinstance(kwargs["field_configs"], (list, tuple)):
+            raise ConfigError(
+                f"field_configs of {cls.__name__} must be a list, got "
+                f"{kwargs['field_configs']!r}"
+            )
+        kwargs["field_configs"] = [
+            DiagFieldConfig._from_dict(field) for field in kwargs["field_configs"]
+        ]
+        kwargs["file_format"] = _enum_value(
+            cls, "file_format", FileFormat, kwargs["file_format"]
+        )
+        return cls._unchecked(**kwargs)
+
+
+@functools.lru_cache(maxsize=None)
+def _field_specs(cls) -> Tuple[Tuple[str, Any, Any], ...]:
+    return tuple(
+        (field.name, field.default, field.type) for field in dataclasses.fields(cls)
+    )
+
+
+def _dataclass_kwargs(cls, data: Mapping[str, Any]) -> dict:
+    """Return the value of each field of cls in data or its default, checking
+    the type of string and integer values"""
+    if not isinstance(data, Mapping):
+        raise ConfigError(f"{cls.__name__} must be a dictionary, got {data!r}")
+    kwargs = {}
+    for name, default, type_ in _field_specs(cls):
+        if name in data:
+            value = data[name]
+            if type_ in (str, int) and (
+                not isinstance(value, type_) or isinstance(value, bool)
+            ):
+                raise ConfigError(
+                    f"{name} of {cls.__name__} must be of type {type_.__name__}, "
+                    f"got {value!r}"
+                )
+            kwargs[name] = value
+        elif default is not dataclasses.MISSING:
+            kwargs[name] = default
+        else:
+            raise ConfigError(f"missing {name} in {cls.__name__} dictionary {data!r}")
+    return kwargs
+
+
+def _enum_value(cls, name: str, enum, value):
+    try:
+        return enum(value)
+    except ValueError:
+        raise ConfigError(
+            f"{name} of {cls.__name__} must be one of "
+            f"{[member.value for member in enum]}, got {value!r}"
+        )
+
+
+def _join_tokens(tokens) -> str:
+    return ", ".join(DiagTable._token_to_str(t) for t in tokens)
+
 
 @dataclasses.dataclass
 class DiagTable:
@@ -100,65 +260,34 @@ class DiagTable:
 
     def __repr__(self):
         """Representation of diag_table expected by the Fortran model."""
-        lines = []
-        lines.append(self.name)
-        lines.append(self._time_to_str(self.base_time))
+        lines = [self.name, self._time_to_str(self.base_time), ""]
+        lines.extend(file_._line() for file_ in self.file_configs)
         lines.append("")
-
         for file_ in self.file_configs:
-            lines.append(self._file_repr(file_))
+            quoted_file_name = self._token_to_str(file_.name)
+            lines.extend(field._line(quoted_file_name) for field in file_.field_configs)
+            lines.append("")
+        return "\n".join(lines)
 
-        lines.append("")
+    def duplicate_fields(self) -> List[Tuple[str, str]]:
+        """Return the file name and output name of every field whose output name
+        is used by an earlier field of the same file"""
+        duplicates = []
         for file_ in self.file_configs:
+            output_names = set()
             for field in file_.field_configs:
-                lines.append(self._field_repr(field, file_.name))
-            lines.append("")
-
-        return "\n".join(lines)
+                if field.output_name in output_names:
+                    duplicates.append((file_.name, field.output_name))
+                output_names.add(field.output_name)
+        return duplicates
 
     def asdict(self):
         return {
             "name": self.name,
             "base_time": self.base_time,
-            "file_configs": [
-                dataclasses.asdict(file_, dict_factory=self._dict_with_enums_factory)
-                for file_ in self.file_configs
-            ],
+            "file_configs": [file_._asdict() for file_ in self.file_configs],
         }
 
-    @staticmethod
-    def _dict_with_enums_factory(data):
-        def convert_value(obj):
-            if isinstance(obj, Enum):
-                return obj.value
-            return obj
-
-        return dict((k, convert_value(v)) for k, v in data)
-
-    def _file_repr(self, file_: DiagFileConfig) -> str:
-        tokens = (
-            file_.name,
-            file_.frequency,
-            file_.frequency_units,
-            file_.file_format.value,
-            file_.time_axis_units,
-            file_.time_axis_name,
-        )
-        return ", ".join(self._token_to_str(t) for t in tokens)
-
-    def _field_repr(self, field: DiagFieldConfig, file_name: str) -> str:
-        tokens = (
-            field.module_name,
-            field.field_name,
-            field.output_name,
-            file_name,
-            field.time_sampling,
-            field.reduction_method,
-            field.regional_section,
-            field.packing.value,
-        )
-        return ", ".join(self._token_to_str(t) for t in tokens)
-
     @staticmethod
     def _time_to_str(time: datetime.datetime) -> str:
         times = [time.year, time.month, time.day, time.hour, time.minute, time.second]
@@ -171,8 +300,8 @@ class DiagTable:
 
     @staticmethod
     def _str_to_token(arg: str) -> Union[str, int]:
-        if arg.startswith('"') and arg.endswith('"'):
-            return arg.strip('"')
+        if arg[:1] in ("'", '"') and arg[-1:] == arg[:1] and len(arg) > 1:
+            return arg[1:-1]
         elif arg.lower() == ".true.":
             # reduction_method can use '.true.' or '"average"' for same meaning
             return "average"
@@ -190,92 +319,334 @@ class DiagTable:
             return str(token)
 
     @staticmethod
-    def _parse_line(line: str) -> Sequence[Union[str, int]]:
-        token_strings = line.replace(" ", "").split("#")[0].strip(",").split(",")
-        return list(map(DiagTable._str_to_token, token_strings))
-
-    @staticmethod
-    def _filter_empty_lines(lines: Sequence[str]) -> Sequence[str]:
-        filtered_lines = [line for line in lines if len(line.strip(" ")) > 0]
-        filtered_lines = [line for line in filtered_lines if line.strip(" ")[0] != "#"]
-        return filtered_lines
-
-    @staticmethod
-    def _organize_lines(
-        parsed_lines: Sequence[str],
-    ) -> Tuple[Sequence[str], Mapping[str, Sequence[str]]]:
-        """Separate lines into 1) a sequence of lines describe files and 2) a mapping of
-        file name to sequence of lines for all fields in that file."""
-        file_lines = []
-        field_lines = {}
-        for tokens in parsed_lines:
-            if len(tokens) == NUMBER_OF_TOKENS_ON_FILE_LINES:
-                file_name = tokens[0]
-                file_lines.append(tokens)
-                field_lines[file_name] = []
-            elif len(tokens) == NUMBER_OF_TOKENS_ON_FIELD_LINES:
-                file_name = tokens[3]
-                if file_name not in field_lines:
+    def _parse_line(line: str, line_number: int) -> List[Union[str, int]]:
+        match = _LINE.fullmatch(line)
+        if match is None:
+            raise ConfigError(f"diag_table line {line_number} is invalid: {line!r}")
+        tokens = []
+        for double_quoted, single_quoted, bare in _TOKEN.findall(match.group("body")):
+            if bare:
+                try:
+                    tokens.append(DiagTable._str_to_token(bare))
+                except ValueError:
                     raise ConfigError(
-                        "Files must be defined before they can be used by a field in "
-                        f"diag_table. {file_name} has not been defined yet."
+                        f"diag_table line {line_number} has a value which is not a "
+                        f"quoted string, integer or logical: {bare!r}"
                     )
-                field_lines[file_name].append(tokens)
             else:
-                logger.warning(
-                    f"Ignoring a line that could not be parsed in diag_table: {tokens}"
-                )
-        return file_lines, field_lines
-
-    @staticmethod
-    def _construct_configs_from_lines(
-        file_lines, field_lines
-    ) -> Sequence[DiagFileConfig]:
-        file_configs = []
-        for file_tokens in file_lines:
-            file_name = file_tokens[0]
-            field_configs = []
-            for field_tokens in field_lines[file_name]:
-                field_configs.append(
-                    DiagFieldConfig(
-                        module_name=field_tokens[0],
-                        field_name=field_tokens[1],
-                        output_name=field_tokens[2],
-                        time_sampling=field_tokens[4],
-                        reduction_method=field_tokens[5],
-                        regional_section=field_tokens[6],
-                        packing=Packing(field_tokens[7]),
-                    )
-                )
-            file_configs.append(
-                DiagFileConfig(
-                    name=file_name,
-                    frequency=file_tokens[1],
-                    frequency_units=file_tokens[2],
-                    field_configs=field_configs,
-                    file_format=FileFormat(file_tokens[3]),
-                    time_axis_units=file_tokens[4],
-                    time_axis_name=file_tokens[5],
-                )
-            )
-        return file_configs
+                tokens.append(double_quoted or single_quoted)
+        return tokens
 
     @classmethod
     def from_dict(cls, diag_table: dict):
+        """Initialize DiagTable class from its dictionary representation, as
+        returned by :py:meth:`asdict`.
+
+        Raises:
+            ConfigError: if a value is missing or has the wrong type, or an enum
+                value is unknown
+        """
         file_configs = [
-            dacite.from_dict(DiagFileConfig, f, config=dacite.Config(cast=[Enum]))
-            for f in diag_table["file_configs"]
+            DiagFileConfig._from_dict(f) for f in diag_table["file_configs"]
         ]
         return cls(diag_table["name"], diag_table["base_time"], file_configs)
 
     @classmethod
     def from_str(cls, diag_table: str):
-        """Initialize DiagTable class from Fortran string representation."""
-        lines = diag_table.split("\n")
-        lines = cls._filter_empty_lines(lines)
-        name = lines[0]
-        base_time = cls._str_to_time(lines[1])
-        parsed_lines = list(map(cls._parse_line, lines[2:]))
-        file_lines, field_lines = cls._organize_lines(parsed_lines)
-        file_configs = cls._construct_configs_from_lines(file_lines, field_lines)
+        """Initialize DiagTable class from Fortran string representation.
+
+        Raises:
+            ConfigError: if a line cannot be parsed, naming its line number, or a
+                field refers to a file defined after it
+        """
+        numbered_lines = enumerate(diag_table.split("\n"), start=1)
+        name, base_time = cls._parse_header(numbered_lines)
+        file_configs = []
+        files_by_name = {}
+        for line_number, line in numbered_lines:
+            match = _FIELD_LINE.fullmatch(line)
+            if match is not None:
+                tokens = match.groups()
+                if tokens[6] is not None:
+                    reduction_method = _LOGICAL_REDUCTIONS[tokens[6].lower()]
+                else:
+                    reduction_method = tokens[5]
+                regional_section, packing = tokens[7], int(tokens[8])
+            elif _BLANK_OR_COMMENT.fullmatch(line):
+                continue
+            else:
+                tokens = cls._parse_line(line, line_number)
+                if len(tokens) == NUMBER_OF_TOKENS_ON_FILE_LINES:
+                    file_config = cls._file_config(tokens, line_number)
+                    file_configs.append(file_config)
+                    files_by_name[file_config.name] = file_config
+                    continue
+                elif len(tokens) != NUMBER_OF_TOKENS_ON_FIELD_LINES:
+                    logger.warning(
+                        f"Ignoring line {line_number} of diag_table which could not "
+                        f"be parsed: {tokens}"
+                    )
+                    continue
+                reduction_method, regional_section, packing = tokens[5:8]
+            file_name = tokens[3]
+            if file_name not in files_by_name:
+                raise ConfigError(
+                    "Files must be defined before they can be used by a field in "
+                    f"diag_table. {file_name} on line {line_number} has not been "
+                    "defined yet."
+                )
+            if packing not in _PACKINGS:
+                raise ConfigError(
+                    f"diag_table line {line_number} has an invalid packing {packing}"
+                )
+            files_by_name[file_name].field_configs.append(
+                DiagFieldConfig._unchecked(
+                    module_name=tokens[0],
+                    field_name=tokens[1],
+                    output_name=tokens[2],
+                    time_sampling=tokens[4],
+                    reduction_method=reduction_method,
+                    regional_section=regional_section,
+                    packing=_PACKINGS[packing],
+                )
+            )
         return cls(name, base_time, file_configs)
+
+    @classmethod
+    def _parse_header(cls, numbered_lines) -> Tuple[str, datetime.datetime]:
+        header_lines = (
+            (line_number, line)
+            for line_number, line in numbered_lines
+            if not _BLANK_OR_COMMENT.fullmatch(line)
+        )
+        try:
+            _, name = next(header_lines)
+            line_number, line = next(header_lines)
+        except StopIteration:
+            raise ConfigError("diag_table must start with a name and a base time")
+        try:
+            return name, cls._str_to_time(line)
+        except (TypeError, ValueError):
+            raise ConfigError(
+                f"diag_table line {line_number} is not a base time: {line!r}"
+            )
+
+    @staticmethod
+    def _file_config(tokens, line_number: int) -> DiagFileConfig:
+        try:
+            file_format = FileFormat(tokens[3])
+        except ValueError as err:
+            raise ConfigError(f"diag_table line {line_number} is invalid: {err}")
+        return DiagFileConfig._unchecked(
+            name=tokens[0],
+            frequency=tokens[1],
+            frequency_units=tokens[2],
+            field_configs=[],
+            file_format=file_format,
+            time_axis_units=tokens[4],
+            time_axis_name=tokens[5],
+        )
+
+
+_ON_DUPLICATE = ("raise", "skip", "replace")
+
+
+class DiagTableIndex:
+    """A diag_table indexed by file name, and by module and field name.
+
+    Lookups take constant time, and additions and removals constant time per
+    field, so that large diag tables can be built and edited programmatically.
+    Files and fields keep the order in which they were first added, also when
+    replaced.
+
+    Fields of a file are identified by their output name, and a file cannot have
+    two fields with the same output name, see
+    :py:meth:`DiagTable.duplicate_fields`. Field configurations are shared with
+    the tables the index is created from and converted to, and must not be
+    changed in place while indexed.
+
+    Args:
+        diag_table: the table to index
+        on_duplicate: what to do with a field whose output name is already used
+            in its file: "raise" a ConfigError, "skip" the field or "replace" the
+            earlier field
+
+    Raises:
+        ConfigError: if on_duplicate is "raise" and the table has duplicate
+            fields
+    """
+
+    def __init__(self, diag_table: DiagTable, on_duplicate: str = "raise"):
+        self.name = diag_table.name
+        self.base_time = diag_table.base_time
+        self._files: Dict[str, DiagFileConfig] = {}
+        self._fields: Dict[str, Dict[str, DiagFieldConfig]] = {}
+        self._locations: Dict[Tuple[str, str], Dict[Tuple[str, str], None]] = {}
+        self.merge(diag_table, on_duplicate)
+
+    @property
+    def file_names(self) -> List[str]:
+        return list(self._files)
+
+    def __len__(self) -> int:
+        """The number of fields"""
+        return sum(len(fields) for fields in self._fields.values())
+
+    def file(self, name: str) -> DiagFileConfig:
+        """Return a file configuration, with its fields
+
+        Raises:
+            KeyError: if there is no such file
+        """
+        return _with_fields(self._files[name], self._fields[name].values())
+
+    def field(self, file_name: str, output_name: str) -> DiagFieldConfig:
+        """Return the field of a file with an output name
+
+        Raises:
+            KeyError: if there is no such field
+        """
+        return self._fields[file_name][output_name]
+
+    def locations(
+        self, module_name: str, field_name: str
+    ) -> List[Tuple[str, DiagFieldConfig]]:
+        """Return the file name and configuration of every output of a field"""
+        return [
+            (file_name, self._fields[file_name][output_name])
+            for file_name, output_name in self._locations.get(
+                (module_name, field_name), ()
+            )
+        ]
+
+    def add_file(self, file_config: DiagFileConfig, on_duplicate: str = "raise"):
+        """Add a file and its fields, or add its fields to an existing file with
+        the same name.
+
+        Raises:
+            ConfigError: if a file with the same name has different settings, or
+                on_duplicate is "raise" and a field is a duplicate
+        """
+        _check_on_duplicate(on_duplicate)
+        name = file_config.name
+        existing = self._files.get(name)
+        if existing is None:
+            self._files[name] = _with_fields(file_config, ())
+            self._fields[name] = {}
+        elif existing != _with_fields(file_config, ()):
+            raise ConfigError(
+                f"diag_table file {name} is already defined with different settings"
+            )
+        self.add_fields(name, file_config.field_configs, on_duplicate)
+
+    def add_fields(
+        self,
+        file_name: str,
+        field_configs: Iterable[DiagFieldConfig],
+        on_duplicate: str = "raise",
+    ):
+        """Add fields to a file.
+
+        Raises:
+            KeyError: if there is no such file
+            ConfigError: if on_duplicate is "raise" and a field is a duplicate
+        """
+        _check_on_duplicate(on_duplicate)
+        fields = self._fields[file_name]
+        field_configs = list(field_configs)
+        if on_duplicate == "raise":
+            output_names = set()
+            for field in field_configs:
+                if field.output_name in fields or field.output_name in output_names:
+                    raise ConfigError(
+                        f"diag_table file {file_name} already has a field with output "
+                        f"name {field.output_name}"
+                    )
+                output_names.add(field.output_name)
+        for field in field_configs:
+            existing = fields.get(field.output_name)
+            if existing is not None:
+                if on_duplicate == "skip":
+                    continue
+                self._unlocate(file_name, existing)
+            fields[field.output_name] = field
+            key = (field.module_name, field.field_name)
+            self._locations.setdefault(key, {})[(file_name, field.output_name)] = None
+
+    def remove_file(self, name: str):
+        """Remove a file and its fields
+
+        Raises:
+            KeyError: if there is no such file
+        """
+        del self._files[name]
+        for field in self._fields.pop(name).values():
+            self._unlocate(name, field)
+
+    def remove_fields(
+        self, keys: Iterable[Tuple[str, str]], file_names: Iterable[str] = None
+    ) -> int:
+        """Remove every output of fields, given by module and field name.
+
+        Args:
+            keys: module and field name of each field to remove
+            file_names: if given, remove the fields from these files only
+
+        Returns:
+            the number of fields removed
+        """
+        file_names = None if file_names is None else set(file_names)
+        n_removed = 0
+        for key in keys:
+            locations = self._locations.get(key, {})
+            for file_name, output_name in list(locations):
+                if file_names is None or file_name in file_names:
+                    self._unlocate(file_name, self._fields[file_name].pop(output_name))
+                    n_removed += 1
+        return n_removed
+
+    def merge(self, diag_table: DiagTable, on_duplicate: str = "raise"):
+        """Add the files and fields of a diag_table, keeping the name and base
+        time of this index.
+
+        Raises:
+            ConfigError: if a file of both tables has different settings, or
+                on_duplicate is "raise" and a field is a duplicate
+        """
+        for file_config in diag_table.file_configs:
+            self.add_file(file_config, on_duplicate)
+
+    def to_diag_table(self) -> DiagTable:
+        """Return the indexed diag_table"""
+        return DiagTable(
+            self.name,
+            self.base_time,
+            [
+                _with_fields(file_config, self._fields[name].values())
+                for name, file_config in self._files.items()
+            ],
+        )
+
+    def _unlocate(self, file_name: str, field: DiagFieldConfig):
+        key = (field.module_name, field.field_name)
+        locations = self._locations[key]
+        del locations[(file_name, field.output_name)]
+        if len(locations) == 0:
+            del self._locations[key]
+
+
+def _check_on_duplicate(on_duplicate: str):
+    if on_duplicate not in _ON_DUPLICATE:
+        raise ValueError(
+            f"on_duplicate must be one of {_ON_DUPLICATE}, got {on_duplicate!r}"
+        )
+
+
+def _with_fields(
+    file_config: DiagFileConfig, field_configs: Iterable[DiagFieldConfig]
+) -> DiagFileConfig:
+    attributes = {
+        name: getattr(file_config, name) for name, _, _ in _field_specs(DiagFileConfig)
+    }
+    attributes["field_configs"] = list(field_configs)
+    return DiagFileConfig._unchecked(**attributes)
@@ -0,0 +1,240 @@
+"""Generation of ensembles of configurations with sampled parameters"""
+from concurrent.futures import ProcessPoolExecutor
+import dataclasses
+import itertools
+import os
+from typing import Any, Iterable, Iterator, List, Mapping, Sequence, Tuple, Union
+
+from .._exceptions import ConfigError, DelayedImportError
+from .frozen import FrozenConfig, freeze, with_updates
+from .namelist import _iter_namelists
+from .rundir import write_run_directory
+
+try:
+    import numpy as np
+except ImportError as err:
+    np = DelayedImportError(err)
+
+ParameterPath = Union[str, Sequence[str]]
+
+
+@dataclasses.dataclass(frozen=True)
+class Grid:
+    """Values of a parameter, every one of which is combined with every value of
+    the other grid parameters of an ensemble.
+
+    Args:
+        values: the values of the parameter
+    """
+
+    values: Sequence[Any]
+
+
+@dataclasses.dataclass(frozen=True)
+class Uniform:
+    """Uniform distribution of a parameter between low and high.
+
+    Args:
+        low: lower bound
+        high: upper bound
+    """
+
+    low: float
+    high: float
+
+    def sample(self, rng, size: int) -> List[float]:
+        return rng.uniform(self.low, self.high, size).tolist()
+
+
+@dataclasses.dataclass(frozen=True)
+class LogUniform:
+    """Distribution of a parameter whose logarithm is uniform between the
+    logarithms of low and high.
+
+    Args:
+        low: lower bound, must be positive
+        high: upper bound, must be positive
+    """
+
+    low: float
+    high: float
+
+    def __post_init__(self):
+        if self.low <= 0 or self.high <= 0:
+            raise ValueError(f"bounds of LogUniform must be positive, got {self}")
+
+    def sample(self, rng, size: int) -> List[float]:
+        return np.exp(rng.uniform(np.log(self.low), np.log(self.high), size)).tolist()
+
+
+@dataclasses.dataclass(frozen=True)
+class Normal:
+    """Normal distribution of a parameter.
+
+    Args:
+        mean: mean of the distribution
+        std: standard deviation of the distribution
+    """
+
+    mean: float
+    std: float
+
+    def sample(self, rng, size: int) -> List[float]:
+        return rng.normal(self.mean, self.std, size).tolist()
+
+
+@dataclasses.dataclass(frozen=True)
+class Choice:
+    """Distribution of a parameter taking one of given values with equal
+    probability.
+
+    Args:
+        values: the possible values of the parameter
+    """
+
+    values: Sequence[Any]
+
+    def sample(self, rng, size: int) -> List[Any]:
+        if len(self.values) == 0:
+            raise ValueError("Choice must be given at least one value")
+        indices = rng.integers(len(self.values), size=size).tolist()
+        return [self.values[i] for i in indices]
+
+
+Distribution = Union[Uniform, LogUniform, Normal, Choice]
+_DISTRIBUTIONS = (Uniform, LogUniform, Normal, Choice)
+
+
+def generate_ensemble(
+    base_config: Mapping,
+    parameters: Mapping[ParameterPath, Union[Grid, Distribution]],
+    n_samples: int = 1,
+    seed: int = None,
+) -> Iterator[FrozenConfig]:
+    """Generate the configurations of an ensemble with parameters set on a grid
+    or sampled from distributions.
+
+    The ensemble has ``n_samples`` members for every combination of the values
+    of the :py:class:`Grid` parameters, in the order of
+    :py:func:`itertools.product`. Parameters with a distribution are sampled for
+    all members at once, which requires NumPy.
+
+    Members are :py:class:`fv3config.FrozenConfig` objects sharing all unchanged
+    sections with the base configuration, and are created only as the generator
+    is consumed. Pass them to :py:func:`write_ensemble` to write them.
+
+    Args:
+        base_config: the configuration dictionary to set parameters in
+        parameters: a :py:class:`Grid` or distribution for each parameter, by the
+            path of keys to it, such as ``("namelist", "fv_core_nml", "n_sponge")``
+            or ``"namelist.fv_core_nml.n_sponge"``
+        n_samples: number of members for each combination of grid values
+        seed: seed of the random number generator sampling distributions
+
+    Raises:
+        ConfigError: if a parameter is not a Grid or a distribution
+    """
+    grid_paths, grid_values, sampled_paths, distributions = [], [], [], []
+    for key, parameter in parameters.items():
+        path = _as_path(key)
+        if isinstance(parameter, Grid):
+            grid_paths.append(path)
+            grid_values.append(parameter.values)
+        elif isinstance(parameter, _DISTRIBUTIONS):
+            sampled_paths.append(path)
+            distributions.append(parameter)
+        else:
+            raise ConfigError(
+                f"parameter {key} must be a Grid or a distribution, got {parameter!r}"
+            )
+    n_points = 1
+    for values in grid_values:
+        n_points *= len(values)
+    n_members = n_points * n_samples
+    if len(distributions) > 0:
+        rng = np.random.default_rng(seed)
+        samples = [
+            distribution.sample(rng, n_members) for distribution in distributions
+        ]
+    else:
+        samples = []
+    return _members(
+        freeze(base_config), grid_paths + sampled_paths, grid_values, samples, n_samples
+    )
+
+
+def _members(base, paths, grid_values, samples, n_samples):
+    # the sub-dictionary updated by each parameter, to merge each of them once
+    parents = {}
+    for path in paths:
+        parents.setdefault(path[:-1], []).append(path)
+    index = 0
+    for point in itertools.product(*grid_values):
+        for _ in range(n_samples):
+            values = dict(zip(paths, point + tuple(s[index] for s in samples)))
+            updates = [
+                (parent, {path[-1]: values[path] for path in children})
+                for parent, children in parents.items()
+            ]
+            yield with_updates(base, updates)
+            index += 1
+
+
+def _as_path(key: ParameterPath) -> Tuple[str, ...]:
+    path = tuple(key.split(".")) if isinstance(key, str) else tuple(key)
+    if len(path) == 0:
+        raise ConfigError("parameter path must not be empty")
+    return path
+
+
+def write_ensemble(
+    configs: Iterable[Mapping],
+    target_directories: Iterable[str],
+    processes: int = None,
+    namelist_only: bool = False,
+) -> List[str]:
+    """Write a run directory, or only an input.nml file, for each configuration
+    of an ensemble.
+
+    Run directories are written by a pool of ``processes`` processes, or in this
+    process if ``processes`` is 1. An input.nml file alone is rendered in this
+    process, where namelist groups shared between the configurations are
+    rendered once, see :py:func:`fv3config.configs_to_namelists`.
+
+    Args:
+        configs: configuration dictionaries, such as those generated by
+            :py:func:`generate_ensemble`
+        target_directories: a local directory for each configuration, created if
+            it does not exist
+        processes: number of processes writing run directories, defaults to the
+            number of CPUs
+        namelist_only: if True, write only the input.nml file of each
+            configuration
+
+    Returns:
+        the directories written, in order
+    """
+    written = []
+    if namelist_only:
+        for target_directory, text in zip(target_directories, _iter_namelists(configs)):
+            os.makedirs(target_directory, exist_ok=True)
+            with open(os.path.join(target_directory, "input.nml"), "w") as f:
+                f.write(text)
+            written.append(target_directory)
+    elif processes == 1:
+        for config, target_directory in zip(configs, target_directories):
+            write_run_directory(config, target_directory)
+            written.append(target_directory)
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [
+                (
+                    target_directory,
+                    executor.submit(write_run_directory, config, target_directory),
+                )
+                for config, target_directory in zip(configs, target_directories)
+            ]
+            for target_directory, future in futures:
+                future.result()
+                written.append(target_directory)
+    return written
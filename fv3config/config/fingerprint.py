@@ -0,0 +1,139 @@
+"""Stable content hashes of configuration dictionaries"""
+from datetime import date, datetime, time, timedelta
+import hashlib
+import os
+from typing import Any, Mapping, Optional
+
+from .. import filesystem
+from .._asset_list import is_streamed, iter_bytes_repeatable
+from .. import _asset_list_config
+from .._datastore import get_diag_table_filename
+from .._exceptions import ConfigError
+from ._blob_store import BlobReference
+from .diag_table import DiagTable
+
+_FINGERPRINT_VERSION = b"fv3config-fingerprint-1"
+# info keys identifying a version of a file, in order of preference
+_GENERATION_KEYS = ("generation", "ETag", "etag", "md5Hash", "mtime", "updated")
+
+
+def fingerprint(config: Mapping, include_generations: bool = False) -> str:
+    """Return a stable hash of the contents of a configuration dictionary.
+
+    The hash covers the namelist, the diag_table and the asset specifications,
+    and does not depend on the order of dictionary keys or on the process
+    computing it, so it can be used as a key of caches shared between runs.
+    Binary values are hashed by content, and a loaded
+    :py:class:`fv3config.BlobReference` hashes like the data it refers to,
+    without reading it.
+
+    Args:
+        config: a configuration dictionary
+        include_generations (optional): if True, also hash the version of every
+            file the configuration copies from (the object generation or etag of
+            remote files, the modification time of local files), so that the
+            hash changes when a source is overwritten. This lists and stats the
+            sources, within a :py:func:`fv3config.filesystem.metadata_cache`.
+            Defaults to False.
+
+    Returns:
+        a sha256 hex digest
+
+    Raises:
+        ConfigError: if the config contains a value which cannot be hashed, such
+            as a bytes asset whose data is a stream which can only be read once
+    """
+    digest = hashlib.sha256(_FINGERPRINT_VERSION)
+    _update(digest, config)
+    if include_generations:
+        with filesystem.metadata_cache():
+            _update(digest, _source_generations(config))
+    return digest.hexdigest()
+
+
+def serialized_fingerprint(value: Any) -> str:
+    """Return a hash of a value which differs whenever its serialization by
+    :py:func:`fv3config.dump` does, unlike :py:func:`fingerprint` which hashes a
+    BlobReference like the data it refers to."""
+    digest = hashlib.sha256(_FINGERPRINT_VERSION)
+    _update(digest, value, references_by_content=False)
+    return digest.hexdigest()
+
+
+def _update(digest, value: Any, references_by_content: bool = True):
+    if value is None:
+        digest.update(b"N")
+    elif isinstance(value, bool):
+        digest.update(b"T" if value else b"F")
+    elif isinstance(value, int):
+        digest.update(b"i%d;" % value)
+    elif isinstance(value, float):
+        digest.update(b"f" + repr(value).encode() + b";")
+    elif isinstance(value, str):
+        _update_sized(digest, b"s", value.encode("utf-8"))
+    elif isinstance(value, BlobReference):
+        tag = b"b" if references_by_content else b"h"
+        digest.update(tag + bytes.fromhex(value.sha256))
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        digest.update(b"b" + hashlib.sha256(value).digest())
+    elif isinstance(value, Mapping):
+        digest.update(b"d%d;" % len(value))
+        for key in sorted(value, key=_sort_key):
+            _update(digest, key, references_by_content)
+            _update(digest, value[key], references_by_content)
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"l%d;" % len(value))
+        for item in value:
+            _update(digest, item, references_by_content)
+    elif isinstance(value, DiagTable):
+        digest.update(b"D")
+        _update(digest, value.asdict(), references_by_content)
+    elif isinstance(value, (datetime, date, time)):
+        _update_sized(digest, b"t", value.isoformat().encode())
+    elif isinstance(value, timedelta):
+        digest.update(b"r%d;" % (value // timedelta(microseconds=1)))
+    elif is_streamed(value):
+        data_digest = hashlib.sha256()
+        for chunk in iter_bytes_repeatable(value):
+            data_digest.update(chunk)
+        digest.update(b"b" + data_digest.digest())
+    else:
+        raise ConfigError(
+            f"cannot fingerprint value of type {type(value).__name__}: {value!r}"
+        )
+
+
+def _update_sized(digest, tag: bytes, data: bytes):
+    digest.update(tag + b"%d:" % len(data))
+    digest.update(data)
+
+
+def _sort_key(key):
+    return (type(key).__name__, str(key))
+
+
+def _source_generations(config: Mapping) -> Mapping[str, Optional[str]]:
+    sources = [
+        os.path.join(asset["source_location"], asset["source_name"])
+        for asset in _asset_list_config.config_to_asset_list(config)
+        if "source_location" in asset
+    ]
+    if isinstance(config.get("diag_table"), str):
+        sources.append(get_diag_table_filename(config))
+    generations = {}
+    for source in sources:
+        info = filesystem.info(source)
+        if info is not None:
+            generations[source] = generation(info) or f"size={info.get('size')}"
+        else:
+            generations[source] = None
+    return generations
+
+
+def generation(info: Mapping) -> Optional[str]:
+    """Return the version of a file given its info, or None if the filesystem
+    does not report one"""
+    for key in _GENERATION_KEYS:
+        if info.get(key) is not None:
+            return f"{key}={info[key]}"
+    return None
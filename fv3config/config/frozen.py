@@ -0,0 +1,146 @@
+"""Immutable configuration dictionaries with structural sharing"""
+import copy
+from typing import Any, Iterable, Mapping, Sequence, Tuple
+
+Path = Sequence[str]
+
+
+def _immutable(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} is immutable")
+
+
+class FrozenConfig(dict):
+    """An immutable configuration dictionary.
+
+    Since it is a dict, it can be used wherever a configuration dictionary is
+    read. Methods which change it return a new FrozenConfig sharing all unchanged
+    sub-dictionaries and lists with the original, so derived configurations cost
+    time and memory in proportion to the change, not to the configuration.
+    Functions of :py:mod:`fv3config` which derive configurations, such as
+    :py:func:`fv3config.set_run_duration`, return a FrozenConfig when given one.
+
+    Create one with :py:func:`freeze`, and convert back to a plain dictionary
+    with :py:meth:`to_dict`.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = _immutable
+    clear = pop = popitem = setdefault = update = __ior__ = _immutable
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict.__repr__(self)})"
+
+    def set(self, key: str, value: Any) -> "FrozenConfig":
+        """Return a copy with key set to value"""
+        items = dict(self)
+        items[key] = freeze(value)
+        return FrozenConfig(items)
+
+    def remove(self, key: str) -> "FrozenConfig":
+        """Return a copy without key"""
+        items = dict(self)
+        del items[key]
+        return FrozenConfig(items)
+
+    def set_in(self, path: Path, value: Any) -> "FrozenConfig":
+        """Return a copy with the value at a path of keys set, creating missing
+        sub-dictionaries"""
+        return self.merge_in(path[:-1], {path[-1]: value})
+
+    def merge_in(self, path: Path, values: Mapping[str, Any]) -> "FrozenConfig":
+        """Return a copy with values set in the sub-dictionary at a path of keys,
+        creating missing sub-dictionaries"""
+        if len(path) == 0:
+            items = dict(self)
+            items.update((key, freeze(value)) for key, value in values.items())
+            return FrozenConfig(items)
+        child = self.get(path[0], _EMPTY)
+        if not isinstance(child, FrozenConfig):
+            child = freeze(child)
+        return self.set(path[0], child.merge_in(path[1:], values))
+
+    def to_dict(self) -> dict:
+        """Return a plain, mutable copy"""
+        return thaw(self)
+
+
+class FrozenList(list):
+    """An immutable list within a :py:class:`FrozenConfig`"""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = extend = insert = remove = pop = clear = sort = reverse = _immutable
+
+    def __reduce__(self):
+        return (type(self), (list(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return f"{type(self).__name__}({list.__repr__(self)})"
+
+
+_EMPTY = FrozenConfig()
+
+
+def freeze(value: Any) -> Any:
+    """Return an immutable version of a configuration dictionary or value.
+
+    Dictionaries and lists are converted recursively, already frozen values are
+    returned as they are, and other values are shared with the original.
+    """
+    if isinstance(value, (FrozenConfig, FrozenList)):
+        return value
+    elif isinstance(value, dict):
+        return FrozenConfig((key, freeze(item)) for key, item in value.items())
+    elif isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Return a plain, mutable copy of a configuration dictionary or value."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    elif isinstance(value, list):
+        return [thaw(item) for item in value]
+    return value
+
+
+def with_updates(config: Mapping, updates: Iterable[Tuple[Path, Mapping]]):
+    """Return a configuration with values merged into the sub-dictionaries at
+    given paths, creating missing sub-dictionaries.
+
+    A FrozenConfig is updated with structural sharing, and other configurations
+    are deep-copied first.
+
+    Args:
+        config: a configuration dictionary
+        updates: pairs of a path of keys and the values to set there
+    """
+    if isinstance(config, FrozenConfig):
+        for path, values in updates:
+            config = config.merge_in(path, values)
+        return config
+    config = copy.deepcopy(config)
+    for path, values in updates:
+        node = config
+        for key in path:
+            node = node.setdefault(key, {})
+        node.update(copy.deepcopy(values))
+    return config
@@ -1,24 +1,91 @@
 import io
+import logging
+from typing import Iterable, Iterator, List, Mapping
 import f90nml
 from .._exceptions import InvalidFileError
+from . import _fast_namelist
+from .frozen import FrozenConfig
+
+logger = logging.getLogger("fv3config")
+
+# bounds the memory used by configs_to_namelists for long sequences of configs
+_MAX_RENDERED_GROUPS = 4096
 
 
 def config_to_namelist(config) -> str:
     """Write the namelist of a configuration dictionary to a namelist file.
 
+    The text is identical to what f90nml writes. Namelists of scalars and lists
+    of booleans, integers, floats and strings are written by a specialized
+    writer, and any others by f90nml.
+
     Args:
         config (dict): a configuration dictionary
         namelist_filename (str): filename to write, will be overwritten if present
     """
+    try:
+        return _fast_namelist.dumps(config["namelist"])
+    except _fast_namelist.UnsupportedNamelist as err:
+        logger.debug(f"writing namelist with f90nml: {err}")
+        return _f90nml_text(config["namelist"])
+
+
+def _f90nml_text(namelist) -> str:
     f = io.StringIO()
-    f90nml.write(config["namelist"], f)
+    f90nml.write(namelist, f)
     return f.getvalue()
 
 
+def configs_to_namelists(configs: Iterable[Mapping]) -> List[str]:
+    """Return the namelist text of each of a sequence of configuration
+    dictionaries, as :py:func:`config_to_namelist` would.
+
+    Immutable namelist groups shared between configurations, such as the
+    unchanged groups of configurations derived from a
+    :py:class:`fv3config.FrozenConfig`, are rendered once.
+
+    Args:
+        configs: configuration dictionaries
+
+    Returns:
+        the text of each namelist, in order
+    """
+    return list(_iter_namelists(configs))
+
+
+def _iter_namelists(configs: Iterable[Mapping]) -> Iterator[str]:
+    # only FrozenConfig groups are memoized, since others may be changed in place
+    # between configs; they are kept alive so that their ids are not reused
+    rendered_groups = {}
+    groups = []
+    for config in configs:
+        if len(rendered_groups) > _MAX_RENDERED_GROUPS:
+            rendered_groups.clear()
+            groups.clear()
+        namelist = config["namelist"]
+        try:
+            parts = []
+            for name, group in _fast_namelist.ordered_items(namelist):
+                if not isinstance(group, FrozenConfig):
+                    parts.append(_fast_namelist.dump_group(name, group))
+                    continue
+                key = (name, id(group))
+                if key not in rendered_groups:
+                    groups.append(group)
+                    rendered_groups[key] = _fast_namelist.dump_group(name, group)
+                parts.append(rendered_groups[key])
+            yield "\n".join(parts)
+        except _fast_namelist.UnsupportedNamelist as err:
+            logger.debug(f"writing namelist with f90nml: {err}")
+            yield _f90nml_text(namelist)
+
+
 def config_from_namelist(namelist_filename):
     """Read a configuration dictionary from a namelist file.
 
-    Only reads the namelist configuration.
+    Only reads the namelist configuration. Namelists of scalars and lists of
+    booleans, integers, floats and strings are read by a specialized reader, and
+    any others by f90nml, with the same result.
 
     Args:
         namelist_filename (str): a namelist filename
@@ -30,10 +97,29 @@ def config_from_namelist(namelist_filename):
         InvalidFileError: if the specified filename does not exist
     """
     try:
-        return_dict = _to_nested_dict(f90nml.read(namelist_filename).items())
+        with open(namelist_filename, "r") as f:
+            return _fast_namelist.loads(f.read())
     except FileNotFoundError:
         raise InvalidFileError(f"namelist {namelist_filename} does not exist")
-    return return_dict
+    except _fast_namelist.UnsupportedNamelist as err:
+        logger.debug(f"reading {namelist_filename} with f90nml: {err}")
+    return _to_nested_dict(f90nml.read(namelist_filename).items())
+
+
+def configs_from_namelists(namelist_filenames: Iterable[str]) -> List[dict]:
+    """Read the namelist configuration of each of a sequence of namelist files,
+    as :py:func:`config_from_namelist` would.
+
+    Args:
+        namelist_filenames: namelist filenames
+
+    Returns:
+        a configuration dictionary for each file, in order
+
+    Raises:
+        InvalidFileError: if a specified filename does not exist
+    """
+    return [config_from_namelist(filename) for filename in namelist_filenames]
 
 
 def _to_nested_dict(source):
@@ -1,14 +1,15 @@
 import collections
-from copy import deepcopy
 from datetime import datetime, timedelta
 import os
 from typing import Sequence, List, Mapping
 import math
 import fsspec
+from .. import filesystem
 from .._asset_list import get_asset_dict
 from .._exceptions import ConfigError
 from ..filesystem import get_fs
 from .derive import get_run_duration, get_time_configuration
+from .frozen import with_updates
 
 SECONDS_IN_HOUR = 60 * 60
 
@@ -53,12 +54,13 @@ def get_nudging_assets(
     nudge_filename_pattern: str = "%Y%m%d_%HZ_T85LR.nc",
     copy_method: str = "copy",
     nudge_interval: timedelta = timedelta(hours=6),
+    verify: bool = False,
 ) -> List[Mapping]:
     """Return list of assets of nudging files required for given run duration and
     start time.
     
     This method defines file paths directly from its arguments, without
-    determining whether the files themselves are present.
+    determining whether the files themselves are present unless verify is True.
     
     Args:
         run_duration: length of fv3gfs run
@@ -70,12 +72,15 @@ def get_nudging_assets(
         copy_method: copy_method for nudging file assets. Defaults to 'copy'.
         nudge_interval: time between nudging files. Must be multiple of 1 hour.
             Defaults to 6 hours.
+        verify: if True, check that all files are present by listing
+            nudge_path once. Defaults to False.
 
     Returns:
         list of all assets required for nudging run
 
     Raises:
-        ConfigError: if copy_method is "link" and a remote path is given for nudge_path
+        ConfigError: if copy_method is "link" and a remote path is given for
+            nudge_path, or if verify is True and any file is missing
     """
     if get_fs(nudge_path) != fsspec.filesystem("file") and copy_method == "link":
         raise ConfigError(
@@ -84,6 +89,13 @@ def get_nudging_assets(
         )
     time_list = _get_nudge_time_list(run_duration, current_date, nudge_interval)
     filename_list = [time.strftime(nudge_filename_pattern) for time in time_list]
+    if verify:
+        missing = _missing_files(nudge_path, filename_list)
+        if len(missing) > 0:
+            raise ConfigError(
+                f"{len(missing)} of {len(filename_list)} nudging files are missing "
+                f"from {nudge_path}: {missing}"
+            )
     nudging_assets = [
         get_asset_dict(
             nudge_path, file_, target_location="INPUT", copy_method=copy_method
@@ -93,6 +105,56 @@ def get_nudging_assets(
     return nudging_assets
 
 
+def get_missing_nudging_files(config: Mapping) -> List[str]:
+    """Return the nudging files required by a configuration which are missing.
+
+    The expected times are matched against a single listing of the
+    'gfs_analysis_data' url, instead of checking the existence of each file.
+
+    Args:
+        config: configuration dictionary with a 'gfs_analysis_data' section
+
+    Returns:
+        names of missing files relative to the 'gfs_analysis_data' url, in time
+        order
+
+    Raises:
+        ConfigError: if provided config does not contain "gfs_analysis_data" section.
+    """
+    gfs_analysis_data = _get_gfs_analysis_data(config)
+    _, current_date = get_time_configuration(config)
+    time_list = _get_nudge_time_list(
+        get_run_duration(config),
+        current_date,
+        gfs_analysis_data.get("interval", timedelta(hours=6)),
+    )
+    filename_list = [
+        time.strftime(gfs_analysis_data["filename_pattern"]) for time in time_list
+    ]
+    return _missing_files(gfs_analysis_data["url"], filename_list)
+
+
+def _missing_files(nudge_path: str, filename_list: Sequence[str]) -> List[str]:
+    """Return the filenames not present under nudge_path, listing each directory
+    containing them once"""
+    present = set()
+    directories = {os.path.dirname(filename) for filename in filename_list}
+    for directory in directories:
+        for name in filesystem.listdir(os.path.join(nudge_path, directory)):
+            present.add(os.path.join(directory, name))
+    return [filename for filename in filename_list if filename not in present]
+
+
+def _get_gfs_analysis_data(config: Mapping) -> Mapping:
+    gfs_analysis_data = config.get("gfs_analysis_data", {})
+    if "url" not in gfs_analysis_data or "filename_pattern" not in gfs_analysis_data:
+        raise ConfigError(
+            "Config must contain 'gfs_analysis_data' section with 'url' and"
+            "'filename_pattern' items if 'namelist.fv_core_nml.nudge' is True."
+        )
+    return gfs_analysis_data
+
+
 def _non_nudging_assets(
     assets: Sequence[Mapping], filename_pattern: str,
 ) -> List[Mapping]:
@@ -113,45 +175,35 @@ def _is_nudging_asset(item, pattern):
         return False
 
 
-def _clear_nudging_assets(config):
-    """Remove any assets in patch_files that match given filename_pattern"""
-    pattern = config["gfs_analysis_data"]["filename_pattern"]
-    if "patch_files" in config:
-        config["patch_files"] = _non_nudging_assets(config["patch_files"], pattern)
-
-
-def enable_nudging(config: Mapping) -> Mapping:
+def enable_nudging(config: Mapping, verify: bool = False) -> Mapping:
     """Return config object with necessary nudging file assets and associated
     file_names namelist entry. Requires 'gfs_analysis_data' entry in fv3config object
-    with 'url' and 'filename_pattern' entries.
+    with 'url' and 'filename_pattern' entries. Returns a FrozenConfig if config
+    is one.
     
     Args:
         config: configuration dictionary
+        verify: if True, check that all nudging files are present by listing
+            the 'gfs_analysis_data' url once. Defaults to False.
 
     Raises:
-        ConfigError: if provided config does not contain "gfs_analysis_data" section.
+        ConfigError: if provided config does not contain "gfs_analysis_data"
+            section, or if verify is True and any nudging file is missing.
 
     Note:
         will delete any existing assets in 'patch_files' that match the given
         filename_pattern before new assets are added.
     """
-    gfs_analysis_data = config.get("gfs_analysis_data", {})
-    if "url" not in gfs_analysis_data or "filename_pattern" not in gfs_analysis_data:
-        raise ConfigError(
-            "Config must contain 'gfs_analysis_data' section with 'url' and"
-            "'filename_pattern' items if 'namelist.fv_core_nml.nudge' is True."
-        )
-
-    config_copy = deepcopy(config)
-    _clear_nudging_assets(config_copy)
-    _, current_date = get_time_configuration(config_copy)
+    gfs_analysis_data = _get_gfs_analysis_data(config)
+    _, current_date = get_time_configuration(config)
     nudging_file_assets = get_nudging_assets(
-        get_run_duration(config_copy),
+        get_run_duration(config),
         current_date,
         gfs_analysis_data["url"],
         nudge_filename_pattern=gfs_analysis_data["filename_pattern"],
         copy_method=gfs_analysis_data.get("copy_method", "copy"),
         nudge_interval=gfs_analysis_data.get("interval", timedelta(hours=6)),
+        verify=verify,
     )
 
     target_file_paths = [
@@ -159,7 +211,13 @@ def enable_nudging(config: Mapping) -> Mapping:
         for asset in nudging_file_assets
     ]
 
-    namelist = config_copy["namelist"]
-    namelist.setdefault("fv_nwp_nudge_nml", {})["file_names"] = target_file_paths
-    config_copy.setdefault("patch_files", []).extend(nudging_file_assets)
-    return config_copy
+    patch_files = _non_nudging_assets(
+        config.get("patch_files", []), gfs_analysis_data["filename_pattern"]
+    )
+    return with_updates(
+        config,
+        [
+            (("namelist", "fv_nwp_nudge_nml"), {"file_names": target_file_paths}),
+            ((), {"patch_files": patch_files + nudging_file_assets}),
+        ],
+    )
@@ -0,0 +1,237 @@
+"""Estimates of the diagnostic output written by a run"""
+import dataclasses
+from datetime import timedelta
+from typing import List, Mapping, Optional, Tuple, Union
+
+from .. import filesystem
+from .. import _transfer
+from .._datastore import get_diag_table_filename, get_resolution
+from .._exceptions import ConfigError
+from .default import NAMELIST_DEFAULTS
+from .derive import get_run_duration, get_timestep
+from .diag_table import DiagFieldConfig, DiagTable, Packing
+
+# diagnostics of the dynamical core and physics with a value on every model level
+THREE_DIMENSIONAL_FIELDS = frozenset(
+    [
+        "ucomp",
+        "vcomp",
+        "temp",
+        "delp",
+        "delz",
+        "w",
+        "omega",
+        "pfnh",
+        "ppnh",
+        "sphum",
+        "liq_wat",
+        "ice_wat",
+        "rainwat",
+        "snowwat",
+        "graupel",
+        "o3mr",
+        "sgs_tke",
+        "cld_amt",
+        "vort",
+        "pv",
+        "reflectivity",
+        "t_dt_phys",
+        "u_dt_phys",
+        "v_dt_phys",
+        "qv_dt_phys",
+        "t_dt_gfdlmp",
+        "qv_dt_gfdlmp",
+        "ql_dt_gfdlmp",
+        "qi_dt_gfdlmp",
+    ]
+)
+
+_BYTES_PER_VALUE = {Packing.DOUBLE_PRECISION: 8, Packing.SINGLE_PRECISION: 4}
+_SECONDS_PER_UNIT = {
+    "seconds": 1,
+    "minutes": 60,
+    "hours": 3600,
+    "days": 86400,
+    # months and years are approximated as 30 and 365 days
+    "months": 30 * 86400,
+    "years": 365 * 86400,
+}
+
+
+@dataclasses.dataclass
+class DiagFileEstimate:
+    """Estimated output of a file of a diag_table.
+
+    Args:
+        name: name of the file in the diag_table
+        n_fields: number of fields in the file
+        n_records: number of records written during the run
+        bytes_per_record: bytes of data written per record, over all tiles
+        total_bytes: bytes of data written during the run
+        n_netcdf_files: number of netCDF files the output is split into, one for
+            each tile and I/O domain
+        writes_per_hour: average number of records written to a netCDF file per
+            hour of simulated time, over all of its netCDF files
+    """
+
+    name: str
+    n_fields: int
+    n_records: int
+    bytes_per_record: int
+    total_bytes: int
+    n_netcdf_files: int
+    writes_per_hour: float
+
+
+@dataclasses.dataclass
+class DiagOutputEstimate:
+    """Estimated diagnostic output of a run.
+
+    Args:
+        files: estimate for each file of the diag_table
+        run_duration: duration of the run
+        total_bytes: bytes of data written during the run
+        writes_per_hour: average number of records written to netCDF files per
+            hour of simulated time
+        upload_seconds: time to upload the output at the given bandwidth, or
+            None if no bandwidth is known
+    """
+
+    files: List[DiagFileEstimate]
+    run_duration: timedelta
+    total_bytes: int
+    writes_per_hour: float
+    upload_seconds: Optional[float]
+
+    def summary(self) -> str:
+        """Return a table of the estimate, one line per file"""
+        lines = [
+            f"{'file':<30}{'fields':>8}{'records':>10}{'size':>12}{'writes/hour':>14}"
+        ]
+        for file_ in self.files:
+            lines.append(
+                f"{file_.name:<30}{file_.n_fields:>8}{file_.n_records:>10}"
+                f"{_format_bytes(file_.total_bytes):>12}{file_.writes_per_hour:>14.1f}"
+            )
+        lines.append(
+            f"{'total':<30}{'':>8}{'':>10}{_format_bytes(self.total_bytes):>12}"
+            f"{self.writes_per_hour:>14.1f}"
+        )
+        lines.append(f"run duration: {self.run_duration}")
+        if self.upload_seconds is not None:
+            lines.append(
+                f"upload time: {timedelta(seconds=round(self.upload_seconds))}"
+            )
+        return "\n".join(lines)
+
+
+def _format_bytes(n_bytes: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if n_bytes < 1024 or unit == "TiB":
+            return f"{n_bytes:.1f} {unit}"
+        n_bytes /= 1024
+
+
+def estimate_diagnostic_output(
+    config: Mapping,
+    upload_bytes_per_second: float = None,
+    field_levels: Mapping[Union[str, Tuple[str, str]], int] = None,
+) -> DiagOutputEstimate:
+    """Estimate the volume and frequency of the diagnostic output of a run.
+
+    The estimate counts the data of every field of the diag_table on the full
+    grid of every tile, at the precision of its packing. Fields named in
+    :py:data:`THREE_DIMENSIONAL_FIELDS` have npz levels and others one, unless
+    given in field_levels. Regional sections, coordinates and netCDF metadata are
+    not accounted for. A file with a frequency of 0 is written every timestep, and
+    a static file, with a frequency of -1, once.
+
+    Args:
+        config: a configuration dictionary
+        upload_bytes_per_second (optional): bandwidth used to estimate the upload
+            time of the output, defaults to the limit set with
+            :py:func:`fv3config.filesystem.set_bandwidth_limit`, if any
+        field_levels (optional): number of levels of fields, by output name or by
+            module and field name
+
+    Raises:
+        ConfigError: if the diag_table has a file with an unknown frequency unit
+    """
+    diag_table = _get_diag_table(config)
+    fv_core_nml = config["namelist"]["fv_core_nml"]
+    n_tiles = fv_core_nml.get("ntiles", NAMELIST_DEFAULTS["ntiles"])
+    io_layout = fv_core_nml.get("io_layout", (1, 1))
+    n_points = n_tiles * int(get_resolution(config)[1:]) ** 2
+    n_netcdf_files = n_tiles * io_layout[0] * io_layout[1]
+    duration = get_run_duration(config)
+    hours = duration.total_seconds() / 3600
+    field_levels = field_levels or {}
+
+    files = []
+    for file_ in diag_table.file_configs:
+        n_records = _n_records(
+            config, file_.name, file_.frequency, file_.frequency_units, duration
+        )
+        bytes_per_record = n_points * sum(
+            _BYTES_PER_VALUE[field.packing]
+            * _n_levels(field, fv_core_nml["npz"], field_levels)
+            for field in file_.field_configs
+        )
+        files.append(
+            DiagFileEstimate(
+                name=file_.name,
+                n_fields=len(file_.field_configs),
+                n_records=n_records,
+                bytes_per_record=bytes_per_record,
+                total_bytes=n_records * bytes_per_record,
+                n_netcdf_files=n_netcdf_files,
+                writes_per_hour=n_records * n_netcdf_files / hours
+                if hours > 0
+                else 0.0,
+            )
+        )
+    total_bytes = sum(file_.total_bytes for file_ in files)
+    if upload_bytes_per_second is None and _transfer.BANDWIDTH_LIMITER is not None:
+        upload_bytes_per_second = _transfer.BANDWIDTH_LIMITER.bytes_per_second
+    return DiagOutputEstimate(
+        files=files,
+        run_duration=duration,
+        total_bytes=total_bytes,
+        writes_per_hour=sum(file_.writes_per_hour for file_ in files),
+        upload_seconds=(
+            None
+            if upload_bytes_per_second is None
+            else total_bytes / upload_bytes_per_second
+        ),
+    )
+
+
+def _get_diag_table(config: Mapping) -> DiagTable:
+    if isinstance(config["diag_table"], DiagTable):
+        return config["diag_table"]
+    filename = get_diag_table_filename(config)
+    return DiagTable.from_str(filesystem.cat(filename).decode())
+
+
+def _n_records(config, name, frequency, frequency_units, duration) -> int:
+    if frequency < 0:
+        return 1
+    elif frequency == 0:
+        interval = get_timestep(config)
+    elif frequency_units in _SECONDS_PER_UNIT:
+        interval = timedelta(seconds=frequency * _SECONDS_PER_UNIT[frequency_units])
+    else:
+        raise ConfigError(
+            f"diag_table file {name} has unknown frequency units {frequency_units}"
+        )
+    return duration // interval
+
+
+def _n_levels(field: DiagFieldConfig, npz: int, field_levels) -> int:
+    if field.output_name in field_levels:
+        return field_levels[field.output_name]
+    elif (field.module_name, field.field_name) in field_levels:
+        return field_levels[(field.module_name, field.field_name)]
+    elif field.field_name in THREE_DIMENSIONAL_FIELDS:
+        return npz
+    return 1
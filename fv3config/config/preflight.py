@@ -0,0 +1,274 @@
+"""Checks of a configuration made before any data is transferred"""
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import os
+from typing import List, Mapping
+
+from .. import filesystem
+from .._asset_list import is_dict_or_list, check_asset_has_required_keys
+from .._datastore import (
+    DATA_TABLE_OPTIONS,
+    DIAG_TABLE_OPTIONS,
+    DEFAULT_FIELD_TABLE_DIR,
+    FIELD_TABLE_OPTIONS,
+    get_microphysics_name,
+)
+from .._exceptions import ConfigError
+from .diag_table import DiagTable
+from .nudging import get_missing_nudging_files
+
+PREFLIGHT_MAX_WORKERS = 32
+_MAX_LISTED_MISSING = 10
+
+_REQUIRED_KEYS = (
+    "namelist",
+    "experiment_name",
+    "diag_table",
+    "data_table",
+    "initial_conditions",
+    "forcing",
+    "orographic_forcing",
+)
+_ASSET_OPTIONS = ("initial_conditions", "forcing", "orographic_forcing", "patch_files")
+
+
+class _Source:
+    """A path the configuration requires to exist"""
+
+    def __init__(self, path: str, description: str, kind: str = None):
+        self.path = path
+        self.description = description
+        self.kind = kind
+
+
+def validate_config(config: Mapping) -> List[str]:
+    """Return all problems found in a configuration dictionary.
+
+    The structure of the configuration is checked first, then the existence of
+    every local or remote source it refers to, concurrently. Nudging files are
+    checked against a single listing of the 'gfs_analysis_data' url. No data is
+    transferred. Stat results are memoized in an active
+    :py:func:`fv3config.filesystem.metadata_cache`, so writing the run directory
+    in the same scope does not repeat them.
+
+    Args:
+        config: a configuration dictionary
+
+    Returns:
+        a description of each problem found, empty if none were found
+    """
+    if not isinstance(config, Mapping):
+        return [f"config must be a dictionary, got {type(config).__name__}"]
+    problems: List[str] = []
+    sources: List[_Source] = []
+    for key in _REQUIRED_KEYS:
+        if key not in config:
+            problems.append(f"config dictionary must have a '{key}' key")
+    _check_namelist(config, problems)
+    _check_table_option(config, "diag_table", DIAG_TABLE_OPTIONS, problems, sources)
+    _check_table_option(config, "data_table", DATA_TABLE_OPTIONS, problems, sources)
+    _check_directory_options(config, problems, sources)
+    _check_assets(config, problems, sources)
+    _check_nudging(config, problems)
+    field_table = _check_field_table(config, problems, sources)
+    problems.extend(_check_sources(config, sources, field_table))
+    return problems
+
+
+def check_config(config: Mapping):
+    """Check a configuration dictionary before any data is transferred.
+
+    See :py:func:`validate_config` for the checks made.
+
+    Raises:
+        ConfigError: listing every problem found
+    """
+    problems = validate_config(config)
+    if len(problems) > 0:
+        raise ConfigError(
+            "Invalid configuration:\n" + "\n".join(f"- {p}" for p in problems)
+        )
+
+
+def _check_namelist(config, problems):
+    namelist = config.get("namelist")
+    if namelist is None:
+        return
+    if not isinstance(namelist, Mapping):
+        problems.append("namelist must be a dictionary of namelist groups")
+        return
+    for group in ("coupler_nml", "fv_core_nml"):
+        if group not in namelist:
+            problems.append(f"namelist must have a '{group}' group")
+    fv_core_nml = namelist.get("fv_core_nml", {})
+    npx, npy = fv_core_nml.get("npx"), fv_core_nml.get("npy")
+    if npx is None or npy is None:
+        problems.append("npx and npy must be set in fv_core_nml")
+    elif npx != npy:
+        problems.append(
+            f"npx and npy in fv_core_nml must be equal, but are {npx} and {npy}"
+        )
+
+
+def _check_table_option(config, key, options, problems, sources):
+    option = config.get(key)
+    if option is None or (key == "diag_table" and isinstance(option, DiagTable)):
+        return
+    if not isinstance(option, str):
+        problems.append(f"{key} must be a path or built-in option, got {option!r}")
+    elif filesystem.isabs(option):
+        sources.append(_Source(option, key))
+    elif option not in options:
+        problems.append(
+            f"The provided {key} option {option} is not one of the built in "
+            f"options: {list(options.keys())}. "
+            "Paths to local files or directories must be absolute."
+        )
+
+
+def _check_directory_options(config, problems, sources):
+    for key in ("initial_conditions", "forcing", "orographic_forcing"):
+        option = config.get(key)
+        if option is None or is_dict_or_list(option):
+            continue
+        if not isinstance(option, str):
+            problems.append(f"{key} must be a path or a list of assets, got {option!r}")
+        elif key == "orographic_forcing":
+            resolution = _resolution(config)
+            if resolution is not None:
+                sources.append(
+                    _Source(
+                        os.path.join(option, resolution),
+                        f"resolution {resolution} orographic forcing",
+                        kind="directory",
+                    )
+                )
+        else:
+            sources.append(_Source(option, key, kind="directory"))
+
+
+def _resolution(config):
+    fv_core_nml = config.get("namelist", {}).get("fv_core_nml", {})
+    npx, npy = fv_core_nml.get("npx"), fv_core_nml.get("npy")
+    if npx is None or npx != npy:
+        return None
+    return f"C{npx-1}"
+
+
+def _check_assets(config, problems, sources):
+    for key in _ASSET_OPTIONS:
+        option = config.get(key)
+        if key == "patch_files" and option is not None and not is_dict_or_list(option):
+            problems.append(
+                "patch_files item in config dictionary must be an asset dict or "
+                "list of asset dicts"
+            )
+        if not is_dict_or_list(option):
+            continue
+        for asset in [option] if isinstance(option, dict) else option:
+            if not isinstance(asset, dict):
+                problems.append(f"{key} must contain asset dicts, got {asset!r}")
+                continue
+            if "bytes" in asset:
+                if "target_location" not in asset or "target_name" not in asset:
+                    problems.append(
+                        f"{key} bytes assets must have a target_location and "
+                        "target_name"
+                    )
+                continue
+            try:
+                check_asset_has_required_keys(asset)
+            except ConfigError as err:
+                problems.append(f"{key} asset {asset.get('target_name')}: {err}")
+                continue
+            if "copy_method" in asset and asset["copy_method"] != "directory":
+                source = os.path.join(asset["source_location"], asset["source_name"])
+                sources.append(_Source(source, f"{key} asset", kind="file"))
+
+
+def _check_nudging(config, problems):
+    fv_core_nml = config.get("namelist", {}).get("fv_core_nml", {})
+    if not fv_core_nml.get("nudge", False):
+        return
+    gfs_analysis_data = config.get("gfs_analysis_data", {})
+    if "url" not in gfs_analysis_data or "filename_pattern" not in gfs_analysis_data:
+        problems.append(
+            "Config must contain 'gfs_analysis_data' section with 'url' and "
+            "'filename_pattern' items if 'namelist.fv_core_nml.nudge' is True."
+        )
+        return
+    try:
+        missing = get_missing_nudging_files(config)
+    except Exception as err:
+        problems.append(f"could not check nudging files: {err}")
+        return
+    if len(missing) > 0:
+        shown = ", ".join(missing[:_MAX_LISTED_MISSING])
+        if len(missing) > _MAX_LISTED_MISSING:
+            shown += ", ..."
+        problems.append(
+            f"{len(missing)} nudging files are missing from "
+            f"{config['gfs_analysis_data']['url']}: {shown}"
+        )
+
+
+def _check_field_table(config, problems, sources):
+    field_table = config.get("field_table")
+    if field_table is None:
+        _check_microphysics(config, problems)
+        return DEFAULT_FIELD_TABLE_DIR
+    if not isinstance(field_table, str) or not filesystem.isabs(field_table):
+        problems.append(
+            f"field_table={field_table} must either be left unset or set "
+            "to an existing absolute path to a file or directory"
+        )
+        return None
+    sources.append(_Source(field_table, "field_table"))
+    return field_table
+
+
+def _check_microphysics(config, problems):
+    try:
+        microphysics_name = get_microphysics_name(config)
+    except NotImplementedError as err:
+        problems.append(str(err))
+    except (KeyError, AttributeError, TypeError):
+        problems.append("namelist must have a 'gfs_physics_nml' group")
+    else:
+        if microphysics_name not in FIELD_TABLE_OPTIONS:
+            problems.append(
+                f"Field table does not exist for {microphysics_name} microphysics"
+            )
+
+
+def _check_sources(config, sources, field_table):
+    with filesystem.metadata_cache():
+        with ThreadPoolExecutor(max_workers=PREFLIGHT_MAX_WORKERS) as executor:
+            # in this context, so that the results are kept in its metadata cache
+            futures = [
+                executor.submit(contextvars.copy_context().run, _try_info, source.path)
+                for source in sources
+            ]
+            infos = [future.result() for future in futures]
+    problems = []
+    for source, (info, error) in zip(sources, infos):
+        if error is not None:
+            problems.append(
+                f"could not check {source.description} {source.path}: {error}"
+            )
+        elif info is None:
+            problems.append(f"{source.description} {source.path} does not exist")
+        elif source.kind is not None and info["type"] != source.kind:
+            problems.append(
+                f"{source.description} {source.path} is not a {source.kind}"
+            )
+        elif source.path == field_table and info["type"] == "directory":
+            _check_microphysics(config, problems)
+    return problems
+
+
+def _try_info(path):
+    try:
+        return filesystem.info(path), None
+    except Exception as err:
+        return None, err
@@ -1,6 +1,8 @@
 import logging
-from .._asset_list import write_asset
+from .. import filesystem
+from .._asset_list import write_asset_list
 from .._asset_list_config import config_to_asset_list
+from .preflight import check_config
 
 logger = logging.getLogger("fv3config")
 
@@ -8,11 +10,22 @@ logger = logging.getLogger("fv3config")
 def write_run_directory(config, target_directory):
     """Write a run directory based on a configuration dictionary.
 
+    The configuration is checked with :py:func:`fv3config.validate_config`
+    before any data is transferred. Transient transfer errors are retried. If
+    writing is still interrupted, calling this again with the same arguments
+    resumes, copying only the files which were not completed.
+
     Args:
         config (dict): a configuration dictionary
         target_directory (str): target directory, will be created if it does not exist
+
+    Raises:
+        ConfigError: listing every problem found in the configuration
     """
     logger.debug(f"Writing run directory to {target_directory}")
-    asset_list = config_to_asset_list(config)
-    for asset in asset_list:
-        write_asset(asset, target_directory)
+    # stats and listings made while resolving the config give the file sizes
+    # used to schedule the largest copies first
+    with filesystem.metadata_cache():
+        check_config(config)
+        asset_list = config_to_asset_list(config)
+        write_asset_list(asset_list, target_directory)
@@ -1,11 +1,35 @@
+import builtins
+import collections
+import contextlib
+import contextvars
+import functools
+import json
 import os
 import pathlib
+import threading
+import time
+from typing import Iterable, Iterator, Optional, Mapping
 import fsspec
 import re
 from ._exceptions import DelayedImportError
 from . import caching
 from ._exceptions import ConfigError
-from concurrent.futures import ThreadPoolExecutor, Executor
+from concurrent.futures import Executor
+from . import _offline
+from . import _peer
+from . import _transfer
+
+LISTING_FILENAME = ".listing.json"
+CHUNK_SIZE = 8 * 2 ** 20
+PARTIAL_SUFFIX = ".partial.tmp"
+JOURNAL_SUFFIX = ".journal.tmp"
+
+MULTIPART_DOWNLOAD_THRESHOLD = 256 * 2 ** 20
+MULTIPART_DOWNLOAD_CHUNK_SIZE = 64 * 2 ** 20
+MULTIPART_DOWNLOAD_MAX_WORKERS = 8
+MULTIPART_UPLOAD_THRESHOLD = 256 * 2 ** 20
+MULTIPART_UPLOAD_CHUNK_SIZE = 64 * 2 ** 20
+MULTIPART_UPLOAD_MAX_WORKERS = 8
 
 
 try:
@@ -15,7 +39,13 @@ except ImportError as err:
 
 
 def get_fs(path: str) -> fsspec.AbstractFileSystem:
-    """Return the fsspec filesystem required to handle a given path."""
+    """Return the fsspec filesystem required to handle a given path.
+
+    In offline mode, remote paths are handled by a read-only filesystem serving
+    from the local cache.
+    """
+    if caching.OFFLINE and not is_local_path(path):
+        return _offline.OfflineFileSystem(_Location(path).get_protocol())
     return _get_fs(path)
 
 
@@ -38,7 +68,188 @@ def isabs(path: str) -> bool:
 
 def is_existing_absolute_path(path: str) -> bool:
     """Return whether the path is an existing absolute path"""
-    return isabs(path) and get_fs(path).exists(path)
+    return isabs(path) and exists(path)
+
+
+class MetadataCache:
+    """Memoized stat results for remote paths.
+
+    Entries are keyed on the protocol and the protocol-stripped path. Missing
+    paths are cached as well, and a path is known to be missing without any
+    request if its parent directory has been listed and did not contain it.
+
+    Args:
+        ttl (optional): seconds after which an entry is discarded. By default
+            entries do not expire.
+    """
+
+    def __init__(self, ttl: float = None):
+        self.ttl = ttl
+        self._entries = {}
+        self._listed_dirs = {}
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, timestamp: float) -> bool:
+        return self.ttl is None or time.monotonic() - timestamp < self.ttl
+
+    def lookup(self, key: str):
+        """Return ``(hit, info)`` for a key, where info is None for a path
+        known to be missing."""
+        with self._lock:
+            if key in self._entries:
+                info, timestamp = self._entries[key]
+                if self._is_fresh(timestamp):
+                    return True, info
+                del self._entries[key]
+            parent = key.rsplit("/", 1)[0]
+            if parent != key and parent in self._listed_dirs:
+                if self._is_fresh(self._listed_dirs[parent]):
+                    return True, None
+                del self._listed_dirs[parent]
+        return False, None
+
+    def set(self, key: str, info: Optional[Mapping]):
+        with self._lock:
+            self._entries[key] = (info, time.monotonic())
+
+    def set_listing(self, key: str, infos: Mapping[str, Mapping]):
+        """Record the complete contents of a directory.
+
+        Args:
+            key: cache key of the directory
+            infos: mapping from cache key to info dict for each child
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = ({"type": "directory", "size": 0}, now)
+            for child_key, info in infos.items():
+                self._entries[child_key] = (info, now)
+            self._listed_dirs[key] = now
+
+    def discard(self, key: str):
+        """Forget a path, and the listing of its parent directory"""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._listed_dirs.pop(key.rsplit("/", 1)[0], None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._listed_dirs.clear()
+
+
+# the cache of the innermost metadata_cache context, in this thread or task
+_METADATA_CACHE: contextvars.ContextVar = contextvars.ContextVar(
+    "fv3config_metadata_cache", default=None
+)
+
+
+@contextlib.contextmanager
+def metadata_cache(ttl: float = None):
+    """Context manager within which stat results of remote paths are memoized.
+
+    The cache is only used by code running in the context, including transfers
+    and checks it runs in worker threads, not by other threads. A nested context
+    shares the cache of the enclosing one unless it is given a different ttl, in
+    which case it uses its own cache until it exits. Local paths are never
+    cached, and files uploaded by fv3config are forgotten.
+
+    Args:
+        ttl (optional): seconds after which a cached entry expires. By default
+            entries are kept until the outermost context exits.
+    """
+    enclosing = _METADATA_CACHE.get()
+    if enclosing is not None and (ttl is None or ttl == enclosing.ttl):
+        yield enclosing
+        return
+    cache = MetadataCache(ttl=ttl)
+    token = _METADATA_CACHE.set(cache)
+    try:
+        yield cache
+    finally:
+        _METADATA_CACHE.reset(token)
+
+
+def clear_metadata_cache():
+    """Forget all entries of the active :py:func:`metadata_cache`, if any, such
+    as after remote files were changed by another program."""
+    cache = _METADATA_CACHE.get()
+    if cache is not None:
+        cache.clear()
+
+
+def _forget_metadata(fs: fsspec.AbstractFileSystem, path: str):
+    cache = _METADATA_CACHE.get()
+    if cache is not None and not is_local_path(path):
+        cache.discard(_metadata_key(fs, path))
+
+
+def _metadata_key(fs: fsspec.AbstractFileSystem, path: str) -> str:
+    protocol = _Location(path).get_protocol()
+    return protocol + "://" + fs._strip_protocol(path).rstrip("/")
+
+
+def info(path: str) -> Optional[Mapping]:
+    """Return the fsspec info dict of a path, or None if it does not exist.
+
+    Results for remote paths are memoized within a :py:func:`metadata_cache`
+    context.
+    """
+    fs = get_fs(path)
+    cache = _METADATA_CACHE.get()
+    if cache is None or is_local_path(path):
+        return _info_uncached(fs, path)
+    key = _metadata_key(fs, path)
+    hit, result = cache.lookup(key)
+    if not hit:
+        result = _info_uncached(fs, path)
+        cache.set(key, result)
+    return result
+
+
+def _info_uncached(fs, path):
+    try:
+        return fs.info(path)
+    except FileNotFoundError:
+        return None
+
+
+def known_size(path: str) -> Optional[int]:
+    """Return the size of a file if it is known without a remote request.
+
+    Sizes of local files are read from disk, and sizes of remote files from the
+    active :py:func:`metadata_cache`, which includes directory listings.
+    Returns None otherwise.
+    """
+    if is_local_path(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return None
+    cache = _METADATA_CACHE.get()
+    if cache is None or caching.OFFLINE:
+        return None
+    hit, result = cache.lookup(_metadata_key(get_fs(path), path))
+    if hit and result is not None and result.get("type") == "file":
+        return result.get("size")
+    return None
+
+
+def exists(path: str) -> bool:
+    """Return whether a local or remote path exists"""
+    return info(path) is not None
+
+
+def isfile(path: str) -> bool:
+    """Return whether a local or remote path is an existing file"""
+    result = info(path)
+    return result is not None and result["type"] == "file"
+
+
+def isdir(path: str) -> bool:
+    """Return whether a local or remote path is an existing directory"""
+    result = info(path)
+    return result is not None and result["type"] == "directory"
 
 
 class _Location:
@@ -80,10 +291,70 @@ def is_local_path(location):
 def walk_safe(fs, location):
     """Some fsspec implementations have a bug where they return an empty string
     as one of the files
+
+    Within a :py:func:`metadata_cache` context, the listings of remote
+    directories are recorded in the cache. If remote caching is enabled, they
+    are also persisted to the cache index for use in offline mode.
     """
-    for dirpath, dirnames, files in fs.walk(location):
-        files = [f for f in files if f]
-        yield dirpath, dirnames, files
+    cache = _METADATA_CACHE.get()
+    snapshot = caching.CACHE_REMOTE_FILES and not caching.OFFLINE
+    if is_local_path(location) or (cache is None and not snapshot):
+        for dirpath, dirnames, files in fs.walk(location):
+            files = [f for f in files if f]
+            yield dirpath, dirnames, files
+    else:
+        protocol = _Location(location).get_protocol()
+        prefix = _get_protocol_prefix(location)
+        for dirpath, dirs, files in fs.walk(location, detail=True):
+            files = {name: info for name, info in files.items() if name}
+            children = {**dirs, **files}
+            if cache is not None:
+                cache.set_listing(
+                    _metadata_key(fs, prefix + dirpath),
+                    {
+                        _metadata_key(fs, prefix + child["name"]): child
+                        for child in children.values()
+                    },
+                )
+            if snapshot:
+                _write_listing_snapshot(protocol, dirpath, children)
+            yield dirpath, list(dirs), list(files)
+
+
+def listdir(location: str) -> Mapping[str, Mapping]:
+    """Return the info dicts of the children of a directory, by name.
+
+    Returns an empty mapping if the directory does not exist. Like
+    :py:func:`walk_safe`, listings of remote directories are recorded in the
+    active :py:func:`metadata_cache` and in the cache index.
+    """
+    fs = get_fs(location)
+    try:
+        children = {
+            child["name"].rstrip("/").rsplit("/", 1)[-1]: child
+            for child in fs.ls(location, detail=True)
+        }
+    except FileNotFoundError:
+        return {}
+    children = {name: child for name, child in children.items() if name}
+    if not is_local_path(location):
+        prefix = _get_protocol_prefix(location)
+        cache = _METADATA_CACHE.get()
+        if cache is not None:
+            cache.set_listing(
+                _metadata_key(fs, location),
+                {
+                    _metadata_key(fs, prefix + child["name"]): child
+                    for child in children.values()
+                },
+            )
+        if caching.CACHE_REMOTE_FILES and not caching.OFFLINE:
+            _write_listing_snapshot(
+                _Location(location).get_protocol(),
+                fs._strip_protocol(location),
+                children,
+            )
+    return children
 
 
 def put_directory(
@@ -93,27 +364,55 @@ def put_directory(
     executor: Executor = None,
 ):
     """Copy the contents of a local directory to a local or remote directory.
+
+    Files are uploaded concurrently, largest first, under an adaptive concurrency
+    limit, see :py:func:`set_transfer_concurrency`, unless an executor is given.
+    Large files are uploaded as concurrent parts if the destination filesystem
+    supports merging them, see :py:func:`set_multipart_upload`.
     """
     if fs is None:
         fs = get_fs(dest_dir)
+    uploads = _list_uploads(local_source_dir, dest_dir, fs)
     if executor is None:
-        executor = ThreadPoolExecutor()
-        manage_threads = True
+        uploads = _transfer.largest_first(
+            uploads, [os.path.getsize(source) for source, _ in uploads]
+        )
+        _transfer.run_transfers(
+            functools.partial(_upload, fs, source, dest) for source, dest in uploads
+        )
     else:
-        manage_threads = False
+        for source, dest in uploads:
+            executor.submit(
+                contextvars.copy_context().run,
+                _transfer.retry,
+                _put_file,
+                fs,
+                source,
+                dest,
+            )
+
+
+def _list_uploads(local_source_dir, dest_dir, fs):
+    uploads = []
     for token in os.listdir(local_source_dir):
         source = os.path.join(os.path.abspath(local_source_dir), token)
         dest = os.path.join(dest_dir, token)
         if os.path.isdir(source):
             fs.makedirs(dest, exist_ok=True)  # must be blocking call
-            put_directory(source, dest, fs=fs, executor=executor)
+            uploads.extend(_list_uploads(source, dest, fs))
         else:
-            executor.submit(fs.put, source, dest)
-    if manage_threads:
-        executor.shutdown(wait=True)
+            uploads.append((source, dest))
+    return uploads
 
 
-def get_file(source_filename: str, dest_filename: str, cache: bool = None):
+def _upload(fs, source_filename, dest_filename):
+    _transfer.retry(_put_file, fs, source_filename, dest_filename)
+    return os.path.getsize(source_filename)
+
+
+def get_file(
+    source_filename: str, dest_filename: str, cache: bool = None, size: int = None
+):
     """Copy a file from a local or remote location to a local location.
 
     Optionally cache remote files in the local fv3config cache.
@@ -126,37 +425,254 @@ def get_file(source_filename: str, dest_filename: str, cache: bool = None):
             if not. Does nothing if source_filename is local.
             Default ``fv3config.caching.CACHE_REMOTE_FILES``, set by
             ``fv3config.enable_remote_caching(True/False)``.
+        size (optional): size of the source in bytes, if already known. Otherwise
+            the size of a remote source is requested, to decide whether to
+            download it in byte ranges.
     """
     if cache is None:
         cache = caching.CACHE_REMOTE_FILES
     if not cache or is_local_path(source_filename):
-        _get_file_uncached(source_filename, dest_filename)
+        _get_file_uncached(source_filename, dest_filename, size)
     else:
-        _get_file_cached(source_filename, dest_filename)
+        _get_file_cached(source_filename, dest_filename, size)
 
 
 def cat(url: str) -> bytes:
-    """read a remote file as bytes"""
-    fs = _get_fs(url)
-    return fs.cat(url)
+    """read a remote file as bytes
 
+    If remote caching is enabled, the contents are also written to the cache so
+    that they are available in offline mode. They are always read from the
+    source while online.
+    """
+    return b"".join(iter_chunks(url))
 
-def _get_file_uncached(source_filename, dest_filename):
-    fs = get_fs(source_filename)
-    fs.get(source_filename, dest_filename)
 
+def iter_chunks(url: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Read a local or remote file in chunks.
+
+    Like :py:func:`cat`, remote contents are written through to the cache as they
+    are read if remote caching is enabled. The cache is only updated once the
+    whole file has been read.
+    """
+    write_through = (
+        caching.CACHE_REMOTE_FILES and not caching.OFFLINE and not is_local_path(url)
+    )
+    with get_fs(url).open(url, "rb") as source:
+        if not write_through:
+            yield from _read_chunks(source, chunk_size)
+            return
+        cache_location = _get_cache_filename(url)
+        os.makedirs(os.path.dirname(cache_location), exist_ok=True)
+        temporary_location = _temporary_filename(cache_location)
+        try:
+            with builtins.open(temporary_location, "wb") as f:
+                for chunk in _read_chunks(source, chunk_size):
+                    f.write(chunk)
+                    yield chunk
+            caching.commit_to_cache(
+                temporary_location, _get_cache_subpath(url).as_posix()
+            )
+        finally:
+            if os.path.exists(temporary_location):
+                os.remove(temporary_location)
+
+
+def _read_chunks(f, chunk_size):
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _temporary_filename(filename: str) -> str:
+    return f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+_TEMPORARY_SUFFIX = re.compile(r"\.\d+\.\d+\.tmp$")
+
+
+def _remove_temporary_files(filenames: Iterable[str]):
+    """Remove temporary files left beside local filenames by interrupted writes
+    of any process, listing each directory once"""
+    names_by_directory = collections.defaultdict(set)
+    for filename in filenames:
+        directory, name = os.path.split(filename)
+        names_by_directory[directory].add(name)
+    for directory, names in names_by_directory.items():
+        try:
+            entries = os.listdir(directory)
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            match = _TEMPORARY_SUFFIX.search(entry)
+            if match is not None and entry[: match.start()] in names:
+                try:
+                    os.remove(os.path.join(directory, entry))
+                except FileNotFoundError:
+                    pass  # removed concurrently
+
+
+def set_multipart_download(
+    threshold: int = None, chunk_size: int = None, max_workers: int = None
+):
+    """Configure downloads of large remote files as concurrent byte ranges.
+
+    Args:
+        threshold (optional): files of at least this many bytes are downloaded
+            in byte ranges. Default 256 MiB.
+        chunk_size (optional): size of each byte range. Default 64 MiB.
+        max_workers (optional): maximum concurrent range requests per file.
+            Default 8.
+    """
+    global MULTIPART_DOWNLOAD_THRESHOLD, MULTIPART_DOWNLOAD_CHUNK_SIZE
+    global MULTIPART_DOWNLOAD_MAX_WORKERS
+    if threshold is not None:
+        MULTIPART_DOWNLOAD_THRESHOLD = threshold
+    if chunk_size is not None:
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, was given {chunk_size}")
+        MULTIPART_DOWNLOAD_CHUNK_SIZE = chunk_size
+    if max_workers is not None:
+        if max_workers <= 0:
+            raise ValueError(f"max_workers must be positive, was given {max_workers}")
+        MULTIPART_DOWNLOAD_MAX_WORKERS = max_workers
+
+
+def set_transfer_retries(
+    attempts: int = None, base_delay: float = None, max_delay: float = None
+):
+    """Configure retries of transfers failing with transient errors.
 
-def _get_file_cached(source_filename, dest_filename):
+    Retries use exponential backoff with full jitter: the n-th retry waits a
+    random time of up to ``min(max_delay, base_delay * 2 ** n)`` seconds.
+
+    Args:
+        attempts (optional): total number of attempts. Default 5.
+        base_delay (optional): initial backoff in seconds. Default 1.
+        max_delay (optional): maximum backoff in seconds. Default 60.
+    """
+    if attempts is not None:
+        if attempts <= 0:
+            raise ValueError(f"attempts must be positive, was given {attempts}")
+        _transfer.RETRY_ATTEMPTS = attempts
+    if base_delay is not None:
+        _transfer.RETRY_BASE_DELAY = base_delay
+    if max_delay is not None:
+        _transfer.RETRY_MAX_DELAY = max_delay
+
+
+def set_transfer_concurrency(initial: int = None, maximum: int = None):
+    """Configure the adaptive number of concurrent file transfers.
+
+    Transfers of a run directory or uploaded directory start at ``initial``
+    concurrent transfers. The limit grows by one while throughput keeps
+    improving, up to ``maximum``, and is halved whenever a transfer is throttled
+    or fails with another transient error.
+
+    Args:
+        initial (optional): initial number of concurrent transfers. Default 8.
+        maximum (optional): maximum number of concurrent transfers. Default 64.
+    """
+    for name, value in (("initial", initial), ("maximum", maximum)):
+        if value is not None and value <= 0:
+            raise ValueError(f"{name} must be positive, was given {value}")
+    if initial is not None:
+        _transfer.ADAPTIVE_INITIAL_CONCURRENCY = initial
+    if maximum is not None:
+        _transfer.ADAPTIVE_MAX_CONCURRENCY = maximum
+
+
+def set_bandwidth_limit(bytes_per_second: Optional[float]):
+    """Limit the average rate of all remote transfers, shared across threads.
+
+    Args:
+        bytes_per_second: the limit, or None to disable it
+    """
+    if bytes_per_second is None:
+        _transfer.BANDWIDTH_LIMITER = None
+    else:
+        _transfer.BANDWIDTH_LIMITER = _transfer.BandwidthLimiter(bytes_per_second)
+
+
+def _get_file_uncached(source_filename, dest_filename, size=None):
+    """Copy a file, replacing dest_filename only once the copy is complete.
+
+    Large remote files are downloaded in byte ranges into a partial file next to
+    the destination, and a journal of completed ranges lets an interrupted
+    download resume. The size of a remote file is requested unless given.
+    """
+    fs = get_fs(source_filename)
+    if is_local_path(source_filename) or caching.OFFLINE:
+        size = None
+    elif size is None:
+        source_info = _transfer.retry(info, source_filename)
+        if source_info is not None and source_info["type"] == "file":
+            size = source_info.get("size")
+    if size is not None and size >= MULTIPART_DOWNLOAD_THRESHOLD:
+        partial_filename = dest_filename + PARTIAL_SUFFIX
+        journal = _transfer.TransferJournal(dest_filename + JOURNAL_SUFFIX)
+        _transfer.download_ranges(
+            fs,
+            source_filename,
+            partial_filename,
+            size,
+            chunk_size=MULTIPART_DOWNLOAD_CHUNK_SIZE,
+            max_workers=MULTIPART_DOWNLOAD_MAX_WORKERS,
+            journal=journal,
+        )
+        _replace_completed(partial_filename, dest_filename)
+        journal.remove()
+    else:
+        temporary_filename = _temporary_filename(dest_filename)
+        try:
+            _transfer.retry(fs.get, source_filename, temporary_filename)
+            if size is not None:
+                _transfer.throttle(size)
+            os.replace(temporary_filename, dest_filename)
+        finally:
+            if os.path.exists(temporary_filename):
+                os.remove(temporary_filename)
+
+
+def _replace_completed(partial_filename, dest_filename):
+    try:
+        os.replace(partial_filename, dest_filename)
+    except FileNotFoundError:
+        # another process completed the same download first
+        if not os.path.isfile(dest_filename):
+            raise
+
+
+def _get_file_cached(source_filename, dest_filename, size=None):
     if is_local_path(source_filename):
         raise ValueError(f"will not cache a local path, was given {source_filename}")
     else:
-        cache_location = _get_cache_filename(source_filename)
-        if not os.path.isfile(cache_location):
-            os.makedirs(os.path.dirname(cache_location), exist_ok=True)
-            _get_file_uncached(source_filename, cache_location)
+        cache_location = _ensure_cached(source_filename, size)
         _get_file_uncached(cache_location, dest_filename)
 
 
+def _ensure_cached(source_filename: str, size: int = None) -> str:
+    """Download a remote file into the cache if no cache tier contains it and
+    return its location in the first tier."""
+    subpath = _get_cache_subpath(source_filename).as_posix()
+    cache_location = caching.lookup_cached(subpath)
+    if cache_location is None:
+        cache_location = _get_cache_filename(source_filename)
+        os.makedirs(os.path.dirname(cache_location), exist_ok=True)
+        # download to a temporary name so an interrupted download is not
+        # mistaken for a cached file
+        temporary_location = _temporary_filename(cache_location)
+        if not caching.OFFLINE and _peer.fetch_from_peers(subpath, temporary_location):
+            cache_location = caching.commit_to_cache(temporary_location, subpath)
+        else:
+            # downloads directly to the cache location are atomic, and resumable
+            # for large files
+            _get_file_uncached(source_filename, cache_location, size)
+            cache_location = caching.commit_to_cache(cache_location, subpath)
+    return cache_location
+
+
 def put_file(source_filename, dest_filename):
     """Copy a file from a local location to a local or remote location.
     
@@ -165,18 +681,71 @@ def put_file(source_filename, dest_filename):
         dest_filename (str): the local or remote target location
     """
     fs = get_fs(dest_filename)
-    fs.put(source_filename, dest_filename)
+    _transfer.retry(_put_file, fs, source_filename, dest_filename)
+
+
+def set_multipart_upload(
+    threshold: int = None, chunk_size: int = None, max_workers: int = None
+):
+    """Configure uploads of large local files as concurrent parts.
+
+    Parts are only used for destinations which can merge them server-side,
+    otherwise files are uploaded as a single stream.
+
+    Args:
+        threshold (optional): files of at least this many bytes are uploaded in
+            parts. Default 256 MiB.
+        chunk_size (optional): size of each part. Default 64 MiB.
+        max_workers (optional): maximum concurrent part uploads per file.
+            Default 8.
+    """
+    global MULTIPART_UPLOAD_THRESHOLD, MULTIPART_UPLOAD_CHUNK_SIZE
+    global MULTIPART_UPLOAD_MAX_WORKERS
+    if threshold is not None:
+        MULTIPART_UPLOAD_THRESHOLD = threshold
+    if chunk_size is not None:
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, was given {chunk_size}")
+        MULTIPART_UPLOAD_CHUNK_SIZE = chunk_size
+    if max_workers is not None:
+        if max_workers <= 0:
+            raise ValueError(f"max_workers must be positive, was given {max_workers}")
+        MULTIPART_UPLOAD_MAX_WORKERS = max_workers
+
+
+def _put_file(fs, source_filename, dest_filename):
+    if (
+        _transfer.supports_composite_upload(fs)
+        and os.path.getsize(source_filename) >= MULTIPART_UPLOAD_THRESHOLD
+    ):
+        _transfer.upload_composite(
+            fs,
+            source_filename,
+            dest_filename,
+            chunk_size=MULTIPART_UPLOAD_CHUNK_SIZE,
+            max_workers=MULTIPART_UPLOAD_MAX_WORKERS,
+        )
+    else:
+        fs.put(source_filename, dest_filename)
+        if not is_local_path(dest_filename):
+            _transfer.throttle(os.path.getsize(source_filename))
+    _forget_metadata(fs, dest_filename)
 
 
 def _get_cache_filename(source_filename):
+    cache_dir = pathlib.Path(caching.get_internal_cache_dir()).absolute()
+    return (cache_dir / _get_cache_subpath(source_filename)).as_posix()
+
+
+def _get_cache_subpath(source_filename) -> pathlib.PurePosixPath:
+    """Return the location of a remote file relative to a cache root"""
     prefix = _get_protocol_prefix(source_filename).strip("://")
     path_str: str = _get_path(source_filename)
     if len(path_str) == 0:
         raise ValueError(f"no file path given in source filename {source_filename}")
     # if path starts with / then it will break the cache:
     # cache_path//a becomes /a with posix paths
-    path = pathlib.Path(path_str)
-    cache_dir = pathlib.Path(caching.get_internal_cache_dir()).absolute()
+    path = pathlib.PurePosixPath(path_str)
 
     if path.is_absolute():
         path_no_root = path.relative_to(path.root)
@@ -184,13 +753,56 @@ def _get_cache_filename(source_filename):
     else:
         path_no_root = path
         cache_label = "rel"
-    path_in_cache = cache_dir / cache_label / prefix / path_no_root
-    return path_in_cache.as_posix()
+    return cache_label / pathlib.PurePosixPath(prefix) / path_no_root
+
+
+def _get_listing_filename(url: str) -> str:
+    """Return the location of the listing snapshot of a normalized remote url"""
+    index_dir = pathlib.Path(caching.get_internal_index_dir()).absolute()
+    return (index_dir / _get_cache_subpath(url) / LISTING_FILENAME).as_posix()
+
+
+def _normalize_url(protocol: str, stripped_path: str) -> str:
+    return protocol + "://" + stripped_path.rstrip("/")
+
+
+def _snapshot_entry(info):
+    return {"name": info["name"], "type": info["type"], "size": info.get("size", 0)}
+
+
+def _write_listing_snapshot(protocol: str, dirpath: str, children: Mapping):
+    """Persist the listing of a remote directory in the cache index.
+
+    Args:
+        protocol: protocol of the remote filesystem
+        dirpath: protocol-stripped path of the directory
+        children: mapping from child name to fsspec info dict
+    """
+    filename = _get_listing_filename(_normalize_url(protocol, dirpath))
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    snapshot = {name: _snapshot_entry(info) for name, info in children.items()}
+    temporary_filename = _temporary_filename(filename)
+    with builtins.open(temporary_filename, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(temporary_filename, filename)
+
+
+def _read_listing_snapshot(url: str) -> Optional[Mapping[str, Mapping]]:
+    """Return the recorded listing of a normalized remote url, if present"""
+    try:
+        with builtins.open(_get_listing_filename(url), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
 
 
 def ensure_exists(location: str, location_name: str):
-    if not get_fs(location).exists(location):
+    if not exists(location):
         raise ConfigError(f"{location_name} location {location} does not exist")
 
 
 open = fsspec.open
+
+
+if os.environ.get("FV3CONFIG_BANDWIDTH_LIMIT"):
+    set_bandwidth_limit(float(os.environ["FV3CONFIG_BANDWIDTH_LIMIT"]))
@@ -65,6 +65,14 @@ Will use google cloud storage key at $GOOGLE_APPLICATION_CREDENTIALS by default.
         "It is recommended to use default linux pipes or docker's and kuberentes' logging "
         "functionality.",
     )
+    parser.add_argument(
+        "--nudging-lookahead",
+        type=int,
+        action="store",
+        help="If given, copy nudging files in the background while the model runs, "
+        "this many files ahead of the latest file it has read, instead of before "
+        "the run. Only used when running natively.",
+    )
     return parser.parse_args()
 
 
@@ -100,6 +108,7 @@ def main():
             args.outdir,
             runfile=args.runfile,
             capture_output=args.capture_output,
+            nudging_lookahead=args.nudging_lookahead,
         )
 
 
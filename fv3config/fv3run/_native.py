@@ -12,6 +12,7 @@ import warnings
 import json
 from ..config import write_run_directory, get_n_processes, dump, load
 from .. import filesystem
+from ._staging import NudgingStager, write_run_directory_without_nudging_files
 
 STDOUT_FILENAME = "stdout.log"
 STDERR_FILENAME = "stderr.log"
@@ -54,7 +55,11 @@ def call_via_subprocess(module):
 
 @call_via_subprocess("fv3config.fv3run._native_main")
 def run_native(
-    config_dict_or_location, outdir, runfile=None, capture_output: bool = True
+    config_dict_or_location,
+    outdir,
+    runfile=None,
+    capture_output: bool = True,
+    nudging_lookahead: int = None,
 ):
     """Run the FV3GFS model with the given configuration.
 
@@ -71,6 +76,10 @@ def run_native(
         capture_output (bool, optional): If true, then the stderr and stdout
             streams will be redirected to the files `outdir/stderr.log` and `outdir/stdout.log`
             respectively.
+        nudging_lookahead (int, optional): If given, nudging files are not
+            written to the run directory before the run. Instead, they are copied
+            in the background, this many files ahead of the latest file read by
+            the model, and removed once the model no longer needs them.
     """
     _set_stacksize_unlimited()
     with _temporary_directory(outdir) as localdir:
@@ -80,12 +89,25 @@ def run_native(
         config_dict = _get_config_dict_and_write(
             config_dict_or_location, config_out_filename
         )
-        write_run_directory(config_dict, localdir)
+        if nudging_lookahead is None:
+            write_run_directory(config_dict, localdir)
+            nudging_assets = []
+        else:
+            nudging_assets = write_run_directory_without_nudging_files(
+                config_dict, localdir
+            )
         if runfile is not None:
             filesystem.get_file(
                 runfile, os.path.join(localdir, os.path.basename(runfile))
             )
-        with _output_stream_context(localdir, capture_output) as (stdout, stderr):
+        with contextlib.ExitStack() as stack:
+            if len(nudging_assets) > 0:
+                stack.enter_context(
+                    NudgingStager(nudging_assets, localdir, nudging_lookahead)
+                )
+            stdout, stderr = stack.enter_context(
+                _output_stream_context(localdir, capture_output)
+            )
             n_processes = get_n_processes(config_dict)
             _run_experiment(
                 localdir,
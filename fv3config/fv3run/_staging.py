@@ -0,0 +1,214 @@
+"""Just-in-time staging of nudging files while the model runs"""
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import List, Mapping, Optional, Sequence
+
+from .._asset_list import write_asset, write_asset_list
+from .._asset_list_config import config_to_asset_list
+from ..config.nudging import _is_nudging_asset
+from ..config.preflight import check_config
+from .. import filesystem
+
+logger = logging.getLogger("fv3run")
+
+POLL_INTERVAL = 5.0
+_PROBE_FILENAME = ".fv3config-atime-probe"
+
+
+class NudgingStager:
+    """Copies nudging files into a run directory shortly before the model reads them.
+
+    Progress of the model is detected from the access times of the staged files:
+    once the model opens a file, the ``lookahead`` following files are staged and
+    files before the previous one, which the model has finished interpolating
+    from, are deleted. This relies on the filesystem updating access times on the
+    first read after a write, which holds for the default ``relatime`` mount
+    option. If access times are not updated, all files are staged up front.
+    Linked files are always staged up front, since reads through a link cannot be
+    told apart from other reads of its target, which is often a shared cache file.
+
+    Args:
+        assets: nudging file assets, in time order
+        run_directory: local run directory
+        lookahead: number of files to stage beyond the latest file opened
+        poll_interval: seconds between checks of model progress
+    """
+
+    def __init__(
+        self,
+        assets: Sequence[Mapping],
+        run_directory: str,
+        lookahead: int,
+        poll_interval: float = POLL_INTERVAL,
+    ):
+        if lookahead < 1:
+            raise ValueError(f"lookahead must be at least 1, was given {lookahead}")
+        self.assets = list(assets)
+        self.run_directory = run_directory
+        self.lookahead = lookahead
+        self.poll_interval = poll_interval
+        self._staged = set()
+        self._removed = set()
+        self._latest_opened = -1
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    def _path(self, index: int) -> str:
+        asset = self.assets[index]
+        return os.path.join(
+            self.run_directory, asset["target_location"], asset["target_name"]
+        )
+
+    def _is_linked(self, index: int) -> bool:
+        return self.assets[index].get("copy_method") == "link"
+
+    def start(self):
+        """Stage the first files, then keep staging in a background thread"""
+        if not _access_times_updated(self.run_directory):
+            logger.warning(
+                "access times are not updated in %s, staging all nudging files "
+                "before the run",
+                self.run_directory,
+            )
+            self._stage_through(len(self.assets) - 1)
+            return
+        for index in range(len(self.assets)):
+            if self._is_linked(index):
+                self._stage(index)
+        if len(self._staged) == len(self.assets):
+            return
+        self._stage_through(self.lookahead)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop staging.
+
+        Raises:
+            the error which stopped background staging, if any
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.stop()
+            return
+        try:
+            self.stop()
+        except Exception as err:
+            # do not hide the error of the run
+            logger.error(f"staging nudging files also failed: {err!r}")
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                self.update()
+                self._stop.wait(self.poll_interval)
+        except Exception as err:
+            logger.exception("staging nudging files failed")
+            self._error = err
+
+    def update(self):
+        """Stage and remove files according to the latest file opened"""
+        with self._lock:
+            for index in sorted(self._staged - self._removed):
+                if (
+                    index > self._latest_opened
+                    and not self._is_linked(index)
+                    and _was_read(self._path(index))
+                ):
+                    self._latest_opened = index
+            self._stage_through(self._latest_opened + self.lookahead)
+            for index in sorted(self._staged - self._removed):
+                if index < self._latest_opened - 1:
+                    logger.debug("removing consumed nudging file %s", self._path(index))
+                    os.remove(self._path(index))
+                    self._removed.add(index)
+
+    def _stage_through(self, last_index: int):
+        for index in range(min(last_index + 1, len(self.assets))):
+            if index not in self._staged:
+                self._stage(index)
+
+    def _stage(self, index: int):
+        logger.debug("staging nudging file %s", self._path(index))
+        write_asset(self.assets[index], self.run_directory)
+        _mark_unread(self._path(index))
+        self._staged.add(index)
+
+
+def _mark_unread(path: str):
+    # relatime updates the access time on read only if it is not after the
+    # modification time
+    if os.path.isfile(path) and not os.path.islink(path):
+        mtime_ns = os.stat(path).st_mtime_ns
+        os.utime(path, ns=(mtime_ns - 10 ** 9, mtime_ns))
+
+
+def _was_read(path: str) -> bool:
+    stat = os.stat(path)
+    return stat.st_atime_ns >= stat.st_mtime_ns
+
+
+def _access_times_updated(directory: str) -> bool:
+    probe = os.path.join(directory, _PROBE_FILENAME)
+    try:
+        with open(probe, "wb") as f:
+            f.write(b"probe")
+        _mark_unread(probe)
+        with open(probe, "rb") as f:
+            f.read()
+        return _was_read(probe)
+    finally:
+        if os.path.exists(probe):
+            os.remove(probe)
+
+
+def write_run_directory_without_nudging_files(
+    config: Mapping, target_directory: str
+) -> List[Mapping]:
+    """Write a run directory except for its nudging files.
+
+    Args:
+        config: a configuration dictionary
+        target_directory: target directory, will be created if it does not exist
+
+    Returns:
+        the nudging file assets, in time order
+    """
+    with filesystem.metadata_cache():
+        check_config(config)
+        asset_list = config_to_asset_list(config)
+        pattern = config.get("gfs_analysis_data", {}).get("filename_pattern")
+        nudge = config["namelist"]["fv_core_nml"].get("nudge", False)
+        if pattern is None or not nudge:
+            write_asset_list(asset_list, target_directory)
+            return []
+        nudging_assets = [
+            asset
+            for asset in asset_list
+            if asset.get("target_location") == "INPUT"
+            and _is_nudging_asset(asset, pattern)
+        ]
+        nudging_ids = {id(asset) for asset in nudging_assets}
+        write_asset_list(
+            [asset for asset in asset_list if id(asset) not in nudging_ids],
+            target_directory,
+        )
+    return sorted(
+        nudging_assets,
+        key=lambda asset: datetime.strptime(asset["target_name"], pattern),
+    )
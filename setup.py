@@ -17,7 +17,6 @@ requirements = [
     "pyyaml>=5.0",
     "gcsfs>=0.7.0",
     "fsspec>=0.8.0",
-    "dacite>=1.6.0",
 ]
 
 setup_requirements = []
@@ -41,6 +40,7 @@ setup(
     entry_points={
         "console_scripts": [
             "fv3run=fv3config.fv3run.__main__:main",
+            "fv3config=fv3config.cli:main",
             "write_run_directory=fv3config.cli:write_run_directory",
             "enable_restart=fv3config.cli:enable_restart",
             "enable_nudging=fv3config.cli:enable_nudging",
@@ -51,6 +51,7 @@ setup(
         "bucket-access": "gcsfs",
         "fv3run": "fv3gfs-python",
         "run_kubernetes": "kubernetes",
+        "ensemble": "numpy>=1.17",
     },
     license="Apache 2.0 license",
     long_description=readme + "\n\n" + history,
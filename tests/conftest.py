@@ -54,3 +54,30 @@ def mock_fs():
 
 
 c12_config = pytest.fixture(mocks.c12_config)
+
+
+@pytest.fixture
+def cache_dir(tmpdir):
+    """An empty cache directory used during the test"""
+    original = fv3config.caching.get_cache_dir()
+    dirname = str(tmpdir.mkdir("cache"))
+    fv3config.caching.set_cache_dir(dirname)
+    yield dirname
+    fv3config.caching.set_cache_dir(original)
+
+
+def _read_tree(root):
+    contents = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            with open(path, "rb") as f:
+                contents[os.path.relpath(path, root)] = f.read()
+    return contents
+
+
+@pytest.fixture
+def read_tree():
+    """Function returning the contents of the files under a directory, by
+    relative path"""
+    return _read_tree
@@ -1,4 +1,5 @@
 import datetime
+import io
 import pathlib
 import unittest
 import os
@@ -16,6 +17,8 @@ from fv3config._asset_list import (
     asset_list_from_path,
     check_asset_has_required_keys,
     write_asset,
+    iter_bytes,
+    read_bytes,
 )
 from fv3config._asset_list_config import (
     get_data_table_asset,
@@ -310,6 +313,36 @@ def test_write_bytes_asset(tmpdir, target_location):
         assert f.read() == b"hello world"
 
 
+@pytest.mark.parametrize(
+    "data",
+    [
+        pytest.param(lambda: io.BytesIO(b"hello world"), id="file"),
+        pytest.param(lambda: iter([b"hello", b" ", b"world"]), id="generator"),
+        pytest.param(lambda: lambda: b"hello world", id="callable"),
+        pytest.param(lambda: lambda: iter([b"hello ", b"world"]), id="lazy_generator"),
+    ],
+)
+def test_write_streamed_bytes_asset(tmpdir, data):
+    asset = get_bytes_asset_dict(data(), target_location="", target_name="hello.txt")
+    write_asset(asset, str(tmpdir))
+    assert tmpdir.join("hello.txt").read_binary() == b"hello world"
+    assert read_bytes(data()) == b"hello world"
+
+
+def test_iter_bytes_file_in_chunks(monkeypatch):
+    monkeypatch.setattr(fv3config.filesystem, "CHUNK_SIZE", 4)
+    assert list(iter_bytes(io.BytesIO(b"hello world"))) == [b"hell", b"o wo", b"rld"]
+
+
+def test_callable_bytes_asset_written_twice(tmpdir):
+    asset = get_bytes_asset_dict(
+        lambda: iter([b"hello"]), target_location="", target_name="hello.txt"
+    )
+    write_asset(asset, str(tmpdir.mkdir("first")))
+    write_asset(asset, str(tmpdir.mkdir("second")))
+    assert tmpdir.join("second", "hello.txt").read_binary() == b"hello"
+
+
 def test_bytes_asset_serializes_with_yaml():
     asset = get_bytes_asset_dict(
         b"hello world", target_location="", target_name="hello.txt"
@@ -359,6 +392,12 @@ def test_get_diag_table_asset_from_file(tmp_path: pathlib.Path):
     assert diag_table_asset == expected
 
 
+def test_config_to_asset_list_bytes_assets_hold_bytes(c12_config):
+    for asset in fv3config.config_to_asset_list(c12_config):
+        if "bytes" in asset:
+            assert isinstance(asset["bytes"], bytes), asset["target_name"]
+
+
 def test_directory_asset(tmp_path: pathlib.Path):
     asset = get_directory_asset_dict("some_dir")
     write_asset(asset, str(tmp_path))
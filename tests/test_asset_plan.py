@@ -0,0 +1,65 @@
+import gzip
+import json
+import os
+
+import pytest
+
+import fv3config
+from fv3config._asset_plan import AssetPlan
+
+
+def test_compile_config_contains_rendered_files(c12_config):
+    plan = fv3config.compile_config(c12_config)
+    bytes_targets = {asset["target_name"] for asset in plan.assets if "bytes" in asset}
+    assert {"input.nml", "diag_table", "fv3config.yml"} <= bytes_targets
+
+
+def test_asset_plan_is_frozen(c12_config):
+    plan = fv3config.compile_config(c12_config)
+    with pytest.raises(TypeError):
+        plan.assets[0]["target_name"] = "other"
+
+
+def test_asset_plan_dumps_loads_round_trip(c12_config):
+    plan = fv3config.compile_config(c12_config)
+    assert AssetPlan.loads(plan.dumps()) == plan
+
+
+def test_asset_plan_dumps_is_reproducible(c12_config):
+    data = fv3config.compile_config(c12_config).dumps()
+    # the gzip header holds no modification time
+    assert data[4:8] == bytes(4)
+    assert fv3config.compile_config(c12_config).dumps() == data
+
+
+def test_write_run_directory_from_plan_matches_config(c12_config, tmpdir, read_tree):
+    plan_location = str(tmpdir.join("plan.gz"))
+    fv3config.compile_config(c12_config).dump(plan_location)
+    fv3config.write_run_directory(c12_config, str(tmpdir.join("expected")))
+    fv3config.write_run_directory_from_plan(plan_location, str(tmpdir.join("result")))
+    expected = read_tree(str(tmpdir.join("expected")))
+    assert read_tree(str(tmpdir.join("result"))) == expected
+    assert os.path.isdir(str(tmpdir.join("result", "RESTART")))
+
+
+@pytest.mark.parametrize("cache", [True, False])
+def test_write_run_directory_from_plan_makes_no_metadata_requests(
+    c12_config, tmpdir, monkeypatch, cache, cache_dir
+):
+    plan = fv3config.compile_config(c12_config)
+    assert any("source_size" in asset for asset in plan.assets)
+    original_caching = fv3config.caching.CACHE_REMOTE_FILES
+    fv3config.do_remote_caching(cache)
+    info_calls = []
+    monkeypatch.setattr(fv3config.filesystem, "info", info_calls.append)
+    try:
+        fv3config.write_run_directory_from_plan(plan, str(tmpdir.join("rundir")))
+    finally:
+        fv3config.do_remote_caching(original_caching)
+    assert info_calls == []
+
+
+def test_asset_plan_loads_rejects_other_version(c12_config):
+    data = gzip.compress(json.dumps({"version": -1, "assets": []}).encode())
+    with pytest.raises(fv3config.ConfigError):
+        AssetPlan.loads(data)
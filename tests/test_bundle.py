@@ -0,0 +1,82 @@
+import io
+import os
+import tarfile
+
+import pytest
+
+import fv3config
+import fv3config.cli
+from fv3config._bundle import export_cache_bundle, import_cache_bundle
+from fv3config.caching import CacheTier
+
+
+def _cached_files(cache_root):
+    result = set()
+    for dirpath, _, filenames in os.walk(cache_root):
+        for filename in filenames:
+            result.add(os.path.relpath(os.path.join(dirpath, filename), cache_root))
+    return result
+
+
+def test_export_import_round_trip(c12_config, cache_dir, tmpdir):
+    bundle = io.BytesIO()
+    n_exported = export_cache_bundle([c12_config], bundle)
+    assert n_exported > 0
+    exported = _cached_files(cache_dir)
+
+    target_cache = str(tmpdir.mkdir("target_cache"))
+    fv3config.caching.set_cache_dir(target_cache)
+    bundle.seek(0)
+    n_imported = import_cache_bundle(bundle)
+    assert n_imported == n_exported
+    assert _cached_files(target_cache) == exported
+
+
+def test_imported_bundle_serves_offline(c12_config, cache_dir, tmpdir):
+    bundle = io.BytesIO()
+    export_cache_bundle([c12_config], bundle)
+    fv3config.caching.set_cache_dir(str(tmpdir.mkdir("target_cache")))
+    bundle.seek(0)
+    import_cache_bundle(bundle)
+    fv3config.set_offline(True)
+    try:
+        fv3config.write_run_directory(c12_config, str(tmpdir.join("rundir")))
+    finally:
+        fv3config.set_offline(False)
+    assert os.path.isfile(str(tmpdir.join("rundir", "INPUT", "orographic_file")))
+
+
+def test_import_commits_to_cache_tiers(c12_config, cache_dir, tmpdir):
+    bundle = io.BytesIO()
+    export_cache_bundle([c12_config], bundle)
+    fast, slow = str(tmpdir.mkdir("fast")), str(tmpdir.mkdir("slow"))
+    # each mock file holds 9 bytes, so the budget fits two files
+    fv3config.caching.set_cache_tiers([CacheTier(fast, max_bytes=20), CacheTier(slow)])
+    bundle.seek(0)
+    n_imported = import_cache_bundle(bundle)
+    fv3config.caching.wait_for_replication()
+    fast_files = _cached_files(os.path.join(fast, fv3config.caching.CACHE_PREFIX))
+    slow_files = _cached_files(os.path.join(slow, fv3config.caching.CACHE_PREFIX))
+    assert 0 < len(fast_files) < n_imported
+    assert len(slow_files) == n_imported
+
+
+def test_import_rejects_members_outside_cache(cache_dir):
+    bundle = io.BytesIO()
+    with tarfile.open(fileobj=bundle, mode="w") as tar:
+        info = tarfile.TarInfo("fv3config-cache/../../escape")
+        info.size = 0
+        tar.addfile(info, io.BytesIO())
+    bundle.seek(0)
+    with pytest.raises(fv3config.ConfigError):
+        import_cache_bundle(bundle)
+
+
+def test_cli_import(c12_config, cache_dir, tmpdir):
+    bundle_path = str(tmpdir.join("bundle.tar"))
+    with open(bundle_path, "wb") as f:
+        export_cache_bundle([c12_config], f)
+    target_cache = str(tmpdir.mkdir("target_cache"))
+    fv3config.caching.set_cache_dir(target_cache)
+    fv3config.cli.main(["cache", "import", bundle_path])
+    assert len(_cached_files(target_cache)) > 0
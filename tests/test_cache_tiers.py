@@ -0,0 +1,127 @@
+import os
+
+import pytest
+
+import fv3config
+import fv3config.filesystem
+from fv3config.caching import CacheTier
+
+SOURCES = [
+    "memory://vcm-fv3config/data/base_forcing/v1.1/forcing_file",
+    "memory://vcm-fv3config/data/orographic_data/v1.0/C12/orographic_file",
+    "memory://vcm-fv3config/data/gfs_nudging_data/v1.0/20160801_00.nc",
+]
+
+
+@pytest.fixture
+def tier_dirs(tmpdir):
+    original = fv3config.caching.get_cache_tiers()
+    fast, slow = str(tmpdir.mkdir("fast")), str(tmpdir.mkdir("slow"))
+    yield fast, slow
+    fv3config.caching.wait_for_replication()
+    fv3config.caching.set_cache_tiers(original)
+
+
+def _cached_in(tier_path, source):
+    subpath = fv3config.filesystem._get_cache_subpath(source)
+    return os.path.isfile(os.path.join(tier_path, "fv3config-cache", subpath))
+
+
+def test_set_cache_tiers_sets_cache_dir(tier_dirs):
+    fast, slow = tier_dirs
+    fv3config.caching.set_cache_tiers([CacheTier(fast), CacheTier(slow)])
+    assert fv3config.get_cache_dir() == fast
+    assert [tier.path for tier in fv3config.caching.get_cache_tiers()] == [fast, slow]
+
+
+def test_download_written_to_all_tiers(tier_dirs, tmpdir):
+    fast, slow = tier_dirs
+    fv3config.caching.set_cache_tiers([CacheTier(fast), CacheTier(slow)])
+    fv3config.filesystem.get_file(SOURCES[0], str(tmpdir.join("out")), cache=True)
+    assert _cached_in(fast, SOURCES[0])
+    fv3config.caching.wait_for_replication()
+    assert _cached_in(slow, SOURCES[0])
+    assert len(fv3config.caching._REPLICATION_FUTURES) == 0
+
+
+def test_hit_in_slow_tier_is_promoted(tier_dirs, tmpdir):
+    fast, slow = tier_dirs
+    source = "memory://not-at-origin/file"
+    fv3config.caching.set_cache_tiers([CacheTier(slow)])
+    slow_filename = fv3config.filesystem._get_cache_filename(source)
+    os.makedirs(os.path.dirname(slow_filename))
+    with open(slow_filename, "wb") as f:
+        f.write(b"shared data")
+    fv3config.caching.set_cache_tiers([CacheTier(fast), CacheTier(slow)])
+    target = str(tmpdir.join("out"))
+    fv3config.filesystem.get_file(source, target, cache=True)
+    with open(target, "rb") as f:
+        assert f.read() == b"shared data"
+    assert _cached_in(fast, source)
+
+
+def test_tier_evicts_least_recently_used(tier_dirs, tmpdir):
+    fast, slow = tier_dirs
+    # each mock file holds 9 bytes, so the budget fits two files
+    fv3config.caching.set_cache_tiers([CacheTier(fast, max_bytes=20), CacheTier(slow)])
+    for i, source in enumerate(SOURCES):
+        fv3config.filesystem.get_file(source, str(tmpdir.join(f"out{i}")), cache=True)
+        cache_filename = fv3config.filesystem._get_cache_filename(source)
+        os.utime(cache_filename, (i, i))
+        fv3config.caching.wait_for_replication()
+    assert not _cached_in(fast, SOURCES[0])
+    assert _cached_in(fast, SOURCES[1])
+    assert _cached_in(fast, SOURCES[2])
+    fv3config.caching.wait_for_replication()
+    assert all(_cached_in(slow, source) for source in SOURCES)
+
+
+def test_tier_keeps_files_pending_replication(tier_dirs, tmpdir, monkeypatch):
+    fast, slow = tier_dirs
+    fv3config.caching.set_cache_tiers([CacheTier(fast, max_bytes=10), CacheTier(slow)])
+    fv3config.filesystem.get_file(SOURCES[0], str(tmpdir.join("out0")), cache=True)
+    fv3config.caching.wait_for_replication()
+    first = fv3config.filesystem._get_cache_filename(SOURCES[0])
+    os.utime(first, (0, 0))
+    monkeypatch.setitem(fv3config.caching._PENDING_REPLICATION, first, 1)
+    fv3config.filesystem.get_file(SOURCES[1], str(tmpdir.join("out1")), cache=True)
+    assert _cached_in(fast, SOURCES[0])
+
+
+def test_tier_evicts_below_budget(tier_dirs, monkeypatch):
+    fast, _ = tier_dirs
+    fv3config.caching.set_cache_tiers([CacheTier(fast, max_bytes=1000)])
+    evictions = []
+    evict = fv3config.caching._evict
+
+    def spy(tier):
+        evictions.append(tier)
+        return evict(tier)
+
+    monkeypatch.setattr(fv3config.caching, "_evict", spy)
+    for i in range(120):
+        temporary_filename = os.path.join(fast, f"download{i}")
+        with open(temporary_filename, "wb") as f:
+            f.write(b"0123456789")
+        os.utime(temporary_filename, (i, i))
+        fv3config.caching.commit_to_cache(temporary_filename, f"file{i}")
+    # the first eviction leaves room for ten more files
+    assert len(evictions) == 2
+    usage = fv3config.caching._TIER_USAGE[
+        fv3config.caching.get_cache_tiers()[0].internal_dir
+    ]
+    assert usage <= 1000
+
+
+def test_set_cache_dir_resets_tiers(tier_dirs):
+    fast, slow = tier_dirs
+    fv3config.caching.set_cache_tiers([CacheTier(fast, max_bytes=20), CacheTier(slow)])
+    fv3config.caching.set_cache_dir(slow)
+    assert fv3config.caching.get_cache_tiers() == [CacheTier(slow)]
+
+
+def test_parse_cache_tiers():
+    assert fv3config.caching._parse_cache_tiers("/fast=100,/slow") == [
+        CacheTier("/fast", 100),
+        CacheTier("/slow"),
+    ]
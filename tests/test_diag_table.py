@@ -1,10 +1,15 @@
 from datetime import datetime
+import os
+
 import pytest
 
+import fv3config.data
 from fv3config.config.diag_table import (
     DiagTable,
     DiagFieldConfig,
     DiagFileConfig,
+    DiagTableIndex,
+    Packing,
 )
 from fv3config._exceptions import ConfigError
 
@@ -214,3 +219,320 @@ def test__str_to_token(input_, expected_output):
 def test__token_to_str(token, expected_output):
     output = DiagTable._token_to_str(token)
     assert output == expected_output
+
+
+def test_from_str_general_syntax():
+    input_str = """experiment
+2016 8 1 0 0 0
+'atmos',\t1, 'hours', 1, "hours", "time"
+ "dynamics" , 'u#v', "U, V", "atmos", "all", "max", "none", 1, # comment
+"""
+    expected = DiagTable(
+        "experiment",
+        datetime(2016, 8, 1),
+        [
+            DiagFileConfig(
+                "atmos",
+                1,
+                "hours",
+                [
+                    DiagFieldConfig(
+                        "dynamics",
+                        "u#v",
+                        "U, V",
+                        reduction_method="max",
+                        packing=Packing.DOUBLE_PRECISION,
+                    )
+                ],
+            )
+        ],
+    )
+    assert DiagTable.from_str(input_str) == expected
+
+
+@pytest.mark.parametrize(
+    "diag_table_str, line_number",
+    [
+        ('experiment\n2016 8 1 0 0 0\n"atmos", 1, hours, 1, "hours", "time"\n', 3),
+        ('experiment\n2016 8 1 0 0 0\n\n"atmos", 1, "hours", 1,, "hours"\n', 4),
+        ('experiment\n2016 8 1 0 0 0\n"atmos", 1, "hours", 1, "hours, "time"\n', 3),
+        ('experiment\n2016 8 1 0 0 0\n"atmos", 1, "hours", 2, "hours", "time"\n', 3),
+        ("experiment\nnot a time\n", 2),
+    ],
+)
+def test_from_str_error_names_line(diag_table_str, line_number):
+    with pytest.raises(ConfigError, match=f"line {line_number}"):
+        DiagTable.from_str(diag_table_str)
+
+
+def test_from_str_blank_separated_values():
+    diag_table_str = """experiment
+2016 8 1 0 0 0
+"atmos", 1, "hours", 1, "hours", "time"
+"gfs_phys",  "cnvprcp_ave"    "CPRATsfc"   "atmos", "all",  .false.,  "none",  2
+"""
+    diag_table = DiagTable.from_str(diag_table_str)
+    assert diag_table.file_configs[0].field_configs == [
+        DiagFieldConfig("gfs_phys", "cnvprcp_ave", "CPRATsfc")
+    ]
+
+
+def test_from_str_default_diag_table():
+    filename = os.path.join(fv3config.data.DATA_DIR, "diag_table/diag_table_default")
+    with open(filename) as f:
+        diag_table = DiagTable.from_str(f.read())
+    assert [file_.name for file_ in diag_table.file_configs] == [
+        "atmos_static",
+        "atmos_dt_atmos",
+        "atmos_8xdaily",
+        "sfc_dt_atmos",
+    ]
+
+
+def test_from_str_invalid_packing():
+    diag_table_str = """experiment
+2016 8 1 0 0 0
+"atmos", 1, "hours", 1, "hours", "time"
+"dynamics", "u", "u", "atmos", "all", "none", "none", 3
+"""
+    with pytest.raises(ConfigError, match="line 4"):
+        DiagTable.from_str(diag_table_str)
+
+
+def test_from_str_missing_base_time():
+    with pytest.raises(ConfigError):
+        DiagTable.from_str("experiment\n")
+
+
+def test_from_str_large_table_round_trip():
+    fields = [DiagFieldConfig("dynamics", f"field_{i}", f"out_{i}") for i in range(50)]
+    diag_table = DiagTable(
+        "experiment",
+        datetime(2000, 1, 1),
+        [DiagFileConfig(f"file_{i}", i, "hours", list(fields)) for i in range(20)],
+    )
+    assert DiagTable.from_str(str(diag_table)) == diag_table
+
+
+def test_repr_updated_after_mutation(diag_table):
+    before = str(diag_table)
+    field = diag_table.file_configs[0].field_configs[0]
+    field.output_name = "renamed"
+    diag_table.file_configs[1].frequency = 3
+    diag_table.file_configs[1].field_configs.append(
+        DiagFieldConfig("physics", "t2m", "TMP2m")
+    )
+    after = str(diag_table)
+    assert after != before
+    assert '"renamed", "first_diagnostics"' in after
+    assert '"second_diagnostics", 3, "hours"' in after
+    assert '"physics", "t2m", "TMP2m", "second_diagnostics"' in after
+    assert DiagTable.from_str(after) == diag_table
+
+
+def test_from_dict_defaults_and_enums():
+    diag_table = DiagTable.from_dict(
+        {
+            "name": "experiment",
+            "base_time": datetime(2000, 1, 1),
+            "file_configs": [
+                {
+                    "name": "atmos",
+                    "frequency": 1,
+                    "frequency_units": "hours",
+                    "field_configs": [
+                        {
+                            "module_name": "dynamics",
+                            "field_name": "u",
+                            "output_name": "U",
+                            "packing": 1,
+                        }
+                    ],
+                }
+            ],
+        }
+    )
+    field = DiagFieldConfig("dynamics", "u", "U", packing=Packing.DOUBLE_PRECISION)
+    assert diag_table == DiagTable(
+        "experiment",
+        datetime(2000, 1, 1),
+        [DiagFileConfig("atmos", 1, "hours", [field])],
+    )
+
+
+def test_from_dict_missing_value():
+    with pytest.raises(ConfigError):
+        DiagTable.from_dict(
+            {
+                "name": "experiment",
+                "base_time": datetime(2000, 1, 1),
+                "file_configs": [{"name": "atmos", "field_configs": []}],
+            }
+        )
+
+
+@pytest.mark.parametrize(
+    "file_update, field_update",
+    [
+        pytest.param({"frequency": "1"}, {}, id="string_frequency"),
+        pytest.param({"name": 1}, {}, id="integer_name"),
+        pytest.param({"file_format": 2}, {}, id="unknown_file_format"),
+        pytest.param({"field_configs": "U"}, {}, id="string_field_configs"),
+        pytest.param({}, {"packing": 3}, id="unknown_packing"),
+        pytest.param({}, {"output_name": None}, id="missing_output_name"),
+    ],
+)
+def test_from_dict_invalid_value(file_update, field_update):
+    field = {"module_name": "dynamics", "field_name": "u", "output_name": "U"}
+    file_ = {
+        "name": "atmos",
+        "frequency": 1,
+        "frequency_units": "hours",
+        "field_configs": [{**field, **field_update}],
+    }
+    with pytest.raises(ConfigError):
+        DiagTable.from_dict(
+            {
+                "name": "experiment",
+                "base_time": datetime(2000, 1, 1),
+                "file_configs": [{**file_, **file_update}],
+            }
+        )
+
+
+def _indexed_table():
+    return DiagTable(
+        "experiment",
+        datetime(2000, 1, 1),
+        [
+            DiagFileConfig(
+                "atmos",
+                1,
+                "hours",
+                [
+                    DiagFieldConfig("dynamics", "u850", "UGRD850"),
+                    DiagFieldConfig("dynamics", "v850", "VGRD850"),
+                ],
+            ),
+            DiagFileConfig(
+                "surface",
+                3,
+                "hours",
+                [
+                    DiagFieldConfig("dynamics", "u850", "UGRD850"),
+                    DiagFieldConfig("physics", "t2m", "TMP2m"),
+                ],
+            ),
+        ],
+    )
+
+
+def test_duplicate_fields(diag_table):
+    assert diag_table.duplicate_fields() == [
+        ("first_diagnostics", "zonal_wind_at_850hPa"),
+        ("second_diagnostics", "zonal_wind_at_850hPa"),
+    ]
+    assert _indexed_table().duplicate_fields() == []
+
+
+def test_index_round_trip():
+    diag_table = _indexed_table()
+    index = DiagTableIndex(diag_table)
+    assert index.to_diag_table() == diag_table
+    assert str(index.to_diag_table()) == str(diag_table)
+    assert index.file_names == ["atmos", "surface"]
+    assert len(index) == 4
+
+
+def test_index_lookups():
+    index = DiagTableIndex(_indexed_table())
+    assert index.file("surface").frequency == 3
+    assert [field.output_name for field in index.file("surface").field_configs] == [
+        "UGRD850",
+        "TMP2m",
+    ]
+    assert index.field("atmos", "VGRD850").field_name == "v850"
+    assert [name for name, _ in index.locations("dynamics", "u850")] == [
+        "atmos",
+        "surface",
+    ]
+    assert index.locations("dynamics", "missing") == []
+    with pytest.raises(KeyError):
+        index.file("missing")
+
+
+def test_index_duplicates_raise(diag_table):
+    with pytest.raises(ConfigError):
+        DiagTableIndex(diag_table)
+    index = DiagTableIndex(diag_table, on_duplicate="skip")
+    assert index.to_diag_table().duplicate_fields() == []
+    assert len(index) == 2
+
+
+def test_index_add_fields_on_duplicate():
+    index = DiagTableIndex(_indexed_table())
+    replacement = DiagFieldConfig("dynamics", "u850_max", "UGRD850", "all", "max")
+    with pytest.raises(ConfigError):
+        index.add_fields("atmos", [replacement])
+    index.add_fields("atmos", [replacement], on_duplicate="skip")
+    assert index.field("atmos", "UGRD850").field_name == "u850"
+    index.add_fields("atmos", [replacement], on_duplicate="replace")
+    assert index.file("atmos").field_configs == [
+        replacement,
+        DiagFieldConfig("dynamics", "v850", "VGRD850"),
+    ]
+    assert [name for name, _ in index.locations("dynamics", "u850")] == ["surface"]
+    assert index.locations("dynamics", "u850_max") == [("atmos", replacement)]
+    with pytest.raises(ValueError):
+        index.add_fields("atmos", [], on_duplicate="ignore")
+
+
+def test_index_remove():
+    index = DiagTableIndex(_indexed_table())
+    assert index.remove_fields([("dynamics", "u850")], file_names=["surface"]) == 1
+    assert [name for name, _ in index.locations("dynamics", "u850")] == ["atmos"]
+    assert index.remove_fields([("dynamics", "u850"), ("dynamics", "v850")]) == 2
+    assert index.file("atmos").field_configs == []
+    index.remove_file("surface")
+    assert index.file_names == ["atmos"]
+    assert index.locations("physics", "t2m") == []
+
+
+def test_index_merge():
+    index = DiagTableIndex(_indexed_table())
+    other = DiagTable(
+        "other",
+        datetime(2001, 1, 1),
+        [
+            DiagFileConfig(
+                "surface", 3, "hours", [DiagFieldConfig("physics", "q2m", "SPFH2m")]
+            ),
+            DiagFileConfig("new", 6, "hours", [DiagFieldConfig("physics", "t2m", "T")]),
+        ],
+    )
+    index.merge(other)
+    diag_table = index.to_diag_table()
+    assert diag_table.name == "experiment"
+    assert [file_.name for file_ in diag_table.file_configs] == [
+        "atmos",
+        "surface",
+        "new",
+    ]
+    assert [field.output_name for field in index.file("surface").field_configs] == [
+        "UGRD850",
+        "TMP2m",
+        "SPFH2m",
+    ]
+    assert [name for name, _ in index.locations("physics", "t2m")] == [
+        "surface",
+        "new",
+    ]
+
+
+def test_index_merge_conflicting_file():
+    index = DiagTableIndex(_indexed_table())
+    other = DiagTable(
+        "other", datetime(2001, 1, 1), [DiagFileConfig("surface", 6, "hours", [])]
+    )
+    with pytest.raises(ConfigError):
+        index.merge(other)
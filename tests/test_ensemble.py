@@ -0,0 +1,119 @@
+import os
+
+import f90nml
+import pytest
+
+import fv3config
+
+
+def test_generate_ensemble_grid(c12_config):
+    members = list(
+        fv3config.generate_ensemble(
+            c12_config,
+            {
+                "namelist.fv_core_nml.n_sponge": fv3config.Grid([1, 2, 3]),
+                ("namelist", "coupler_nml", "days"): fv3config.Grid([0, 1]),
+            },
+        )
+    )
+    assert [
+        (
+            member["namelist"]["fv_core_nml"]["n_sponge"],
+            member["namelist"]["coupler_nml"]["days"],
+        )
+        for member in members
+    ] == [(1, 0), (1, 1), (2, 0), (2, 1), (3, 0), (3, 1)]
+
+
+def test_generate_ensemble_shares_unchanged_sections(c12_config):
+    members = fv3config.generate_ensemble(
+        c12_config, {"namelist.fv_core_nml.n_sponge": fv3config.Grid([1, 2])}
+    )
+    first, second = members
+    assert isinstance(first, fv3config.FrozenConfig)
+    assert first["namelist"]["coupler_nml"] is second["namelist"]["coupler_nml"]
+    assert first["namelist"]["gfs_physics_nml"] is second["namelist"]["gfs_physics_nml"]
+    assert first["namelist"]["fv_core_nml"]["n_sponge"] == 1
+    assert c12_config["namelist"]["fv_core_nml"]["n_sponge"] == 4
+
+
+def test_generate_ensemble_samples_distributions(c12_config):
+    parameters = {
+        "namelist.fv_core_nml.d2_bg_k1": fv3config.Uniform(0.1, 0.2),
+        "namelist.fv_core_nml.d2_bg_k2": fv3config.LogUniform(1e-3, 1e-1),
+        "namelist.gfs_physics_nml.fhzero": fv3config.Normal(0.25, 0.01),
+        "namelist.fv_core_nml.hord_mt": fv3config.Choice([5, 6]),
+        "namelist.coupler_nml.days": fv3config.Grid([0, 1]),
+    }
+    members = list(
+        fv3config.generate_ensemble(c12_config, parameters, n_samples=50, seed=0)
+    )
+    assert len(members) == 100
+    fv_core_nml = [member["namelist"]["fv_core_nml"] for member in members]
+    assert all(0.1 <= nml["d2_bg_k1"] < 0.2 for nml in fv_core_nml)
+    assert all(1e-3 <= nml["d2_bg_k2"] < 1e-1 for nml in fv_core_nml)
+    assert {nml["hord_mt"] for nml in fv_core_nml} == {5, 6}
+    assert all(type(nml["d2_bg_k1"]) is float for nml in fv_core_nml)
+    assert [member["namelist"]["coupler_nml"]["days"] for member in members] == [
+        0
+    ] * 50 + [1] * 50
+    assert len({nml["d2_bg_k1"] for nml in fv_core_nml}) == 100
+
+
+def test_generate_ensemble_is_reproducible(c12_config):
+    parameters = {"namelist.fv_core_nml.d2_bg_k1": fv3config.Uniform(0.1, 0.2)}
+    first, second, third = [
+        list(fv3config.generate_ensemble(c12_config, parameters, 5, seed=seed))
+        for seed in (0, 0, 1)
+    ]
+    assert first == second
+    assert first != third
+
+
+def test_generate_ensemble_creates_missing_sections(c12_config):
+    (member,) = fv3config.generate_ensemble(
+        c12_config, {"namelist.new_nml.value": fv3config.Grid([1])}
+    )
+    assert member["namelist"]["new_nml"] == {"value": 1}
+
+
+def test_generate_ensemble_invalid_parameter(c12_config):
+    with pytest.raises(fv3config.ConfigError):
+        fv3config.generate_ensemble(c12_config, {"namelist.fv_core_nml.a": [1, 2]})
+
+
+def test_log_uniform_invalid_bounds():
+    with pytest.raises(ValueError):
+        fv3config.LogUniform(0, 1)
+
+
+def test_write_ensemble_namelist_only(tmpdir, c12_config):
+    members = fv3config.generate_ensemble(
+        c12_config,
+        {"namelist.gfs_physics_nml.fhzero": fv3config.Uniform(0, 1)},
+        n_samples=3,
+        seed=0,
+    )
+    directories = (str(tmpdir.join(f"member_{i}")) for i in range(10))
+    written = fv3config.write_ensemble(members, directories, namelist_only=True)
+    assert written == [str(tmpdir.join(f"member_{i}")) for i in range(3)]
+    for directory in written:
+        assert os.listdir(directory) == ["input.nml"]
+    fhzero = [
+        f90nml.read(os.path.join(directory, "input.nml"))["gfs_physics_nml"]["fhzero"]
+        for directory in written
+    ]
+    assert len(set(fhzero)) == 3
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_write_ensemble_run_directories(tmpdir, c12_config, processes):
+    members = fv3config.generate_ensemble(
+        c12_config, {"namelist.coupler_nml.days": fv3config.Grid([1, 2])}
+    )
+    directories = [str(tmpdir.join(f"member_{i}")) for i in range(2)]
+    assert fv3config.write_ensemble(members, directories, processes) == directories
+    for days, directory in zip([1, 2], directories):
+        namelist = f90nml.read(os.path.join(directory, "input.nml"))
+        assert namelist["coupler_nml"]["days"] == days
+        assert os.path.isfile(os.path.join(directory, "fv3config.yml"))
@@ -0,0 +1,196 @@
+from collections import OrderedDict
+import io
+import random
+
+import f90nml
+import pytest
+
+import fv3config
+from fv3config.config import _fast_namelist
+from fv3config.config.namelist import (
+    configs_to_namelists,
+    configs_from_namelists,
+    _iter_namelists,
+    _to_nested_dict,
+)
+
+
+def _f90nml_text(namelist):
+    f = io.StringIO()
+    f90nml.write(namelist, f)
+    return f.getvalue()
+
+
+def _random_scalar(rng):
+    kind = rng.choice(["bool", "int", "float", "str"])
+    if kind == "bool":
+        return rng.random() < 0.5
+    elif kind == "int":
+        return rng.randint(-(10 ** rng.randint(0, 12)), 10 ** rng.randint(0, 12))
+    elif kind == "float":
+        return rng.choice([0.0, -0.0, 1e-20, 1e16, 3.0]) or rng.uniform(-1e6, 1e6)
+    return "".join(rng.choice("abc XYZ_'\"\\/!,=&0") for _ in range(rng.randint(0, 12)))
+
+
+def _random_namelist(rng):
+    namelist = {}
+    for i in range(rng.randint(0, 4)):
+        group = {}
+        for j in range(rng.randint(0, 8)):
+            if rng.random() < 0.4:
+                value = [_random_scalar(rng) for _ in range(rng.randint(0, 30))]
+            else:
+                value = _random_scalar(rng)
+            group[f"{rng.choice('aBz')}var_{j}{'x' * rng.randint(0, 70)}"] = value
+        namelist[f"group_{rng.randint(0, 1000)}_nml"] = group
+    return namelist
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_dumps_matches_f90nml(seed):
+    namelist = _random_namelist(random.Random(seed))
+    assert _fast_namelist.dumps(namelist) == _f90nml_text(namelist)
+
+
+def test_dumps_c12_namelist_matches_f90nml(c12_config):
+    assert _fast_namelist.dumps(c12_config["namelist"]) == _f90nml_text(
+        c12_config["namelist"]
+    )
+
+
+@pytest.mark.parametrize(
+    "namelist",
+    [
+        {"a_nml": {"x": None}},
+        {"a_nml": {"x": [1, None]}},
+        {"a_nml": {"x": [None, 1]}},
+        {"a_nml": {"x": []}},
+        {"a_nml": {}},
+        {"A_NML": {"X": 1, "b": 2}},
+        OrderedDict([("b_nml", OrderedDict([("z", 1), ("a", 2)])), ("a_nml", {})]),
+        {"a_nml": fv3config.freeze({"x": [1, 2], "b": "c"})},
+    ],
+)
+def test_dumps_edge_cases_match_f90nml(namelist):
+    assert _fast_namelist.dumps(namelist) == _f90nml_text(namelist)
+
+
+@pytest.mark.parametrize(
+    "namelist",
+    [
+        {"a_nml": {"x": [[1, 2], [3, 4]]}},
+        {"a_nml": {"x": {"field": 1}}},
+        {"a_nml": {"x": 1 + 2j}},
+        {"a_nml": [{"x": 1}, {"x": 2}]},
+        {"a_nml": {"x": 1, "X": 2}},
+    ],
+)
+def test_unsupported_namelists_fall_back_to_f90nml(namelist):
+    with pytest.raises(_fast_namelist.UnsupportedNamelist):
+        _fast_namelist.dumps(namelist)
+    if isinstance(namelist["a_nml"], list):
+        return  # f90nml writes repeated groups from a Namelist only
+    config = {"namelist": namelist}
+    assert fv3config.config_to_namelist(config) == _f90nml_text(namelist)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_loads_matches_f90nml(seed):
+    text = _f90nml_text(_random_namelist(random.Random(seed)))
+    try:
+        expected = _to_nested_dict(f90nml.reads(text).items())
+    except Exception:
+        pytest.skip("f90nml cannot read the namelist it wrote")
+    try:
+        result = _fast_namelist.loads(text)
+    except _fast_namelist.UnsupportedNamelist:
+        pass  # null values, empty lists and backslashes are read by f90nml
+    else:
+        assert result == expected
+        assert list(result) == list(expected)
+
+
+def test_loads_c12_namelist(c12_config):
+    text = _f90nml_text(c12_config["namelist"])
+    assert _fast_namelist.loads(text) == _to_nested_dict(f90nml.reads(text).items())
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "&a\n x = 1,\n/",
+        "&a\n x = 1, 2,\n/",
+        "&a\n x = 'a''b', \"c\"\"d\"\n/",
+        "&a\n x = 1.d0, 1e5, .5, 3., -1.5D+02\n/",
+        "&a\n x = .T., .f., t, .TRUE.\n/",
+        "&a\n x = 'abc   '\n/",
+        "&A\n X = 1\n Y=2 z = 3\n/",
+        "&a\n x = 1\n 2\n/",
+        "! comment\n&a ! comment\n x = 'a' !c\n/\n&b\n/\n",
+        "&a\n x = +1, -2\n/",
+    ],
+)
+def test_loads_matches_f90nml_examples(text):
+    expected = _to_nested_dict(f90nml.reads(text).items())
+    assert _fast_namelist.loads(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "&a\n x(2) = 1\n/",
+        "&a\n x = 3*1.0\n/",
+        "&a\n x = ,\n/",
+        "&a\n x = 1,, 2\n/",
+        "&a\n x%y = 1\n/",
+        "&a\n x = 1\n/\n&a\n x = 2\n/",
+        "&a\n x = unquoted\n/",
+        "&a\n x = (1.0, 2.0)\n/",
+        "&a\n x = 1\n",
+    ],
+)
+def test_loads_unsupported(text):
+    with pytest.raises(_fast_namelist.UnsupportedNamelist):
+        _fast_namelist.loads(text)
+
+
+def test_config_from_namelist_falls_back_to_f90nml(tmpdir):
+    filename = str(tmpdir.join("input.nml"))
+    with open(filename, "w") as f:
+        f.write("&a\n x(2) = 1\n y = 3*1.0\n/\n")
+    expected = _to_nested_dict(f90nml.read(filename).items())
+    assert fv3config.config_from_namelist(filename) == expected
+
+
+def test_configs_to_namelists(c12_config):
+    frozen = fv3config.freeze(c12_config)
+    configs = [
+        fv3config.set_run_duration(frozen, fv3config.get_run_duration(frozen) * i)
+        for i in range(1, 4)
+    ] + [{"namelist": {"a_nml": {"x": [[1]]}}}]
+    assert configs_to_namelists(configs) == [
+        fv3config.config_to_namelist(config) for config in configs
+    ]
+
+
+def test_configs_to_namelists_group_mutated_between_configs(c12_config):
+    def configs():
+        for days in range(3):
+            c12_config["namelist"]["coupler_nml"]["days"] = days
+            yield c12_config
+
+    for days, text in zip(range(3), _iter_namelists(configs())):
+        assert "days = %d\n" % days in text
+
+
+def test_configs_from_namelists(tmpdir, c12_config):
+    filenames = []
+    for i in range(3):
+        c12_config["namelist"]["coupler_nml"]["days"] = i
+        filename = str(tmpdir.join(f"input_{i}.nml"))
+        with open(filename, "w") as f:
+            f.write(fv3config.config_to_namelist(c12_config))
+        filenames.append(filename)
+    configs = configs_from_namelists(filenames)
+    assert [config["coupler_nml"]["days"] for config in configs] == [0, 1, 2]
+    assert configs[0] == fv3config.config_from_namelist(filenames[0])
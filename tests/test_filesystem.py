@@ -1,3 +1,8 @@
+import threading
+
+import pytest
+from fsspec.implementations.memory import MemoryFileSystem
+import fv3config.filesystem
 from fv3config.filesystem import _get_protocol_prefix, _Location
 
 
@@ -21,3 +26,152 @@ def test__get_protocol_prefix():
     assert _get_protocol_prefix("/some/path") == ""
     assert _get_protocol_prefix("some/path") == ""
     assert _get_protocol_prefix("") == ""
+
+
+class CountingFileSystem(MemoryFileSystem):
+    """Memory filesystem which counts calls to info"""
+
+    cachable = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.info_calls = 0
+
+    def info(self, path, **kwargs):
+        self.info_calls += 1
+        return super().info(path, **kwargs)
+
+
+@pytest.fixture
+def counting_fs(monkeypatch):
+    fs = CountingFileSystem()
+    fs.store = {}
+    fs.pseudo_dirs = [""]
+    fs.pipe("/bucket/dir/file.txt", b"data")
+    monkeypatch.setattr(fv3config.filesystem, "_get_fs", lambda path: fs)
+    return fs
+
+
+def test_metadata_cache_memoizes_stat_calls(counting_fs):
+    with fv3config.filesystem.metadata_cache():
+        assert fv3config.filesystem.exists("memory://bucket/dir/file.txt")
+        assert fv3config.filesystem.isfile("memory://bucket/dir/file.txt")
+        assert not fv3config.filesystem.isdir("memory://bucket/dir/file.txt")
+    assert counting_fs.info_calls == 1
+
+
+def test_metadata_cache_caches_missing_paths(counting_fs):
+    with fv3config.filesystem.metadata_cache():
+        assert not fv3config.filesystem.exists("memory://bucket/missing")
+        assert not fv3config.filesystem.exists("memory://bucket/missing")
+    assert counting_fs.info_calls == 1
+
+
+def test_metadata_cache_is_scoped(counting_fs):
+    with fv3config.filesystem.metadata_cache():
+        fv3config.filesystem.exists("memory://bucket/dir/file.txt")
+    fv3config.filesystem.exists("memory://bucket/dir/file.txt")
+    assert counting_fs.info_calls == 2
+
+
+def test_metadata_cache_ttl(counting_fs):
+    with fv3config.filesystem.metadata_cache(ttl=0):
+        fv3config.filesystem.exists("memory://bucket/dir/file.txt")
+        fv3config.filesystem.exists("memory://bucket/dir/file.txt")
+    assert counting_fs.info_calls == 2
+
+
+def test_clear_metadata_cache(counting_fs):
+    with fv3config.filesystem.metadata_cache():
+        assert not fv3config.filesystem.exists("memory://bucket/new.txt")
+        counting_fs.pipe("/bucket/new.txt", b"data")
+        fv3config.filesystem.clear_metadata_cache()
+        assert fv3config.filesystem.exists("memory://bucket/new.txt")
+    assert counting_fs.info_calls == 2
+
+
+def test_metadata_cache_forgets_uploaded_files(counting_fs, tmpdir):
+    source = tmpdir.join("new.txt")
+    source.write_binary(b"data")
+    with fv3config.filesystem.metadata_cache():
+        assert not fv3config.filesystem.exists("memory://bucket/new.txt")
+        fv3config.filesystem.put_file(str(source), "memory://bucket/new.txt")
+        assert fv3config.filesystem.exists("memory://bucket/new.txt")
+
+
+def test_metadata_cache_not_used_by_other_threads(counting_fs):
+    entered, exited = threading.Event(), threading.Event()
+
+    def use_cache():
+        with fv3config.filesystem.metadata_cache():
+            fv3config.filesystem.exists("memory://bucket/dir/file.txt")
+            entered.set()
+            exited.wait()
+
+    thread = threading.Thread(target=use_cache)
+    thread.start()
+    entered.wait()
+    try:
+        assert not fv3config.filesystem.exists("memory://bucket/missing")
+        counting_fs.pipe("/bucket/missing", b"data")
+        assert fv3config.filesystem.exists("memory://bucket/missing")
+        fv3config.filesystem.exists("memory://bucket/dir/file.txt")
+    finally:
+        exited.set()
+        thread.join()
+    assert counting_fs.info_calls == 4
+
+
+def test_metadata_cache_used_by_transfers(counting_fs):
+    with fv3config.filesystem.metadata_cache():
+        fv3config.filesystem.exists("memory://bucket/dir/file.txt")
+        fv3config.filesystem._transfer.run_transfers(
+            [lambda: fv3config.filesystem.exists("memory://bucket/dir/file.txt")] * 4
+        )
+    assert counting_fs.info_calls == 1
+
+
+def test_nested_metadata_cache_ttl(counting_fs):
+    with fv3config.filesystem.metadata_cache():
+        fv3config.filesystem.exists("memory://bucket/dir/file.txt")
+        with fv3config.filesystem.metadata_cache(ttl=0):
+            fv3config.filesystem.exists("memory://bucket/dir/file.txt")
+        with fv3config.filesystem.metadata_cache():
+            fv3config.filesystem.exists("memory://bucket/dir/file.txt")
+    assert counting_fs.info_calls == 2
+
+
+def test_metadata_cache_populated_from_listing(counting_fs):
+    with fv3config.filesystem.metadata_cache():
+        list(fv3config.filesystem.walk_safe(counting_fs, "memory://bucket"))
+        n_calls = counting_fs.info_calls
+        assert fv3config.filesystem.isdir("memory://bucket/dir")
+        assert fv3config.filesystem.isfile("memory://bucket/dir/file.txt")
+        assert not fv3config.filesystem.exists("memory://bucket/dir/missing.txt")
+    assert counting_fs.info_calls == n_calls
+
+
+def test_known_size_from_listing(counting_fs):
+    assert fv3config.filesystem.known_size("memory://bucket/dir/file.txt") is None
+    with fv3config.filesystem.metadata_cache():
+        list(fv3config.filesystem.walk_safe(counting_fs, "memory://bucket"))
+        n_calls = counting_fs.info_calls
+        assert fv3config.filesystem.known_size("memory://bucket/dir/file.txt") == 4
+        assert fv3config.filesystem.known_size("memory://bucket/dir") is None
+    assert counting_fs.info_calls == n_calls
+
+
+def test_known_size_local(tmpdir):
+    tmpdir.join("file").write_binary(b"abc")
+    assert fv3config.filesystem.known_size(str(tmpdir.join("file"))) == 3
+    assert fv3config.filesystem.known_size(str(tmpdir.join("missing"))) is None
+
+
+def test_listdir_records_listing(counting_fs):
+    with fv3config.filesystem.metadata_cache():
+        children = fv3config.filesystem.listdir("memory://bucket/dir")
+        assert list(children) == ["file.txt"]
+        n_calls = counting_fs.info_calls
+        assert not fv3config.filesystem.exists("memory://bucket/dir/missing.txt")
+    assert counting_fs.info_calls == n_calls
+    assert fv3config.filesystem.listdir("memory://bucket/missing") == {}
@@ -0,0 +1,111 @@
+import copy
+import functools
+import io
+from datetime import datetime, timedelta
+
+import pytest
+
+import fv3config
+from fv3config.config._blob_store import _store_blob
+
+
+def test_fingerprint_is_stable(c12_config):
+    assert fv3config.fingerprint(c12_config) == fv3config.fingerprint(
+        copy.deepcopy(c12_config)
+    )
+    assert len(fv3config.fingerprint(c12_config)) == 64
+
+
+def test_fingerprint_is_independent_of_key_order(c12_config):
+    reordered = {key: c12_config[key] for key in reversed(list(c12_config))}
+    reordered["namelist"] = {
+        key: c12_config["namelist"][key]
+        for key in reversed(list(c12_config["namelist"]))
+    }
+    assert fv3config.fingerprint(reordered) == fv3config.fingerprint(c12_config)
+
+
+def test_fingerprint_of_frozen_config(c12_config):
+    assert fv3config.fingerprint(fv3config.freeze(c12_config)) == fv3config.fingerprint(
+        c12_config
+    )
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda c: c["namelist"]["coupler_nml"].__setitem__("days", 2),
+        lambda c: c["namelist"]["fv_core_nml"].__setitem__("layout", [2, 1]),
+        lambda c: c["namelist"]["fv_core_nml"].__setitem__("do_sat_adj", 1),
+        lambda c: c.__setitem__("initial_conditions", "/other/path"),
+        lambda c: c.__setitem__(
+            "patch_files", [fv3config.get_asset_dict("/path", "file")]
+        ),
+    ],
+)
+def test_fingerprint_changes_with_content(c12_config, change):
+    before = fv3config.fingerprint(c12_config)
+    change(c12_config)
+    assert fv3config.fingerprint(c12_config) != before
+
+
+def test_fingerprint_distinguishes_types():
+    assert fv3config.fingerprint({"a": 1}) != fv3config.fingerprint({"a": 1.0})
+    assert fv3config.fingerprint({"a": 1}) != fv3config.fingerprint({"a": True})
+    assert fv3config.fingerprint({"a": "1"}) != fv3config.fingerprint({"a": 1})
+    assert fv3config.fingerprint({"a": ["b", "c"]}) != fv3config.fingerprint(
+        {"a": ["bc"]}
+    )
+
+
+def test_fingerprint_diag_table(c12_config):
+    diag_table = fv3config.DiagTable("name", datetime(2000, 1, 1), file_configs=[])
+    c12_config["diag_table"] = diag_table
+    before = fv3config.fingerprint(c12_config)
+    c12_config["diag_table"] = fv3config.DiagTable(
+        "name", datetime(2000, 1, 2), file_configs=[]
+    )
+    assert fv3config.fingerprint(c12_config) != before
+
+
+def test_fingerprint_bytes_by_content(tmpdir):
+    data = b"some data" * 100
+    reference = _store_blob(str(tmpdir), data)
+    configs = [
+        {"patch_files": [{"bytes": data}]},
+        {"patch_files": [{"bytes": reference}]},
+        {"patch_files": [{"bytes": functools.partial(iter, [data[:50], data[50:]])}]},
+    ]
+    assert len({fv3config.fingerprint(config) for config in configs}) == 1
+
+
+def test_fingerprint_one_shot_stream_raises():
+    with pytest.raises(fv3config.ConfigError):
+        fv3config.fingerprint({"patch_files": [{"bytes": iter([b"data"])}]})
+
+
+def test_fingerprint_seekable_stream_like_bytes():
+    data = io.BytesIO(b"data")
+    assert fv3config.fingerprint(
+        {"patch_files": [{"bytes": data}]}
+    ) == fv3config.fingerprint({"patch_files": [{"bytes": b"data"}]})
+    assert data.read() == b"data"
+
+
+def test_fingerprint_timedelta():
+    assert fv3config.fingerprint(
+        {"interval": timedelta(hours=6)}
+    ) != fv3config.fingerprint({"interval": timedelta(hours=3)})
+
+
+def test_fingerprint_include_generations(tmpdir, c12_config):
+    source = tmpdir.join("source_file")
+    source.write("data")
+    c12_config["patch_files"] = [fv3config.get_asset_dict(str(tmpdir), "source_file")]
+    without = fv3config.fingerprint(c12_config)
+    before = fv3config.fingerprint(c12_config, include_generations=True)
+    assert before != without
+    assert fv3config.fingerprint(c12_config, include_generations=True) == before
+    source.setmtime(source.mtime() + 10)
+    assert fv3config.fingerprint(c12_config, include_generations=True) != before
+    assert fv3config.fingerprint(c12_config) == without
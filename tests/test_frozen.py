@@ -0,0 +1,155 @@
+import copy
+import io
+import pickle
+from datetime import timedelta
+
+import pytest
+
+import fv3config
+from fv3config.config.frozen import FrozenList
+from fv3config._asset_list import read_bytes
+
+
+@pytest.fixture
+def frozen_config(c12_config):
+    return fv3config.freeze(c12_config)
+
+
+def test_freeze_round_trip(c12_config):
+    frozen = fv3config.freeze(c12_config)
+    assert isinstance(frozen, fv3config.FrozenConfig)
+    assert isinstance(frozen["namelist"], fv3config.FrozenConfig)
+    assert frozen == c12_config
+    thawed = frozen.to_dict()
+    assert thawed == c12_config
+    assert type(thawed) is dict
+    assert type(thawed["namelist"]) is dict
+    assert fv3config.thaw(frozen) == thawed
+
+
+def test_freeze_is_idempotent(frozen_config):
+    assert fv3config.freeze(frozen_config) is frozen_config
+
+
+@pytest.mark.parametrize(
+    "mutate",
+    [
+        lambda c: c.__setitem__("experiment_name", "new"),
+        lambda c: c.__delitem__("experiment_name"),
+        lambda c: c.update(experiment_name="new"),
+        lambda c: c.setdefault("new_key", {}),
+        lambda c: c.pop("experiment_name"),
+        lambda c: c.clear(),
+        lambda c: c["namelist"]["coupler_nml"].__setitem__("days", 2),
+    ],
+)
+def test_frozen_config_is_immutable(frozen_config, mutate):
+    with pytest.raises(TypeError):
+        mutate(frozen_config)
+
+
+def test_frozen_list_is_immutable():
+    frozen = fv3config.freeze({"patch_files": [{"a": 1}]})
+    assert isinstance(frozen["patch_files"], FrozenList)
+    assert frozen["patch_files"] == [{"a": 1}]
+    with pytest.raises(TypeError):
+        frozen["patch_files"].append({})
+    with pytest.raises(TypeError):
+        frozen["patch_files"][0] = {}
+
+
+def test_set_in_shares_unchanged_sections(frozen_config):
+    new = frozen_config.set_in(("namelist", "coupler_nml", "days"), 5)
+    assert new["namelist"]["coupler_nml"]["days"] == 5
+    assert frozen_config["namelist"]["coupler_nml"]["days"] != 5
+    assert new["namelist"]["fv_core_nml"] is frozen_config["namelist"]["fv_core_nml"]
+    assert new["diag_table"] is frozen_config["diag_table"]
+
+
+def test_set_in_creates_sections(frozen_config):
+    new = frozen_config.set_in(("namelist", "new_nml", "value"), [1, 2])
+    assert new["namelist"]["new_nml"] == {"value": [1, 2]}
+    assert isinstance(new["namelist"]["new_nml"]["value"], FrozenList)
+
+
+def test_remove(frozen_config):
+    new = frozen_config.remove("experiment_name")
+    assert "experiment_name" not in new
+    assert "experiment_name" in frozen_config
+
+
+def test_copies_are_shared(frozen_config):
+    assert copy.copy(frozen_config) is frozen_config
+    assert copy.deepcopy(frozen_config) is frozen_config
+
+
+def test_pickle(frozen_config):
+    unpickled = pickle.loads(pickle.dumps(frozen_config))
+    assert isinstance(unpickled["namelist"], fv3config.FrozenConfig)
+    assert unpickled == frozen_config
+
+
+def test_set_run_duration_frozen(frozen_config):
+    new = fv3config.set_run_duration(frozen_config, timedelta(days=2, seconds=3))
+    assert isinstance(new, fv3config.FrozenConfig)
+    assert fv3config.get_run_duration(new) == timedelta(days=2, seconds=3)
+    assert new["namelist"]["fv_core_nml"] is frozen_config["namelist"]["fv_core_nml"]
+    assert new == fv3config.set_run_duration(
+        frozen_config.to_dict(), timedelta(days=2, seconds=3)
+    )
+
+
+def test_enable_restart_frozen(frozen_config):
+    new = fv3config.enable_restart(frozen_config, "/path/to/restart")
+    assert isinstance(new, fv3config.FrozenConfig)
+    assert new == fv3config.enable_restart(frozen_config.to_dict(), "/path/to/restart")
+    assert new["diag_table"] is frozen_config["diag_table"]
+
+
+def test_enable_nudging_frozen(c12_config):
+    c12_config["gfs_analysis_data"] = {
+        "url": "/path/to/nudging/files",
+        "filename_pattern": "%Y%m%d_%H.nc",
+    }
+    c12_config["patch_files"] = [
+        fv3config.get_asset_dict("/path", "20151231_18.nc", target_location="INPUT"),
+        fv3config.get_asset_dict("/path", "other_file", target_location="INPUT"),
+    ]
+    frozen = fv3config.freeze(c12_config)
+    new = fv3config.enable_nudging(frozen)
+    assert isinstance(new, fv3config.FrozenConfig)
+    assert new == fv3config.enable_nudging(c12_config)
+    assert new["patch_files"][0] is frozen["patch_files"][1]
+    assert new["namelist"]["fv_core_nml"] is frozen["namelist"]["fv_core_nml"]
+
+
+def test_enable_nudging_does_not_share_with_dict(c12_config):
+    c12_config["gfs_analysis_data"] = {
+        "url": "/path/to/nudging/files",
+        "filename_pattern": "%Y%m%d_%H.nc",
+    }
+    asset = fv3config.get_asset_dict("/path", "other_file", target_location="INPUT")
+    c12_config["patch_files"] = [asset]
+    new = fv3config.enable_nudging(c12_config)
+    assert new["patch_files"][0] == asset
+    assert new["patch_files"][0] is not asset
+
+
+def test_dump_frozen(c12_config):
+    frozen_stream, plain_stream = io.StringIO(), io.StringIO()
+    fv3config.dump(fv3config.freeze(c12_config), frozen_stream)
+    fv3config.dump(c12_config, plain_stream)
+    assert frozen_stream.getvalue() == plain_stream.getvalue()
+
+
+def _materialized(asset_list):
+    return [
+        {**asset, "bytes": read_bytes(asset["bytes"])} if "bytes" in asset else asset
+        for asset in asset_list
+    ]
+
+
+def test_config_to_asset_list_frozen(c12_config):
+    frozen_assets = fv3config.config_to_asset_list(fv3config.freeze(c12_config))
+    plain_assets = fv3config.config_to_asset_list(c12_config)
+    assert _materialized(frozen_assets) == _materialized(plain_assets)
@@ -173,3 +173,65 @@ def test_enable_nudging(test_config):
     assert f"INPUT/{new_nudging_file}" in updated_file_names
     assert old_asset not in updated_config["patch_files"]
     assert new_asset in updated_config["patch_files"]
+
+
+@pytest.fixture
+def nudging_config(test_config):
+    test_config["gfs_analysis_data"] = {
+        # these urls are hardcoded in tests/conftest.py and tests/mocks.py
+        "url": "memory://vcm-fv3config/data/gfs_nudging_data/v1.0",
+        "filename_pattern": "%Y%m%d_%H.nc",
+    }
+    test_config["namelist"]["fv_core_nml"]["nudge"] = True
+    return test_config
+
+
+def test_get_missing_nudging_files_none_missing(nudging_config):
+    assert fv3config.get_missing_nudging_files(nudging_config) == []
+
+
+def test_get_missing_nudging_files_reports_gaps(nudging_config):
+    nudging_config["namelist"]["coupler_nml"]["hours"] = 12
+    assert fv3config.get_missing_nudging_files(nudging_config) == [
+        "20160801_12.nc",
+        "20160801_18.nc",
+    ]
+
+
+def test_get_missing_nudging_files_lists_once(nudging_config, monkeypatch):
+    listed = []
+    original_listdir = fv3config.filesystem.listdir
+
+    def listdir(location):
+        listed.append(location)
+        return original_listdir(location)
+
+    monkeypatch.setattr(fv3config.filesystem, "listdir", listdir)
+    nudging_config["namelist"]["coupler_nml"]["days"] = 365
+    missing = fv3config.get_missing_nudging_files(nudging_config)
+    # 365 days and 30 minutes need 365 * 4 + 2 files, of which two are present
+    assert len(missing) == 365 * 4
+    assert len(listed) == 1
+
+
+def test_get_missing_nudging_files_missing_directory(nudging_config):
+    nudging_config["gfs_analysis_data"]["url"] = "memory://vcm-fv3config/missing"
+    assert len(fv3config.get_missing_nudging_files(nudging_config)) == 2
+
+
+def test_get_nudging_assets_verify():
+    with pytest.raises(fv3config.ConfigError, match="2 of 2 nudging files"):
+        fv3config.get_nudging_assets(
+            timedelta(hours=6),
+            [2016, 1, 1, 0, 0, 0],
+            "memory://vcm-fv3config/data/gfs_nudging_data/v1.0",
+            nudge_filename_pattern="%Y%m%d_%H.nc",
+            verify=True,
+        )
+
+
+def test_enable_nudging_verify(nudging_config):
+    fv3config.enable_nudging(nudging_config, verify=True)
+    nudging_config["namelist"]["coupler_nml"]["hours"] = 6
+    with pytest.raises(fv3config.ConfigError):
+        fv3config.enable_nudging(nudging_config, verify=True)
@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+import fv3config
+import fv3config.filesystem
+from fv3config._offline import OfflineFileSystem
+
+
+@pytest.fixture
+def offline():
+    fv3config.set_offline(True)
+    yield
+    fv3config.set_offline(False)
+
+
+def _disable_network(monkeypatch):
+    original_get_fs = fv3config.filesystem._get_fs
+
+    def get_fs(path):
+        if not fv3config.filesystem.is_local_path(path):
+            raise ConnectionError(f"network access to {path} in offline test")
+        return original_get_fs(path)
+
+    monkeypatch.setattr(fv3config.filesystem, "_get_fs", get_fs)
+
+
+@pytest.fixture
+def no_network(monkeypatch):
+    _disable_network(monkeypatch)
+
+
+def test_get_fs_offline_returns_offline_filesystem(offline):
+    fs = fv3config.filesystem.get_fs("memory://bucket/path")
+    assert isinstance(fs, OfflineFileSystem)
+
+
+def test_get_fs_offline_local_path(offline):
+    fs = fv3config.filesystem.get_fs("/some/local/path")
+    assert not isinstance(fs, OfflineFileSystem)
+
+
+def test_write_run_directory_offline_matches_online(
+    c12_config, cache_dir, tmpdir, read_tree
+):
+    online_dir = str(tmpdir.join("online"))
+    fv3config.write_run_directory(c12_config, online_dir)
+    offline_dir = str(tmpdir.join("offline"))
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        _disable_network(monkeypatch)
+        fv3config.set_offline(True)
+        try:
+            fv3config.write_run_directory(c12_config, offline_dir)
+        finally:
+            fv3config.set_offline(False)
+    assert read_tree(offline_dir) == read_tree(online_dir)
+
+
+def test_offline_missing_path_does_not_exist(cache_dir, offline, no_network):
+    fs = fv3config.filesystem.get_fs("memory://bucket")
+    with pytest.raises(fv3config.OfflineError):
+        fs.info("memory://bucket/missing")
+    assert not fv3config.filesystem.exists("memory://bucket/missing")
+
+
+def test_offline_missing_file_fails_fast(cache_dir, offline, no_network, tmpdir):
+    with pytest.raises(fv3config.OfflineError):
+        fv3config.filesystem.get_file(
+            "memory://bucket/missing.nc", str(tmpdir.join("missing.nc"))
+        )
+
+
+def test_offline_listed_but_uncached_file_reports_missing(
+    c12_config, cache_dir, tmpdir
+):
+    location = c12_config["forcing"]
+    fs = fv3config.filesystem.get_fs(location)
+    list(fv3config.filesystem.walk_safe(fs, location))
+    fv3config.set_offline(True)
+    try:
+        assert fv3config.filesystem.isfile(location + "forcing_file")
+        assert fv3config.filesystem.isdir(location + "grb")
+        with pytest.raises(fv3config.OfflineError):
+            fv3config.filesystem.cat(location + "forcing_file")
+    finally:
+        fv3config.set_offline(False)
+
+
+def test_iter_chunks_writes_through_once_complete(cache_dir, c12_config, monkeypatch):
+    monkeypatch.setattr(fv3config.caching, "CACHE_REMOTE_FILES", True)
+    url = c12_config["forcing"] + "forcing_file"
+    cache_location = fv3config.filesystem._get_cache_filename(url)
+    chunks = fv3config.filesystem.iter_chunks(url, chunk_size=1)
+    next(chunks)
+    chunks.close()
+    assert not os.path.exists(cache_location)
+    assert os.listdir(os.path.dirname(cache_location)) == []
+    data = b"".join(fv3config.filesystem.iter_chunks(url, chunk_size=1))
+    with open(cache_location, "rb") as f:
+        assert f.read() == data
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import fv3config
+import fv3config.cli
+from fv3config import DiagFieldConfig, DiagFileConfig, DiagTable, Packing
+from fv3config.filesystem import set_bandwidth_limit
+
+
+@pytest.fixture
+def config(c12_config):
+    c12_config["namelist"]["coupler_nml"].update(
+        {"days": 1, "hours": 0, "minutes": 0, "dt_atmos": 900}
+    )
+    c12_config["diag_table"] = DiagTable(
+        "experiment",
+        datetime(2016, 8, 1),
+        [
+            DiagFileConfig(
+                "hourly",
+                1,
+                "hours",
+                [
+                    DiagFieldConfig("dynamics", "ps", "PRESsfc"),
+                    DiagFieldConfig(
+                        "dynamics", "temp", "t", packing=Packing.DOUBLE_PRECISION
+                    ),
+                ],
+            ),
+            DiagFileConfig(
+                "static", -1, "hours", [DiagFieldConfig("dynamics", "zs", "zs")]
+            ),
+            DiagFileConfig(
+                "every_step", 0, "hours", [DiagFieldConfig("dynamics", "ps", "ps")]
+            ),
+        ],
+    )
+    return c12_config
+
+
+def test_estimate_diagnostic_output(config):
+    estimate = fv3config.estimate_diagnostic_output(config)
+    n_points = 6 * 12 * 12
+    hourly, static, every_step = estimate.files
+    assert hourly.n_records == 24
+    assert hourly.bytes_per_record == n_points * (4 + 8 * 63)
+    assert hourly.total_bytes == 24 * hourly.bytes_per_record
+    assert hourly.writes_per_hour == 6
+    assert static.n_records == 1
+    assert static.total_bytes == n_points * 4
+    assert every_step.n_records == 96
+    assert every_step.writes_per_hour == 24
+    assert estimate.total_bytes == sum(f.total_bytes for f in estimate.files)
+    assert estimate.run_duration == timedelta(days=1)
+    assert estimate.upload_seconds is None
+
+
+def test_estimate_io_layout(config):
+    config["namelist"]["fv_core_nml"]["io_layout"] = [1, 2]
+    hourly = fv3config.estimate_diagnostic_output(config).files[0]
+    assert hourly.n_netcdf_files == 12
+    assert hourly.writes_per_hour == 12
+
+
+def test_estimate_field_levels(config):
+    estimate = fv3config.estimate_diagnostic_output(
+        config, field_levels={"PRESsfc": 2, ("dynamics", "temp"): 1}
+    )
+    assert estimate.files[0].bytes_per_record == 6 * 12 * 12 * (4 * 2 + 8)
+
+
+def test_estimate_upload_time(config):
+    estimate = fv3config.estimate_diagnostic_output(config, 1000)
+    assert estimate.upload_seconds == estimate.total_bytes / 1000
+    set_bandwidth_limit(2000)
+    try:
+        estimate = fv3config.estimate_diagnostic_output(config)
+    finally:
+        set_bandwidth_limit(None)
+    assert estimate.upload_seconds == estimate.total_bytes / 2000
+
+
+def test_estimate_unknown_frequency_units(config):
+    config["diag_table"].file_configs[0].frequency_units = "fortnights"
+    with pytest.raises(fv3config.ConfigError):
+        fv3config.estimate_diagnostic_output(config)
+
+
+def test_estimate_default_diag_table(c12_config):
+    estimate = fv3config.estimate_diagnostic_output(c12_config)
+    assert [f.name for f in estimate.files] == [
+        "atmos_static",
+        "atmos_dt_atmos",
+        "atmos_8xdaily",
+        "sfc_dt_atmos",
+    ]
+    assert estimate.total_bytes > 0
+    summary = estimate.summary()
+    assert "atmos_dt_atmos" in summary
+    assert "total" in summary
+
+
+def test_cli_estimate_output(config, tmpdir, capsys):
+    config_path = str(tmpdir.join("fv3config.yml"))
+    with open(config_path, "w") as f:
+        fv3config.dump(config, f)
+    fv3config.cli.main(["estimate-output", config_path, "--upload-bandwidth", "1e6"])
+    output = capsys.readouterr().out
+    assert "hourly" in output
+    assert "upload time" in output
@@ -0,0 +1,133 @@
+import http.server
+import os
+import threading
+import urllib.request
+
+import pytest
+
+import fv3config
+import fv3config.filesystem
+from fv3config._peer import fetch_from_peers, make_cache_server, _parse_range
+
+PEER_SOURCE = "memory://peer-bucket/data/file.nc"
+PEER_DATA = b"0123456789" * 100
+
+
+@pytest.fixture
+def peer_url(tmpdir):
+    """Serve a cache containing PEER_SOURCE from a local HTTP server"""
+    original = fv3config.caching.get_cache_dir()
+    fv3config.caching.set_cache_dir(str(tmpdir.mkdir("peer_cache")))
+    cache_filename = fv3config.filesystem._get_cache_filename(PEER_SOURCE)
+    os.makedirs(os.path.dirname(cache_filename))
+    with open(cache_filename, "wb") as f:
+        f.write(PEER_DATA)
+    server = make_cache_server("127.0.0.1", 0)
+    fv3config.caching.set_cache_dir(original)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _subpath(source):
+    return fv3config.filesystem._get_cache_subpath(source).as_posix()
+
+
+@pytest.mark.parametrize(
+    "header, size, expected",
+    [
+        ("bytes=0-9", 100, (0, 9)),
+        ("bytes=90-", 100, (90, 99)),
+        ("bytes=-10", 100, (90, 99)),
+        ("bytes=50-200", 100, (50, 99)),
+        ("bytes=100-", 100, None),
+        ("bytes=5-2", 100, None),
+        ("lines=0-1", 100, None),
+    ],
+)
+def test_parse_range(header, size, expected):
+    assert _parse_range(header, size) == expected
+
+
+def test_serve_full_file(peer_url):
+    with urllib.request.urlopen(f"{peer_url}/{_subpath(PEER_SOURCE)}") as response:
+        assert response.status == 200
+        assert response.read() == PEER_DATA
+
+
+def test_serve_range(peer_url):
+    request = urllib.request.Request(
+        f"{peer_url}/{_subpath(PEER_SOURCE)}", headers={"Range": "bytes=10-19"}
+    )
+    with urllib.request.urlopen(request) as response:
+        assert response.status == 206
+        assert response.headers["Content-Range"] == f"bytes 10-19/{len(PEER_DATA)}"
+        assert response.read() == PEER_DATA[10:20]
+
+
+def test_serve_rejects_paths_outside_cache(peer_url):
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        urllib.request.urlopen(f"{peer_url}/../../etc/passwd")
+    assert excinfo.value.code == 404
+
+
+@pytest.fixture
+def client(peer_url, tmpdir):
+    original = fv3config.caching.get_cache_dir()
+    fv3config.caching.set_cache_dir(str(tmpdir.mkdir("client_cache")))
+    fv3config.set_cache_peers([peer_url])
+    yield
+    fv3config.set_cache_peers([])
+    fv3config.caching.set_cache_dir(original)
+
+
+def test_get_file_uses_peer_before_origin(client, tmpdir):
+    target = str(tmpdir.join("file.nc"))
+    # file is not present at the origin memory filesystem
+    fv3config.filesystem.get_file(PEER_SOURCE, target, cache=True)
+    with open(target, "rb") as f:
+        assert f.read() == PEER_DATA
+
+
+def test_get_file_falls_back_to_origin(client, tmpdir):
+    source = "memory://vcm-fv3config/data/base_forcing/v1.1/forcing_file"
+    target = str(tmpdir.join("forcing_file"))
+    fv3config.filesystem.get_file(source, target, cache=True)
+    with open(target, "rb") as f:
+        assert f.read() == b"mock_data"
+
+
+class _ChunkedHandler(http.server.BaseHTTPRequestHandler):
+    """Serve PEER_DATA with chunked transfer encoding, without a Content-Length"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for start in range(0, len(PEER_DATA), 300):
+            chunk = PEER_DATA[start : start + 300]
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_fetch_from_peer_without_content_length(tmpdir):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _ChunkedHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    target = str(tmpdir.join("file.nc"))
+    fv3config.set_cache_peers([f"http://127.0.0.1:{server.server_address[1]}"])
+    try:
+        assert fetch_from_peers(_subpath(PEER_SOURCE), target)
+    finally:
+        fv3config.set_cache_peers([])
+        server.shutdown()
+        server.server_close()
+    with open(target, "rb") as f:
+        assert f.read() == PEER_DATA
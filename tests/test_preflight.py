@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+import fv3config
+from fv3config.config import preflight
+
+
+def test_validate_config_valid(c12_config):
+    assert fv3config.validate_config(c12_config) == []
+
+
+def test_validate_config_reports_all_problems(c12_config):
+    del c12_config["experiment_name"]
+    c12_config["diag_table"] = "not_an_option"
+    c12_config["namelist"]["gfs_physics_nml"]["imp_physics"] = 8
+    c12_config["forcing"] = "memory://vcm-fv3config/missing-forcing"
+    problems = fv3config.validate_config(c12_config)
+    assert len(problems) == 4
+    assert any("experiment_name" in problem for problem in problems)
+    assert any("not_an_option" in problem for problem in problems)
+    assert any("imp_physics=8" in problem for problem in problems)
+    assert any("missing-forcing" in problem for problem in problems)
+
+
+def test_validate_config_checks_asset_sources(c12_config):
+    c12_config["patch_files"] = [
+        fv3config.get_asset_dict("memory://vcm-fv3config/data", "missing_file"),
+        {"source_location": "memory://vcm-fv3config/data"},
+    ]
+    problems = fv3config.validate_config(c12_config)
+    assert len(problems) == 2
+    assert any("missing_file does not exist" in problem for problem in problems)
+    assert any("Assets must have a" in problem for problem in problems)
+
+
+def test_validate_config_checks_orographic_resolution(c12_config):
+    c12_config["namelist"]["fv_core_nml"]["npx"] = 49
+    c12_config["namelist"]["fv_core_nml"]["npy"] = 49
+    (problem,) = fv3config.validate_config(c12_config)
+    assert "C48" in problem
+
+
+def test_validate_config_nudging_section(c12_config):
+    c12_config["namelist"]["fv_core_nml"]["nudge"] = True
+    (problem,) = fv3config.validate_config(c12_config)
+    assert "gfs_analysis_data" in problem
+
+
+def test_validate_config_stats_sources_once(c12_config, monkeypatch):
+    paths = []
+    original_info = fv3config.filesystem._info_uncached
+
+    def info(fs, path):
+        paths.append(path)
+        return original_info(fs, path)
+
+    monkeypatch.setattr(fv3config.filesystem, "_info_uncached", info)
+    fv3config.validate_config(c12_config)
+    assert len(paths) == len(set(paths))
+
+
+def test_write_run_directory_fails_before_transfer(c12_config, tmpdir, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("no data should be transferred")
+
+    monkeypatch.setattr(fv3config.filesystem, "get_file", fail)
+    monkeypatch.setattr(fv3config.filesystem, "cat", fail)
+    del c12_config["experiment_name"]
+    c12_config["data_table"] = "missing"
+    with pytest.raises(fv3config.ConfigError) as excinfo:
+        fv3config.write_run_directory(c12_config, str(tmpdir.join("rundir")))
+    assert "experiment_name" in str(excinfo.value)
+    assert "missing" in str(excinfo.value)
+    assert not os.path.exists(str(tmpdir.join("rundir")))
+
+
+def test_check_config_not_a_dict():
+    with pytest.raises(fv3config.ConfigError):
+        preflight.check_config([])
+
+
+def test_validate_config_accepts_bytes_assets(c12_config):
+    c12_config["patch_files"] = [fv3config.get_bytes_asset_dict(b"data", ".", "file")]
+    assert fv3config.validate_config(c12_config) == []
+
+
+def test_validate_config_reports_missing_nudging_files(c12_config):
+    c12_config["gfs_analysis_data"] = {
+        "url": "memory://vcm-fv3config/data/gfs_nudging_data/v1.0",
+        "filename_pattern": "%Y%m%d_%H.nc",
+    }
+    c12_config["namelist"]["fv_core_nml"]["nudge"] = True
+    assert fv3config.validate_config(c12_config) == []
+    c12_config["namelist"]["coupler_nml"]["hours"] = 12
+    (problem,) = fv3config.validate_config(c12_config)
+    assert "2 nudging files are missing" in problem
+    assert "20160801_18.nc" in problem
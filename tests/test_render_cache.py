@@ -0,0 +1,172 @@
+import collections
+import os
+from datetime import datetime
+
+import pytest
+
+import fv3config
+from fv3config import _asset_list_config, _render_cache, caching
+from fv3config._asset_list import read_bytes
+from fv3config.config._blob_store import _store_blob
+
+
+@pytest.fixture
+def render_cache(tmpdir):
+    original_cache_dir = caching.get_cache_dir()
+    original_settings = (
+        caching.RENDER_CACHE_MAX_ENTRIES,
+        caching.RENDER_CACHE_ON_DISK,
+        caching.RENDER_CACHE_MAX_BYTES,
+    )
+    caching.set_cache_dir(str(tmpdir))
+    _render_cache.clear_render_cache()
+    yield
+    _render_cache.clear_render_cache()
+    caching.set_cache_dir(original_cache_dir)
+    caching.set_render_cache(*original_settings)
+
+
+@pytest.fixture
+def render_count(monkeypatch):
+    count = {"input.nml": 0}
+    original = _asset_list_config.config_to_namelist
+
+    def config_to_namelist(config):
+        count["input.nml"] += 1
+        return original(config)
+
+    monkeypatch.setattr(_asset_list_config, "config_to_namelist", config_to_namelist)
+    return count
+
+
+def _asset_data(config, target_name):
+    for asset in fv3config.config_to_asset_list(config):
+        if asset.get("target_name") == target_name:
+            return read_bytes(asset["bytes"])
+    raise KeyError(target_name)
+
+
+def test_namelist_rendered_once(render_cache, render_count, c12_config):
+    first = _asset_data(c12_config, "input.nml")
+    second = _asset_data(c12_config, "input.nml")
+    assert first == second == fv3config.config_to_namelist(c12_config).encode()
+    assert render_count["input.nml"] == 1
+
+
+def test_namelist_rendered_again_when_changed(render_cache, render_count, c12_config):
+    _asset_data(c12_config, "input.nml")
+    c12_config["namelist"]["coupler_nml"]["days"] = 3
+    data = _asset_data(c12_config, "input.nml")
+    assert b"days = 3" in data
+    assert render_count["input.nml"] == 2
+
+
+def test_namelist_rendered_again_when_reordered(render_cache, render_count, c12_config):
+    namelist = c12_config["namelist"]
+    groups = [(name, collections.OrderedDict(namelist[name])) for name in namelist]
+    c12_config["namelist"] = collections.OrderedDict(groups)
+    first = _asset_list_config.get_namelist_asset(c12_config)["bytes"]
+    c12_config["namelist"] = collections.OrderedDict(reversed(groups))
+    c12_config["namelist"]["coupler_nml"] = collections.OrderedDict(
+        reversed(list(namelist["coupler_nml"].items()))
+    )
+    second = _asset_list_config.get_namelist_asset(c12_config)["bytes"]
+    assert second != first
+    assert second == fv3config.config_to_namelist(c12_config).encode()
+    assert render_count["input.nml"] == 2
+
+
+def test_rendered_file_read_from_disk(render_cache, render_count, c12_config):
+    caching.set_render_cache(on_disk=True)
+    first = _asset_data(c12_config, "input.nml")
+    _render_cache.clear_render_cache()
+    assert _asset_data(c12_config, "input.nml") == first
+    assert render_count["input.nml"] == 1
+
+
+def test_rendered_file_not_read_by_other_version(
+    render_cache, render_count, c12_config, monkeypatch
+):
+    caching.set_render_cache(on_disk=True)
+    _asset_data(c12_config, "input.nml")
+    _render_cache.clear_render_cache()
+    monkeypatch.setattr(fv3config, "__version__", "0.0.0")
+    _asset_data(c12_config, "input.nml")
+    assert render_count["input.nml"] == 2
+
+
+def test_rendered_file_not_written_to_disk(render_cache, render_count, c12_config):
+    _asset_data(c12_config, "input.nml")
+    _render_cache.clear_render_cache()
+    _asset_data(c12_config, "input.nml")
+    assert render_count["input.nml"] == 2
+    assert not os.path.exists(caching.get_internal_rendered_dir())
+
+
+def test_memory_cache_evicts_least_recently_used(render_cache):
+    caching.set_render_cache(max_entries=2, on_disk=False)
+    for key in ["a", "b", "a", "c"]:
+        _render_cache.rendered("test", key, lambda: key.encode())
+    assert _render_cache.rendered("test", "a", lambda: b"new") == b"a"
+    assert _render_cache.rendered("test", "b", lambda: b"new") == b"new"
+
+
+def test_memory_cache_bounded_by_size(render_cache):
+    caching.set_render_cache(max_entries=10, on_disk=False, max_bytes=10)
+    for key in ["a", "b", "c"]:
+        _render_cache.rendered("test", key, lambda: key.encode() * 4)
+    assert _render_cache.rendered("test", "a", lambda: b"new") == b"new"
+    assert _render_cache.rendered("test", "c", lambda: b"new") == b"cccc"
+
+
+def test_memory_cache_does_not_keep_large_files(render_cache):
+    caching.set_render_cache(on_disk=False, max_bytes=10)
+    _render_cache.rendered("test", "large", lambda: b"x" * 11)
+    assert _render_cache.rendered("test", "large", lambda: b"new") == b"new"
+    assert _render_cache._RENDERED_BYTES == 3
+
+
+def test_set_render_cache_validates():
+    with pytest.raises(ValueError):
+        caching.set_render_cache(max_entries=-1)
+    with pytest.raises(ValueError):
+        caching.set_render_cache(max_bytes=-1)
+    with pytest.raises(TypeError):
+        caching.set_render_cache(on_disk="yes")
+
+
+def test_diag_table_file_rendered_again_when_modified(render_cache, tmpdir, c12_config):
+    diag_table = tmpdir.join("diag_table")
+    diag_table.write("title\n2000 1 1 0 0 0\nfirst\n")
+    c12_config["diag_table"] = str(diag_table)
+    assert _asset_data(c12_config, "diag_table").endswith(b"first\n")
+    diag_table.write("title\n2000 1 1 0 0 0\nsecond\n")
+    diag_table.setmtime(diag_table.mtime() + 10)
+    assert _asset_data(c12_config, "diag_table").endswith(b"second\n")
+
+
+def test_diag_table_object_rendered_again_when_changed(render_cache, c12_config):
+    c12_config["diag_table"] = fv3config.DiagTable(
+        "name", datetime(2000, 1, 1), file_configs=[]
+    )
+    first = _asset_data(c12_config, "diag_table")
+    c12_config["experiment_name"] = "other"
+    second = _asset_data(c12_config, "diag_table")
+    assert second.startswith(b"other\n")
+    c12_config["diag_table"].file_configs.append(
+        fv3config.DiagFileConfig("new_file", 1, "hours", field_configs=[])
+    )
+    third = _asset_data(c12_config, "diag_table")
+    assert len({first, second, third}) == 3
+
+
+def test_yaml_distinguishes_blob_references(render_cache, tmpdir, c12_config):
+    data = b"data" * 10
+    c12_config["patch_files"] = [
+        fv3config.get_bytes_asset_dict(data, "INPUT", "patch_file")
+    ]
+    inline = _asset_data(c12_config, "fv3config.yml")
+    c12_config["patch_files"][0]["bytes"] = _store_blob(str(tmpdir), data)
+    referenced = _asset_data(c12_config, "fv3config.yml")
+    assert b"blob_sha256" in referenced
+    assert b"blob_sha256" not in inline
@@ -4,6 +4,10 @@ import datetime
 import pytest
 import copy
 
+import yaml
+
+from fv3config.config import _serialization
+
 diag_table_obj = fv3config.DiagTable(
     name="example_diag_table",
     base_time=datetime.datetime(2000, 1, 1),
@@ -34,3 +38,134 @@ def test_dump_load(c12_config, diag_table):
     f.seek(0)
     loaded = fv3config.load(f)
     assert config == loaded
+
+
+def _config_with_patch_file(c12_config, data):
+    config = copy.deepcopy(c12_config)
+    config["patch_files"] = [fv3config.get_bytes_asset_dict(data, ".", "patch.bin")]
+    return config
+
+
+def test_dump_blob_store(c12_config, tmpdir):
+    data = b"x" * 100
+    config = _config_with_patch_file(c12_config, data)
+    store = str(tmpdir.join("blobs"))
+    f = io.StringIO()
+    fv3config.dump(config, f, blob_store=store, blob_threshold=10)
+    assert "xxxxxxxxxx" not in f.getvalue()
+    # the original config is not modified
+    assert config["patch_files"][0]["bytes"] == data
+    f.seek(0)
+    loaded = fv3config.load(f)
+    reference = loaded["patch_files"][0]["bytes"]
+    assert isinstance(reference, fv3config.BlobReference)
+    assert reference.read() == data
+
+
+def test_dump_blob_store_below_threshold(c12_config, tmpdir):
+    config = _config_with_patch_file(c12_config, b"small")
+    f = io.StringIO()
+    fv3config.dump(config, f, blob_store=str(tmpdir), blob_threshold=10)
+    f.seek(0)
+    assert fv3config.load(f) == config
+    assert tmpdir.listdir() == []
+
+
+def test_dump_blob_store_stores_identical_payloads_once(c12_config, tmpdir):
+    data = b"y" * 100
+    store = tmpdir.join("blobs")
+    for _ in range(2):
+        config = _config_with_patch_file(c12_config, data)
+        config["patch_files"].append(
+            fv3config.get_bytes_asset_dict(data, ".", "other.bin")
+        )
+        fv3config.dump(config, io.StringIO(), blob_store=str(store), blob_threshold=10)
+    assert len(store.listdir()) == 1
+    assert len(store.listdir()[0].listdir()) == 1
+
+
+def test_dump_blob_store_streamed_payload(c12_config, tmpdir):
+    data = io.BytesIO(b"u" * 100)
+    config = _config_with_patch_file(c12_config, data)
+    f = io.StringIO()
+    fv3config.dump(config, f, blob_store=str(tmpdir.join("blobs")), blob_threshold=10)
+    # the stream is not consumed
+    assert data.read() == b"u" * 100
+    f.seek(0)
+    reference = fv3config.load(f)["patch_files"][0]["bytes"]
+    assert reference.read() == b"u" * 100
+    assert tmpdir.join("blobs").listdir() == [
+        tmpdir.join("blobs", reference.sha256[:2])
+    ]
+
+
+def test_dump_streamed_payload_below_threshold(c12_config, tmpdir):
+    config = _config_with_patch_file(c12_config, lambda: iter([b"sm", b"all"]))
+    f = io.StringIO()
+    fv3config.dump(config, f, blob_store=str(tmpdir), blob_threshold=10)
+    f.seek(0)
+    assert fv3config.load(f)["patch_files"][0]["bytes"] == b"small"
+    assert tmpdir.listdir() == []
+
+
+def test_blob_reference_round_trip_without_store(c12_config, tmpdir):
+    config = _config_with_patch_file(c12_config, b"z" * 100)
+    f = io.StringIO()
+    fv3config.dump(config, f, blob_store=str(tmpdir), blob_threshold=10)
+    f.seek(0)
+    loaded = fv3config.load(f)
+    g = io.StringIO()
+    fv3config.dump(loaded, g)
+    assert f.getvalue() == g.getvalue()
+
+
+def test_blob_reference_writes_run_directory_asset(c12_config, tmpdir):
+    data = b"w" * 100
+    config = _config_with_patch_file(c12_config, data)
+    f = io.StringIO()
+    fv3config.dump(config, f, blob_store=str(tmpdir.join("blobs")), blob_threshold=10)
+    f.seek(0)
+    loaded = fv3config.load(f)
+    fv3config.write_asset(loaded["patch_files"][0], str(tmpdir.join("rundir")))
+    assert tmpdir.join("rundir", "patch.bin").read_binary() == data
+
+
+def test_blob_reference_checks_hash(tmpdir):
+    config = {"diag_table": "default", "data": b"v" * 100}
+    f = io.StringIO()
+    fv3config.dump(config, f, blob_store=str(tmpdir), blob_threshold=10)
+    f.seek(0)
+    reference = fv3config.load(f)["data"]
+    with open(reference.location, "wb") as blob:
+        blob.write(b"corrupted")
+    with pytest.raises(fv3config.ConfigError):
+        reference.read()
+
+
+def test_dump_blob_store_must_be_absolute(c12_config):
+    with pytest.raises(fv3config.ConfigError):
+        fv3config.dump(c12_config, io.StringIO(), blob_store="relative/path")
+
+
+def test_dump_matches_safe_dump(c12_config):
+    c12_config["patch_files"] = [
+        fv3config.get_bytes_asset_dict(b"\x00binary", ".", "patch.bin")
+    ]
+    f = io.StringIO()
+    fv3config.dump(c12_config, f)
+    assert f.getvalue() == yaml.safe_dump(c12_config)
+
+
+@pytest.mark.skipif(not yaml.__with_libyaml__, reason="pyyaml built without libyaml")
+def test_serialization_uses_libyaml():
+    assert _serialization.SafeLoader is yaml.CSafeLoader
+    assert _serialization.SafeDumper is yaml.CSafeDumper
+
+
+def test_dump_does_not_copy_unchanged_containers(c12_config, monkeypatch):
+    dumped = []
+    monkeypatch.setattr(
+        _serialization.yaml, "dump", lambda config, f, Dumper: dumped.append(config)
+    )
+    fv3config.dump(c12_config, io.StringIO())
+    assert dumped[0] is c12_config
@@ -0,0 +1,164 @@
+import os
+import time
+
+import pytest
+
+import fv3config
+from fv3config.fv3run import _staging
+from fv3config.fv3run._staging import (
+    NudgingStager,
+    write_run_directory_without_nudging_files,
+)
+
+N_FILES = 8
+
+
+@pytest.fixture
+def nudging_assets(tmpdir):
+    source = tmpdir.mkdir("source")
+    assets = []
+    for i in range(N_FILES):
+        name = f"2016010{i + 1}_00.nc"
+        source.join(name).write_binary(b"analysis")
+        assets.append(
+            fv3config.get_asset_dict(str(source), name, target_location="INPUT")
+        )
+    return assets
+
+
+@pytest.fixture
+def rundir(tmpdir):
+    return str(tmpdir.mkdir("rundir"))
+
+
+def _staged_names(rundir):
+    input_dir = os.path.join(rundir, "INPUT")
+    return sorted(os.listdir(input_dir)) if os.path.isdir(input_dir) else []
+
+
+def _read(rundir, asset):
+    with open(os.path.join(rundir, "INPUT", asset["target_name"]), "rb") as f:
+        f.read()
+
+
+def _names(assets):
+    return [asset["target_name"] for asset in assets]
+
+
+@pytest.mark.skipif(
+    not _staging._access_times_updated("."), reason="access times are not updated"
+)
+def test_nudging_stager_follows_reads(nudging_assets, rundir):
+    stager = NudgingStager(nudging_assets, rundir, lookahead=2, poll_interval=60)
+    stager.start()
+    try:
+        assert _staged_names(rundir) == _names(nudging_assets[:3])
+        for asset in nudging_assets[:4]:
+            # staged ahead of the model
+            _read(rundir, asset)
+            stager.update()
+        assert _staged_names(rundir) == _names(nudging_assets[2:6])
+        for asset in nudging_assets[4:]:
+            _read(rundir, asset)
+            stager.update()
+        assert _staged_names(rundir) == _names(nudging_assets[-2:])
+    finally:
+        stager.stop()
+
+
+@pytest.mark.skipif(
+    not _staging._access_times_updated("."), reason="access times are not updated"
+)
+def test_nudging_stager_stages_in_background(nudging_assets, rundir):
+    with NudgingStager(nudging_assets, rundir, lookahead=1, poll_interval=0.01):
+        _read(rundir, nudging_assets[0])
+        _read(rundir, nudging_assets[1])
+        deadline = time.monotonic() + 5
+        while len(_staged_names(rundir)) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _staged_names(rundir) == _names(nudging_assets[:3])
+
+
+def test_nudging_stager_stages_all_without_access_times(
+    nudging_assets, rundir, monkeypatch
+):
+    monkeypatch.setattr(_staging, "_access_times_updated", lambda directory: False)
+    with NudgingStager(nudging_assets, rundir, lookahead=1):
+        assert _staged_names(rundir) == _names(nudging_assets)
+
+
+def test_nudging_stager_stages_linked_files_up_front(nudging_assets, rundir):
+    linked = [dict(asset, copy_method="link") for asset in nudging_assets]
+    source = os.path.join(linked[0]["source_location"], linked[0]["source_name"])
+    source_times = os.stat(source).st_atime_ns, os.stat(source).st_mtime_ns
+    stager = NudgingStager(linked, rundir, lookahead=1, poll_interval=60)
+    with stager:
+        assert _staged_names(rundir) == _names(nudging_assets)
+        assert all(
+            os.path.islink(os.path.join(rundir, "INPUT", name))
+            for name in _names(nudging_assets)
+        )
+        assert stager._thread is None
+    # the shared link target is not touched
+    assert (os.stat(source).st_atime_ns, os.stat(source).st_mtime_ns) == source_times
+
+
+@pytest.mark.skipif(
+    not _staging._access_times_updated("."), reason="access times are not updated"
+)
+def test_nudging_stager_ignores_reads_of_linked_files(nudging_assets, rundir):
+    assets = [
+        dict(asset, copy_method="link") if i % 2 == 1 else asset
+        for i, asset in enumerate(nudging_assets)
+    ]
+    stager = NudgingStager(assets, rundir, lookahead=1, poll_interval=60)
+    stager.start()
+    try:
+        # reads of the link targets, such as by another run, are not progress
+        for asset in assets[1::2]:
+            _read(rundir, asset)
+        stager.update()
+        assert stager._latest_opened == -1
+        _read(rundir, assets[0])
+        stager.update()
+        assert stager._latest_opened == 0
+    finally:
+        stager.stop()
+
+
+def test_nudging_stager_does_not_hide_error_of_run(nudging_assets, rundir, caplog):
+    with pytest.raises(ValueError, match="model failed"):
+        with NudgingStager(nudging_assets, rundir, lookahead=1, poll_interval=60) as s:
+            s._error = OSError("staging failed")
+            raise ValueError("model failed")
+    assert "staging failed" in caplog.text
+
+
+def test_nudging_stager_raises_staging_error(nudging_assets, rundir):
+    with pytest.raises(OSError, match="staging failed"):
+        with NudgingStager(nudging_assets, rundir, lookahead=1, poll_interval=60) as s:
+            s._error = OSError("staging failed")
+
+
+def test_nudging_stager_invalid_lookahead(nudging_assets, rundir):
+    with pytest.raises(ValueError):
+        NudgingStager(nudging_assets, rundir, lookahead=0)
+
+
+def test_write_run_directory_without_nudging_files(c12_config, rundir):
+    c12_config["gfs_analysis_data"] = {
+        # these urls are hardcoded in tests/conftest.py and tests/mocks.py
+        "url": "memory://vcm-fv3config/data/gfs_nudging_data/v1.0",
+        "filename_pattern": "%Y%m%d_%H.nc",
+    }
+    c12_config["namelist"]["fv_core_nml"]["nudge"] = True
+    assets = write_run_directory_without_nudging_files(c12_config, rundir)
+    assert _names(assets) == ["20160801_00.nc", "20160801_06.nc"]
+    assert not set(_names(assets)) & set(_staged_names(rundir))
+    with open(os.path.join(rundir, "input.nml")) as f:
+        assert "INPUT/20160801_06.nc" in f.read()
+
+
+def test_write_run_directory_without_nudging_files_no_nudging(c12_config, rundir):
+    assert write_run_directory_without_nudging_files(c12_config, rundir) == []
+    assert "input.nml" in os.listdir(rundir)
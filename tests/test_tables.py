@@ -1,8 +1,12 @@
 import unittest
+import pytest
 import os
 import shutil
 from fv3config import ConfigError
-from fv3config._tables import update_diag_table_for_config
+from fv3config._tables import (
+    update_diag_table_for_config,
+    stream_diag_table_for_config,
+)
 from fv3config.config.derive import (
     _get_coupler_res_filename,
     _read_dates_from_coupler_res,
@@ -224,5 +228,27 @@ def test_get_coupler_res_filename_from_dir():
         assert result == coupler_res_filename
 
 
+def test_update_diag_table_for_config_keeps_line_endings():
+    config = {"experiment_name": "name"}
+    result = update_diag_table_for_config(config, [2016, 8, 3, 0, 0, 0], "a\nb\nc\nd\n")
+    assert result == "name\n2016 8 3 0 0 0\nc\nd\n"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 100])
+def test_stream_diag_table_for_config(chunk_size):
+    config = {"experiment_name": "name"}
+    contents = b"experiment\n2016 1 1 0 0 0\nfile\nfield\n"
+    chunks = [contents[i : i + chunk_size] for i in range(0, len(contents), chunk_size)]
+    result = b"".join(
+        stream_diag_table_for_config(config, [2016, 8, 3, 0, 0, 0], chunks)
+    )
+    assert result == b"name\n2016 8 3 0 0 0\nfile\nfield\n"
+
+
+def test_stream_diag_table_for_config_requires_experiment_name():
+    with pytest.raises(ConfigError):
+        list(stream_diag_table_for_config({}, [2016, 8, 3, 0, 0, 0], [b""]))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,560 @@
+import functools
+import os
+import threading
+import time
+
+import pytest
+from fsspec.implementations.memory import MemoryFileSystem
+
+import fv3config
+import fv3config.filesystem
+import fv3config._transfer
+from fv3config._asset_list import write_asset_list, JOURNAL_FILENAME
+from fv3config._transfer import (
+    get_byte_ranges,
+    download_ranges,
+    upload_composite,
+    is_transient,
+    retry,
+    TransferJournal,
+    MAX_COMPOSE_PARTS,
+    AdaptiveConcurrency,
+    BandwidthLimiter,
+    run_transfers,
+)
+
+DATA = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def memory_fs():
+    fs = MemoryFileSystem()
+    fs.pipe("/transfer-bucket/large_file", DATA)
+    yield fs
+    fs.rm("/transfer-bucket", recursive=True)
+
+
+@pytest.mark.parametrize(
+    "size, chunk_size, expected",
+    [
+        (0, 4, []),
+        (8, 4, [(0, 4), (4, 8)]),
+        (10, 4, [(0, 4), (4, 8), (8, 10)]),
+        (3, 4, [(0, 3)]),
+    ],
+)
+def test_get_byte_ranges(size, chunk_size, expected):
+    assert get_byte_ranges(size, chunk_size) == expected
+
+
+def test_download_ranges(memory_fs, tmpdir):
+    target = str(tmpdir.join("large_file"))
+    download_ranges(
+        memory_fs,
+        "memory://transfer-bucket/large_file",
+        target,
+        len(DATA),
+        chunk_size=1000,
+        max_workers=4,
+    )
+    with open(target, "rb") as f:
+        assert f.read() == DATA
+
+
+@pytest.fixture
+def multipart_threshold():
+    original = (
+        fv3config.filesystem.MULTIPART_DOWNLOAD_THRESHOLD,
+        fv3config.filesystem.MULTIPART_DOWNLOAD_CHUNK_SIZE,
+    )
+    fv3config.filesystem.set_multipart_download(threshold=1024, chunk_size=1000)
+    yield
+    fv3config.filesystem.set_multipart_download(*original)
+
+
+def test_get_file_uses_byte_ranges_above_threshold(
+    memory_fs, multipart_threshold, tmpdir, monkeypatch
+):
+    calls = []
+    original_cat_file = MemoryFileSystem.cat_file
+
+    def cat_file(self, path, start=None, end=None, **kwargs):
+        calls.append((start, end))
+        return original_cat_file(self, path, start=start, end=end, **kwargs)
+
+    monkeypatch.setattr(MemoryFileSystem, "cat_file", cat_file)
+    target = str(tmpdir.join("large_file"))
+    fv3config.filesystem.get_file(
+        "memory://transfer-bucket/large_file", target, cache=False
+    )
+    assert len(calls) == len(get_byte_ranges(len(DATA), 1000))
+    assert os.path.getsize(target) == len(DATA)
+    with open(target, "rb") as f:
+        assert f.read() == DATA
+
+
+class MergingMemoryFileSystem(MemoryFileSystem):
+    """Memory filesystem which can concatenate objects, like GCS compose"""
+
+    cachable = False
+
+    def merge(self, path, paths, **kwargs):
+        self.pipe_file(path, b"".join(self.cat_file(p) for p in paths))
+
+
+@pytest.fixture
+def multipart_upload_threshold():
+    original = (
+        fv3config.filesystem.MULTIPART_UPLOAD_THRESHOLD,
+        fv3config.filesystem.MULTIPART_UPLOAD_CHUNK_SIZE,
+    )
+    fv3config.filesystem.set_multipart_upload(threshold=1024, chunk_size=1000)
+    yield
+    fv3config.filesystem.set_multipart_upload(*original)
+
+
+@pytest.fixture
+def local_directory(tmpdir):
+    tmpdir.join("large_file").write_binary(DATA)
+    tmpdir.mkdir("subdir").join("small_file").write_binary(b"small")
+    return str(tmpdir)
+
+
+def test_upload_composite(tmpdir):
+    fs = MergingMemoryFileSystem()
+    source = tmpdir.join("large_file")
+    source.write_binary(DATA)
+    upload_composite(fs, str(source), "/upload/large_file", 1000, max_workers=4)
+    assert fs.cat_file("/upload/large_file") == DATA
+    assert fs.ls("/upload", detail=False) == ["/upload/large_file"]
+    fs.rm("/upload", recursive=True)
+
+
+def test_upload_composite_streams_parts(tmpdir, monkeypatch):
+    fs = MergingMemoryFileSystem()
+    source = tmpdir.join("large_file")
+    source.write_binary(DATA)
+    monkeypatch.setattr(fv3config._transfer, "UPLOAD_READ_SIZE", 300)
+    reads = []
+    pread = os.pread
+
+    def recording_pread(fd, n, offset):
+        reads.append(n)
+        return pread(fd, n, offset)
+
+    monkeypatch.setattr(fv3config._transfer.os, "pread", recording_pread)
+    upload_composite(fs, str(source), "/upload/large_file", 1000, max_workers=4)
+    assert fs.cat_file("/upload/large_file") == DATA
+    assert max(reads) == 300
+    fs.rm("/upload", recursive=True)
+
+
+def test_upload_composite_limits_number_of_parts(tmpdir, monkeypatch):
+    fs = MergingMemoryFileSystem()
+    merged = []
+    monkeypatch.setattr(
+        fs, "merge", lambda path, paths: merged.append(len(paths)),
+    )
+    source = tmpdir.join("large_file")
+    source.write_binary(DATA)
+    upload_composite(fs, str(source), "/upload/large_file", 10, max_workers=4)
+    assert merged == [MAX_COMPOSE_PARTS]
+
+
+@pytest.mark.parametrize(
+    "fs_class, uses_parts",
+    [(MergingMemoryFileSystem, True), (MemoryFileSystem, False)],
+)
+def test_put_directory_multipart(
+    fs_class, uses_parts, local_directory, multipart_upload_threshold, monkeypatch
+):
+    fs = fs_class()
+    calls = []
+    original_open = fs_class.open
+
+    def open_(self, path, *args, **kwargs):
+        calls.append(path)
+        return original_open(self, path, *args, **kwargs)
+
+    monkeypatch.setattr(fs_class, "open", open_)
+    fv3config.filesystem.put_directory(local_directory, "/upload", fs=fs)
+    assert fs.cat_file("/upload/large_file") == DATA
+    assert fs.cat_file("/upload/subdir/small_file") == b"small"
+    assert any(".fv3config-part-" in path for path in calls) == uses_parts
+    fs.rm("/upload", recursive=True)
+
+
+def test_put_file_multipart(tmpdir, multipart_upload_threshold, monkeypatch):
+    fs = MergingMemoryFileSystem()
+    monkeypatch.setattr(fv3config.filesystem, "_get_fs", lambda path: fs)
+    source = tmpdir.join("large_file")
+    source.write_binary(DATA)
+    fv3config.filesystem.put_file(str(source), "memory://upload/large_file")
+    assert fs.cat_file("/upload/large_file") == DATA
+    fs.rm("/upload", recursive=True)
+
+
+@pytest.fixture
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(fv3config._transfer, "RETRY_BASE_DELAY", 0.0)
+
+
+class FlakyError(OSError):
+    pass
+
+
+class HTTPStatusError(Exception):
+    def __init__(self, code):
+        self.code = code
+
+
+@pytest.mark.parametrize(
+    "err, expected",
+    [
+        (ConnectionError(), True),
+        (TimeoutError(), True),
+        (FileNotFoundError(), False),
+        (PermissionError(), False),
+        (ValueError(), False),
+        (HTTPStatusError(429), True),
+        (HTTPStatusError(503), True),
+        (HTTPStatusError(404), False),
+    ],
+)
+def test_is_transient(err, expected):
+    assert is_transient(err) == expected
+
+
+def test_retry_transient_errors(no_retry_delay):
+    calls = []
+
+    def func():
+        calls.append(None)
+        if len(calls) < 3:
+            raise FlakyError("transient")
+        return "done"
+
+    assert retry(func) == "done"
+    assert len(calls) == 3
+
+
+def test_retry_gives_up(no_retry_delay, monkeypatch):
+    monkeypatch.setattr(fv3config._transfer, "RETRY_ATTEMPTS", 2)
+    calls = []
+
+    def func():
+        calls.append(None)
+        raise FlakyError("transient")
+
+    with pytest.raises(FlakyError):
+        retry(func)
+    assert len(calls) == 2
+
+
+def test_retry_does_not_retry_permanent_errors(no_retry_delay):
+    calls = []
+
+    def func():
+        calls.append(None)
+        raise FileNotFoundError("missing")
+
+    with pytest.raises(FileNotFoundError):
+        retry(func)
+    assert len(calls) == 1
+
+
+def test_transfer_journal_persists(tmpdir):
+    filename = str(tmpdir.join("journal"))
+    journal = TransferJournal(filename)
+    journal.record("a", size=1)
+    journal.record("b")
+    with open(filename, "a") as f:
+        f.write('{"key": "trunc')
+    reloaded = TransferJournal(filename)
+    assert reloaded.get("a") == {"size": 1}
+    assert "b" in reloaded
+    assert "trunc" not in reloaded
+    reloaded.remove()
+    assert not os.path.exists(filename)
+
+
+def test_download_ranges_resumes(memory_fs, tmpdir, no_retry_delay, monkeypatch):
+    source = "memory://transfer-bucket/large_file"
+    target = str(tmpdir.join("large_file"))
+    journal = TransferJournal(str(tmpdir.join("journal")))
+    original_cat_file = MemoryFileSystem.cat_file
+    calls = []
+
+    def failing_cat_file(self, path, start=None, end=None, **kwargs):
+        if start >= 5000:
+            raise PermissionError("interrupted")
+        return original_cat_file(self, path, start=start, end=end, **kwargs)
+
+    monkeypatch.setattr(MemoryFileSystem, "cat_file", failing_cat_file)
+    with pytest.raises(PermissionError):
+        download_ranges(memory_fs, source, target, len(DATA), 1000, 1, journal)
+
+    def counting_cat_file(self, path, start=None, end=None, **kwargs):
+        calls.append(start)
+        return original_cat_file(self, path, start=start, end=end, **kwargs)
+
+    monkeypatch.setattr(MemoryFileSystem, "cat_file", counting_cat_file)
+    journal = TransferJournal(str(tmpdir.join("journal")))
+    download_ranges(memory_fs, source, target, len(DATA), 1000, 1, journal)
+    assert min(calls) == 5000
+    with open(target, "rb") as f:
+        assert f.read() == DATA
+
+
+def test_write_asset_list_resumes(tmpdir, monkeypatch):
+    source_dir = tmpdir.mkdir("source")
+    assets = []
+    for name in ["a", "b", "c"]:
+        source_dir.join(name).write_binary(name.encode())
+        assets.append(fv3config.get_asset_dict(str(source_dir), name))
+    rundir = str(tmpdir.join("rundir"))
+    original_get_file = fv3config.filesystem.get_file
+    copied = []
+
+    def failing_get_file(source, dest, *args, **kwargs):
+        if source.endswith("c"):
+            raise PermissionError("interrupted")
+        copied.append(source)
+        return original_get_file(source, dest, *args, **kwargs)
+
+    monkeypatch.setattr(fv3config.filesystem, "get_file", failing_get_file)
+    with pytest.raises(PermissionError):
+        write_asset_list(assets, rundir)
+    assert os.path.exists(os.path.join(rundir, JOURNAL_FILENAME))
+
+    copied.clear()
+    monkeypatch.setattr(
+        fv3config.filesystem,
+        "get_file",
+        lambda source, dest, *args, **kwargs: (
+            copied.append(source) or original_get_file(source, dest)
+        ),
+    )
+    write_asset_list(assets, rundir)
+    assert copied == [os.path.join(str(source_dir), "c")]
+    assert sorted(os.listdir(rundir)) == ["a", "b", "c"]
+
+
+def test_write_asset_list_removes_temporary_files(tmpdir):
+    source_dir = tmpdir.mkdir("source")
+    source_dir.join("a").write_binary(b"a")
+    rundir = tmpdir.mkdir("rundir")
+    rundir.join("a.1234.5678.tmp").write_binary(b"interrupted")
+    rundir.join("other.1234.5678.tmp").write_binary(b"not an asset")
+    write_asset_list([fv3config.get_asset_dict(str(source_dir), "a")], str(rundir))
+    assert sorted(os.listdir(str(rundir))) == ["a", "other.1234.5678.tmp"]
+
+
+def test_write_asset_list_later_asset_takes_precedence(tmpdir):
+    source_dir = tmpdir.mkdir("source")
+    source_dir.join("first").write_binary(b"first")
+    source_dir.join("second").write_binary(b"second")
+    assets = [
+        fv3config.get_asset_dict(str(source_dir), "first", target_name="file"),
+        fv3config.get_asset_dict(str(source_dir), "second", target_name="file"),
+    ]
+    rundir = tmpdir.join("rundir")
+    write_asset_list(assets, str(rundir))
+    assert rundir.join("file").read_binary() == b"second"
+
+
+def test_adaptive_concurrency_grows_while_throughput_improves(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(fv3config._transfer.time, "monotonic", lambda: clock[0])
+    controller = AdaptiveConcurrency(initial=2, maximum=4)
+    for n_bytes in (100, 200, 400, 400):
+        # one window of transfers per second, each moving n_bytes
+        for _ in range(controller.limit):
+            controller.acquire()
+        clock[0] += 1.0
+        for _ in range(controller.limit):
+            controller.release(n_bytes)
+    assert controller.limit == 4
+
+
+def test_adaptive_concurrency_holds_without_improvement(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(fv3config._transfer.time, "monotonic", lambda: clock[0])
+    controller = AdaptiveConcurrency(initial=2, maximum=8)
+    for _ in range(3):
+        limit = controller.limit
+        for _ in range(limit):
+            controller.acquire()
+        clock[0] += 1.0
+        for _ in range(limit):
+            # throughput saturates at 600 bytes per second
+            controller.release(600 // limit)
+    # grows after the first window only
+    assert controller.limit == 3
+
+
+def test_adaptive_concurrency_backs_off_on_throttling():
+    controller = AdaptiveConcurrency(initial=8, minimum=3)
+    controller.report_error(HTTPStatusError(429))
+    assert controller.limit == 4
+    controller.report_error(HTTPStatusError(404))
+    assert controller.limit == 4
+    controller.report_error(HTTPStatusError(503))
+    assert controller.limit == 3
+
+
+def test_adaptive_concurrency_backs_off_once_for_concurrent_errors():
+    controller = AdaptiveConcurrency(initial=16)
+    started = time.monotonic()
+    for _ in range(8):
+        controller.report_error(HTTPStatusError(429), started)
+    assert controller.limit == 8
+    controller.report_error(HTTPStatusError(429), time.monotonic())
+    assert controller.limit == 4
+
+
+def test_run_transfers_respects_limit():
+    controller = AdaptiveConcurrency(initial=3, maximum=3)
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+    completed = []
+
+    def transfer(i):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+            completed.append(i)
+        return 1
+
+    run_transfers((functools.partial(transfer, i) for i in range(20)), controller)
+    assert sorted(completed) == list(range(20))
+    assert peak[0] <= 3
+
+
+def test_run_transfers_raises_first_error():
+    def fail():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        run_transfers([lambda: 1, fail, lambda: 1])
+
+
+def test_run_transfers_backs_off_on_retried_errors(no_retry_delay):
+    controller = AdaptiveConcurrency(initial=8, maximum=8)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise HTTPStatusError(429)
+        return 1
+
+    run_transfers([functools.partial(retry, flaky)], controller)
+    assert controller.limit == 2
+
+
+def test_run_transfers_backs_off_on_retried_range_errors(
+    memory_fs, tmpdir, no_retry_delay, monkeypatch
+):
+    controller = AdaptiveConcurrency(initial=8, maximum=8)
+    original_cat_file = MemoryFileSystem.cat_file
+    failed = []
+
+    def flaky_cat_file(self, path, start=None, end=None, **kwargs):
+        if not failed:
+            failed.append(start)
+            raise HTTPStatusError(503)
+        return original_cat_file(self, path, start=start, end=end, **kwargs)
+
+    monkeypatch.setattr(MemoryFileSystem, "cat_file", flaky_cat_file)
+    target = str(tmpdir.join("target"))
+    source = "/transfer-bucket/large_file"
+    run_transfers(
+        [lambda: download_ranges(memory_fs, source, target, len(DATA), 1000, 4)],
+        controller,
+    )
+    assert controller.limit == 4
+    with open(target, "rb") as f:
+        assert f.read() == DATA
+
+
+def test_run_transfers_errors_reported_to_own_run(no_retry_delay):
+    flaky_controller = AdaptiveConcurrency(initial=8, maximum=8)
+    other_controller = AdaptiveConcurrency(initial=8, maximum=8)
+    other_running, flaky_done = threading.Event(), threading.Event()
+    attempts = []
+
+    def flaky():
+        other_running.wait()
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise HTTPStatusError(429)
+        flaky_done.set()
+        return 1
+
+    def other():
+        other_running.set()
+        flaky_done.wait()
+        return 1
+
+    thread = threading.Thread(target=run_transfers, args=([other], other_controller))
+    thread.start()
+    run_transfers([functools.partial(retry, flaky)], flaky_controller)
+    thread.join()
+    assert flaky_controller.limit == 2
+    assert other_controller.limit == 8
+
+
+def test_bandwidth_limiter_delays_to_average_rate(monkeypatch):
+    clock = [0.0]
+    sleeps = []
+    monkeypatch.setattr(fv3config._transfer.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(fv3config._transfer.time, "sleep", sleeps.append)
+    limiter = BandwidthLimiter(100)
+    limiter.consume(50)
+    limiter.consume(100)
+    assert sleeps == [0.5, 1.5]
+
+
+def test_bandwidth_is_throttled_in_put_directory(local_directory, monkeypatch):
+    consumed = []
+    monkeypatch.setattr(fv3config._transfer, "throttle", consumed.append)
+    fs = MemoryFileSystem()
+    monkeypatch.setattr(fv3config.filesystem, "is_local_path", lambda path: False)
+    fv3config.filesystem.put_directory(str(local_directory), "/bandwidth-bucket", fs)
+    assert sum(consumed) == sum(
+        os.path.getsize(os.path.join(dirpath, name))
+        for dirpath, _, names in os.walk(str(local_directory))
+        for name in names
+    )
+    fs.rm("/bandwidth-bucket", recursive=True)
+
+
+def test_largest_first():
+    items = ["a", "b", "c", "d", "e"]
+    sizes = [10, None, 1000, 5, None]
+    assert fv3config._transfer.largest_first(items, sizes) == ["c", "a", "d", "b", "e"]
+
+
+def test_write_asset_list_copies_largest_first(tmpdir, monkeypatch):
+    source = tmpdir.mkdir("source")
+    sizes = {"small": 1, "large": 1000, "medium": 100}
+    for name, size in sizes.items():
+        source.join(name).write_binary(b"x" * size)
+    copied = []
+    original_get_file = fv3config.filesystem.get_file
+
+    def get_file(source_filename, dest_filename, **kwargs):
+        copied.append(os.path.basename(source_filename))
+        original_get_file(source_filename, dest_filename, **kwargs)
+
+    monkeypatch.setattr(fv3config.filesystem, "get_file", get_file)
+    monkeypatch.setattr(fv3config._transfer, "ADAPTIVE_INITIAL_CONCURRENCY", 1)
+    monkeypatch.setattr(fv3config._transfer, "ADAPTIVE_MAX_CONCURRENCY", 1)
+    asset_list = [fv3config.get_asset_dict(str(source), name) for name in sizes]
+    write_asset_list(asset_list, str(tmpdir.join("rundir")))
+    assert copied == ["large", "medium", "small"]
@@ -1,4 +1,5 @@
 import collections
+import io
 import unittest
 import tempfile
 import pytest
@@ -6,6 +7,7 @@ import fv3config
 import os
 import copy
 import datetime
+import tracemalloc
 
 from .mocks import c12_config
 
@@ -86,6 +88,60 @@ def test_write_run_directory_succeeds_with_diag_table_class():
         fv3config.write_run_directory(config, rundir)
 
 
+@pytest.mark.parametrize(
+    "data",
+    [
+        pytest.param(lambda: lambda: iter([b"patch ", b"data"]), id="callable"),
+        pytest.param(lambda: io.BytesIO(b"patch data"), id="file"),
+    ],
+)
+def test_write_run_directory_with_streamed_patch_file(data, tmpdir):
+    config = c12_config()
+    config["patch_files"] = [
+        fv3config.get_bytes_asset_dict(data(), target_location="", target_name="patch")
+    ]
+    rundir = str(tmpdir.join("rundir"))
+    fv3config.write_run_directory(config, rundir)
+    assert tmpdir.join("rundir", "patch").read_binary() == b"patch data"
+    with open(os.path.join(rundir, "fv3config.yml")) as f:
+        written = fv3config.load(f)
+    assert written["patch_files"][0]["bytes"] == b"patch data"
+
+
+def test_write_run_directory_with_patch_file_read_once(tmpdir):
+    config = c12_config()
+    config["patch_files"] = [
+        fv3config.get_bytes_asset_dict(iter([b"data"]), "", "patch")
+    ]
+    with pytest.raises(fv3config.ConfigError):
+        fv3config.write_run_directory(config, str(tmpdir))
+
+
+def test_write_run_directory_streams_large_patch_file(tmpdir):
+    chunk_size, n_chunks = 2 ** 20, 16
+
+    def data():
+        for _ in range(n_chunks):
+            yield b"x" * chunk_size
+
+    config = c12_config()
+    config["patch_files"] = [fv3config.get_bytes_asset_dict(data, "", "patch")]
+    rundir = str(tmpdir.join("rundir"))
+    fv3config.write_run_directory(config, rundir)
+    tracemalloc.start()
+    try:
+        fv3config.write_run_directory(config, rundir)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 4 * chunk_size
+    assert retained < chunk_size
+    assert os.path.getsize(os.path.join(rundir, "patch")) == chunk_size * n_chunks
+    with open(os.path.join(rundir, "fv3config.yml")) as f:
+        written = fv3config.load(f)
+    assert written["patch_files"][0]["bytes"] == b"x" * chunk_size * n_chunks
+
+
 def test_rundir_contains_nudging_asset_if_enabled():
     config = c12_config()
     config["gfs_analysis_data"] = {